@@ -10,6 +10,7 @@ This module uses Google Gemini to analyze call transcripts in real-time and dete
 import os
 import json
 import uuid
+import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 import google.genai as genai
@@ -18,9 +19,16 @@ from backend.models import (
     CallSession, TranscriptLine, WellbeingAssessment,
     Concern, ProfileFact, Elder
 )
+from backend.prompt_builder import PromptBuilder, RollingTranscript
+from backend.llm_cache import LLMResponseCache
 
 # Configure Gemini
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+
+# Limits for concurrent Gemini requests across all calls
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "16"))
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", "20"))
 
 
 class AIAnalyzer:
@@ -29,15 +37,27 @@ class AIAnalyzer:
     def __init__(self):
         self.model = genai.Client(api_key=GOOGLE_API_KEY) if GOOGLE_API_KEY else None
         self.analysis_context = {}  # Store running context per call_id
+        self._request_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+        self.prompt_builder = PromptBuilder()
+        self.response_cache = LLMResponseCache()
 
     async def analyze_transcript_chunk(
         self,
         call: CallSession,
         elder: Elder,
         new_transcript_line: TranscriptLine
+    ) -> Dict:
+        """Analyze a single new transcript line (see analyze_transcript_lines)"""
+        return await self.analyze_transcript_lines(call, elder, [new_transcript_line])
+
+    async def analyze_transcript_lines(
+        self,
+        call: CallSession,
+        elder: Elder,
+        new_transcript_lines: List[TranscriptLine]
     ) -> Dict:
         """
-        Analyze a new transcript chunk and return insights.
+        Analyze a batch of new transcript lines with a single model request.
 
         Returns:
             {
@@ -52,7 +72,7 @@ class AIAnalyzer:
         # Initialize context if this is the first chunk
         if call_id not in self.analysis_context:
             self.analysis_context[call_id] = {
-                "transcript_history": [],
+                "transcript": RollingTranscript(),
                 "detected_concerns": [],
                 "wellbeing_indicators": {
                     "mood": None,
@@ -64,14 +84,11 @@ class AIAnalyzer:
 
         # Add to context
         context = self.analysis_context[call_id]
-        context["transcript_history"].append({
-            "speaker": new_transcript_line.speaker,
-            "text": new_transcript_line.text,
-            "timestamp": new_transcript_line.timestamp
-        })
+        for line in new_transcript_lines:
+            context["transcript"].append(line.speaker, line.text)
 
         # Only analyze if we have enough context (at least 3 exchanges)
-        if len(context["transcript_history"]) < 3:
+        if context["transcript"].total_lines < 3:
             return {
                 "wellbeing_update": None,
                 "concerns": [],
@@ -80,7 +97,7 @@ class AIAnalyzer:
             }
 
         # Build analysis prompt
-        prompt = self._build_analysis_prompt(elder, context["transcript_history"])
+        prompt = self.prompt_builder.build(elder, context["transcript"])
 
         try:
             # Call Gemini API
@@ -92,11 +109,8 @@ class AIAnalyzer:
                     "suggested_actions": []
                 }
 
-            response = self.model.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
-            )
-            analysis = self._parse_gemini_response(response.text)
+            response_text = await self._generate(prompt)
+            analysis = self._parse_gemini_response(response_text)
 
             # Update wellbeing assessment
             wellbeing_update = self._create_wellbeing_assessment(
@@ -130,6 +144,15 @@ class AIAnalyzer:
                 "suggested_actions": suggested_actions
             }
 
+        except asyncio.TimeoutError:
+            print(f"AI analysis timed out after {GEMINI_TIMEOUT_SECONDS}s for call {call_id}")
+            return {
+                "wellbeing_update": None,
+                "concerns": [],
+                "profile_facts": [],
+                "suggested_actions": []
+            }
+
         except Exception as e:
             print(f"Error in AI analysis: {e}")
             return {
@@ -139,75 +162,22 @@ class AIAnalyzer:
                 "suggested_actions": []
             }
 
-    def _build_analysis_prompt(self, elder: Elder, transcript_history: List[Dict]) -> str:
-        """Build the analysis prompt for Gemini"""
-
-        # Format transcript
-        transcript_text = "\n".join([
-            f"{line['speaker'].upper()}: {line['text']}"
-            for line in transcript_history[-10:]  # Last 10 exchanges
-        ])
-
-        prompt = f"""You are an AI assistant analyzing a wellness check-in call with an elderly person.
-
-**Elder Information:**
-- Name: {elder.name}
-- Age: {elder.age}
-- Baseline: {elder.wellbeing_baseline.typical_mood if elder.wellbeing_baseline else 'Unknown'}
-
-**Recent Conversation:**
-{transcript_text}
-
-**Your Task:**
-Analyze this conversation and provide a JSON response with the following structure:
-
-{{
-  "wellbeing": {{
-    "mood_score": <1-10, where 1=very poor, 10=excellent>,
-    "mood_indicators": ["specific phrases or observations"],
-    "energy_level": <1-10>,
-    "energy_indicators": ["observations"],
-    "cognitive_clarity": <1-10>,
-    "cognitive_indicators": ["observations"],
-    "social_engagement": <1-10>,
-    "social_indicators": ["observations"],
-    "overall_assessment": "brief summary"
-  }},
-  "concerns": [
-    {{
-      "type": "physical|emotional|cognitive|social|safety",
-      "severity": "low|medium|high|critical",
-      "description": "what was said or observed",
-      "action_required": true|false,
-      "reasoning": "why this is a concern"
-    }}
-  ],
-  "profile_updates": [
-    {{
-      "category": "health|family|interests|routine|preferences",
-      "fact": "new information learned"
-    }}
-  ],
-  "suggested_actions": [
-    {{
-      "action_type": "call_family|call_neighbor|call_medical|call_volunteer",
-      "urgency": "immediate|soon|routine",
-      "reason": "why this action is needed",
-      "suggested_contact": "which village member role"
-    }}
-  ]
-}}
-
-**Guidelines:**
-- Be objective and evidence-based
-- Flag concerns early but don't over-dramatize
-- Consider the elder's baseline when assessing changes
-- Only suggest actions when truly warranted
-- Empty arrays are acceptable if nothing detected
-
-Respond with ONLY valid JSON, no additional text."""
-
-        return prompt
+    async def _generate(self, prompt: str) -> str:
+        """Get a response for a prompt, reusing cached responses for identical windows"""
+        key = LLMResponseCache.make_key(GEMINI_MODEL, prompt)
+        return await self.response_cache.get_or_generate(key, lambda: self._call_model(prompt))
+
+    async def _call_model(self, prompt: str) -> str:
+        """Send a prompt to Gemini without blocking the event loop"""
+        async with self._request_slots:
+            response = await asyncio.wait_for(
+                self.model.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt
+                ),
+                timeout=GEMINI_TIMEOUT_SECONDS
+            )
+        return response.text
 
     def _parse_gemini_response(self, response_text: str) -> Dict:
         """Parse Gemini's JSON response"""
@@ -330,6 +300,18 @@ Respond with ONLY valid JSON, no additional text."""
 
         return None
 
+    def context_stats(self) -> Dict:
+        """Report the memory held by per-call analysis context"""
+        per_call = {
+            call_id: context["transcript"].approx_bytes()
+            for call_id, context in self.analysis_context.items()
+        }
+        return {
+            "active_calls": len(per_call),
+            "total_bytes": sum(per_call.values()),
+            "per_call_bytes": per_call
+        }
+
     def cleanup_call_context(self, call_id: str):
         """Clean up analysis context when call ends"""
         if call_id in self.analysis_context:
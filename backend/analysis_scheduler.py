@@ -0,0 +1,83 @@
+"""
+Per-call scheduler for real-time transcript analysis.
+
+Transcript lines arrive one utterance at a time. Instead of starting an AI
+analysis for every line, the scheduler collects the lines for a call over a
+short window and hands them to the analysis handler as one batch. At most one
+analysis runs per call; lines that arrive while it is running are picked up by
+a single follow-up pass.
+"""
+
+import os
+import asyncio
+import traceback
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from backend.models import CallSession, Elder, TranscriptLine
+
+# Seconds to wait after the first new line before analyzing the batch
+ANALYSIS_DEBOUNCE_SECONDS = float(os.environ.get("ANALYSIS_DEBOUNCE_SECONDS", "2.0"))
+
+AnalysisHandler = Callable[[CallSession, Elder, List[TranscriptLine]], Awaitable[None]]
+
+
+class AnalysisScheduler:
+    """Coalesces transcript lines per call and runs one analysis at a time"""
+
+    def __init__(self, handler: AnalysisHandler, window_seconds: float = ANALYSIS_DEBOUNCE_SECONDS):
+        self.handler = handler
+        self.window_seconds = window_seconds
+        self._pending: Dict[str, List[TranscriptLine]] = {}  # Lines not yet analyzed, per call_id
+        self._targets: Dict[str, Tuple[CallSession, Elder]] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        self.stats = {"lines_received": 0, "analyses_run": 0}
+
+    def submit(self, call: CallSession, elder: Elder, transcript_line: TranscriptLine):
+        """Queue a transcript line for analysis (non-blocking)"""
+        call_id = call.id
+        self._pending.setdefault(call_id, []).append(transcript_line)
+        self._targets[call_id] = (call, elder)
+        self.stats["lines_received"] += 1
+
+        if call_id not in self._runners:
+            self._runners[call_id] = asyncio.create_task(self._run(call_id))
+
+    async def _run(self, call_id: str):
+        """Drain pending lines for a call, one batch per debounce window"""
+        try:
+            while True:
+                await asyncio.sleep(self.window_seconds)
+
+                lines = self._pending.pop(call_id, [])
+                if not lines:
+                    break
+
+                call, elder = self._targets[call_id]
+                self.stats["analyses_run"] += 1
+                try:
+                    await self.handler(call, elder, lines)
+                except Exception as e:
+                    print(f"Error in scheduled analysis for call {call_id}: {e}")
+                    traceback.print_exc()
+
+                # Lines that arrived mid-flight get exactly one follow-up pass
+                if call_id not in self._pending:
+                    break
+        finally:
+            # cancel() + a new submit() may have registered a newer runner for this call
+            if self._runners.get(call_id) is asyncio.current_task():
+                del self._runners[call_id]
+                if call_id not in self._pending:
+                    self._targets.pop(call_id, None)
+
+    def cancel(self, call_id: str):
+        """Drop pending lines and cancel any running analysis for a call that has ended"""
+        self._pending.pop(call_id, None)
+        self._targets.pop(call_id, None)
+        runner = self._runners.pop(call_id, None)
+        if runner and not runner.done():
+            runner.cancel()
+
+    def pending_calls(self) -> int:
+        """Number of calls with a scheduled or running analysis"""
+        return len(self._runners)
@@ -0,0 +1,220 @@
+"""
+Load check: /api/transcript/stream ingest latency while analyses run.
+
+Drives the real FastAPI app in-process (httpx ASGITransport, no network).
+Starts N calls through /api/call/start, then every call streams its
+transcript lines through /api/transcript/stream at once, the way agents do
+during a busy hour. Each line goes through the real route: transcript
+writer, WebSocket broadcast to the connected dashboards (fake sockets
+subscribed to the elder), elder lookup and the analysis scheduler. The
+scheduled analyses call a stub Gemini client that answers after a fixed
+network delay and records how many requests are in flight at once.
+
+Reports p50/p99/max ingest latency per line and the worst event-loop lag.
+The run fails (exit code 1) if:
+- p99 ingest latency exceeds --max-p99-ms, i.e. ingest waited on analysis or blocked
+- more than GEMINI_MAX_CONCURRENCY requests were in flight at once
+- a line was rejected, or no analysis reached the model
+
+LiveKit is switched off for the run, and calls go to a scratch call store.
+
+Usage (from the project root):
+    python -m backend.bench_analysis_load --calls 200 --lines 6 --model-latency-ms 300
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from types import SimpleNamespace
+from typing import Dict
+
+import httpx
+
+from backend import main as api
+from backend.ai_analyzer import GEMINI_MAX_CONCURRENCY
+from backend.call_store import CallStore
+from backend.margaret import margaret_elder
+
+STUB_RESPONSE = '{"wellbeing": {}, "concerns": [], "profile_updates": [], "suggested_actions": []}'
+
+
+class StubGemini:
+    """Stands in for genai.Client: `.aio.models.generate_content` with a fixed latency"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self.generate_content))
+
+    async def generate_content(self, model: str, contents: str):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_seconds)
+            return SimpleNamespace(text=STUB_RESPONSE)
+        finally:
+            self.in_flight -= 1
+
+
+class DashboardSocket:
+    """A connected dashboard that reads every frame it is sent"""
+
+    def __init__(self):
+        self.frames = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.frames += 1
+
+    async def send_bytes(self, frame):
+        self.frames += 1
+
+    async def close(self, code=1000):
+        pass
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(
+    calls: int,
+    lines: int,
+    model_latency: float,
+    line_gap: float = 0.05,
+    dashboards: int = 20,
+    debounce: float = 0.5
+) -> Dict:
+    """Run the load and return latency and model-side statistics"""
+    stub = StubGemini(model_latency)
+    saved = (api.ai_analyzer.model, api.call_store, api.LIVEKIT_API_KEY, api.analysis_scheduler.window_seconds)
+    scratch = tempfile.TemporaryDirectory()
+    api.ai_analyzer.model = stub
+    api.call_store = CallStore(f"{scratch.name}/calls.db")
+    api.LIVEKIT_API_KEY = None  # Never dial or record
+    api.analysis_scheduler.window_seconds = debounce
+
+    sockets = [DashboardSocket() for _ in range(dashboards)]
+    for socket in sockets:
+        await api.ws_manager.connect(socket)
+        api.ws_manager.subscribe_to_elder(socket, margaret_elder.id)
+
+    latencies, rejected = [], 0
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    transport = httpx.ASGITransport(app=api.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            started_calls = await asyncio.gather(*(
+                client.post("/api/call/start", json={"elder_id": margaret_elder.id}) for _ in range(calls)
+            ))
+            call_ids = [response.json()["id"] for response in started_calls]
+
+            async def stream(index: int, call_id: str):
+                nonlocal rejected
+                for n in range(lines):
+                    started = time.perf_counter()
+                    response = await client.post("/api/transcript/stream", json={
+                        "call_id": call_id,
+                        "speaker": "elder" if n % 2 else "agent",
+                        "speaker_name": "Margaret" if n % 2 else "Village",
+                        "text": f"Call {index}, line {n}: the tomatoes are coming along nicely this year",
+                    })
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        rejected += 1
+                    await asyncio.sleep(line_gap)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(stream(i, call_id) for i, call_id in enumerate(call_ids)))
+            ingest_seconds = time.perf_counter() - started
+
+            # Let the scheduled analyses finish
+            while api.analysis_scheduler.pending_calls():
+                await asyncio.sleep(0.05)
+    finally:
+        stop.set()
+        worst_lag = await lag_task
+        for socket in sockets:
+            api.ws_manager.disconnect(socket)
+        for call_id in list(api.call_store.active):
+            api.analysis_scheduler.cancel(call_id)
+            api.ai_analyzer.cleanup_call_context(call_id)
+        api.call_store.close()
+        (api.ai_analyzer.model, api.call_store, api.LIVEKIT_API_KEY,
+         api.analysis_scheduler.window_seconds) = saved
+        scratch.cleanup()
+
+    return {
+        "lines": len(latencies),
+        "rejected": rejected,
+        "ingest_seconds": ingest_seconds,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "max_ms": max(latencies) * 1e3,
+        "worst_lag_ms": worst_lag * 1e3,
+        "model_requests": stub.requests,
+        "peak_in_flight": stub.peak_in_flight,
+        "frames_to_dashboards": sum(socket.frames for socket in sockets),
+    }
+
+
+def report(stats: Dict, calls: int, model_latency: float, max_p99_ms: float) -> bool:
+    print(f"{calls} concurrent calls, {stats['lines']} transcript lines, stub latency {model_latency * 1e3:.0f} ms, "
+          f"GEMINI_MAX_CONCURRENCY={GEMINI_MAX_CONCURRENCY}")
+    print(f"  ingest p50         {stats['p50_ms']:8.2f} ms")
+    print(f"  ingest p99         {stats['p99_ms']:8.2f} ms (limit {max_p99_ms:.0f} ms)")
+    print(f"  ingest max         {stats['max_ms']:8.2f} ms")
+    print(f"  worst loop lag     {stats['worst_lag_ms']:8.1f} ms")
+    print(f"  model requests     {stats['model_requests']:8d}")
+    print(f"  peak in flight     {stats['peak_in_flight']:8d}")
+    print(f"  dashboard frames   {stats['frames_to_dashboards']:8d}")
+
+    ok = True
+    if stats["p99_ms"] > max_p99_ms:
+        print("FAIL: p99 ingest latency over the limit")
+        ok = False
+    if stats["peak_in_flight"] > GEMINI_MAX_CONCURRENCY:
+        print("FAIL: more requests in flight than GEMINI_MAX_CONCURRENCY")
+        ok = False
+    if stats["rejected"]:
+        print(f"FAIL: {stats['rejected']} transcript lines were rejected")
+        ok = False
+    if not stats["model_requests"]:
+        print("FAIL: no analysis reached the model")
+        ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcript ingest latency under analysis load")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=6, help="Transcript lines streamed per call")
+    parser.add_argument("--model-latency-ms", type=float, default=300)
+    parser.add_argument("--dashboards", type=int, default=20, help="WebSocket clients watching every call")
+    parser.add_argument("--max-p99-ms", type=float, default=50)
+    args = parser.parse_args(argv)
+    stats = asyncio.run(run(args.calls, args.lines, args.model_latency_ms / 1e3, dashboards=args.dashboards))
+    sys.exit(0 if report(stats, args.calls, args.model_latency_ms / 1e3, args.max_p99_ms) else 1)
+
+
+if __name__ == "__main__":
+    main()
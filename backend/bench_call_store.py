@@ -0,0 +1,140 @@
+"""
+Benchmark: call history pagination at 1M calls.
+
+Fills a scratch CallStore with N ended calls spread over a few thousand
+elders, then times:
+
+- the first page of /api/calls (newest first), and pages deep in the history
+  reached by following cursors
+- the same deep position fetched with LIMIT/OFFSET, for contrast
+- the first page for one elder, and get_call by id
+- save_call_async, with the worst event-loop lag seen while it writes
+
+Usage (from the project root):
+    python -m backend.bench_call_store --calls 1000000
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+from backend.call_store import CallStore, _UPSERT_CALL
+from backend.models import CallSession, CallStatus
+
+
+def make_call(index: int, elders: int, epoch: datetime) -> CallSession:
+    started_at = epoch + timedelta(seconds=index * 37)
+    return CallSession(
+        id=f"call-{index:08d}",
+        elder_id=f"elder-{index % elders}",
+        type="elder_checkin",
+        started_at=started_at,
+        ended_at=started_at + timedelta(minutes=6),
+        duration_seconds=360,
+        status=CallStatus.COMPLETED,
+        room_name=f"call_{index:08x}",
+    )
+
+
+def fill(store: CallStore, calls: int, elders: int, batch: int = 20_000):
+    epoch = datetime(2024, 1, 1)
+    for start in range(0, calls, batch):
+        rows = [CallStore._call_row(make_call(i, elders, epoch)) for i in range(start, min(start + batch, calls))]
+        store._write(_UPSERT_CALL, rows)
+
+
+def timed_ms(func, repeat: int = 20) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e3)
+    return statistics.median(samples)
+
+
+def offset_page(store: CallStore, offset: int, limit: int):
+    with store._lock:
+        return store._db.execute(
+            "SELECT payload FROM call_sessions ORDER BY started_at DESC, id DESC LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+
+
+async def measure_async_writes(store: CallStore, writes: int, elders: int):
+    worst = 0.0
+    stop = asyncio.Event()
+
+    async def ticker():
+        nonlocal worst
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            worst = max(worst, time.perf_counter() - started - 0.005)
+
+    task = asyncio.create_task(ticker())
+    epoch = datetime(2030, 1, 1)
+    started = time.perf_counter()
+    for i in range(writes):
+        await store.save_call_async(make_call(10_000_000 + i, elders, epoch))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await task
+    return elapsed / writes * 1e3, worst * 1e3
+
+
+def run(calls: int, elders: int, limit: int, depth_pages: int):
+    with tempfile.TemporaryDirectory() as scratch:
+        store = CallStore(os.path.join(scratch, "calls.db"))
+        started = time.perf_counter()
+        fill(store, calls, elders)
+        print(f"Filled {calls} calls over {elders} elders in {time.perf_counter() - started:.1f} s\n")
+
+        first_ms = timed_ms(lambda: store.list_calls(limit=limit))
+
+        # Walk to a deep position once, then time fetching the page there
+        cursor = None
+        walk_started = time.perf_counter()
+        for _ in range(depth_pages):
+            _, cursor = store.list_calls(limit=limit, cursor=cursor)
+        walk_ms = (time.perf_counter() - walk_started) * 1e3 / depth_pages
+        deep_ms = timed_ms(lambda: store.list_calls(limit=limit, cursor=cursor))
+        depth = depth_pages * limit
+        offset_ms = timed_ms(lambda: offset_page(store, depth, limit), repeat=5)
+
+        elder_ms = timed_ms(lambda: store.list_calls(elder_id=f"elder-{elders // 2}", limit=limit))
+        lookup_ms = timed_ms(lambda: store.get_call(f"call-{calls // 2:08d}"), repeat=200)
+
+        print(f"page size {limit}")
+        rows = [
+            ("first page", first_ms),
+            (f"cursor pages 1-{depth_pages} (mean)", walk_ms),
+            (f"page at row {depth}, cursor", deep_ms),
+            (f"page at row {depth}, OFFSET", offset_ms),
+            ("first page for one elder", elder_ms),
+            ("get_call by id", lookup_ms),
+        ]
+        for label, ms in rows:
+            print(f"  {label:<34} {ms:8.3f} ms")
+
+        per_write_ms, worst_lag_ms = asyncio.run(measure_async_writes(store, 500, elders))
+        print(f"  {'save_call_async':<34} {per_write_ms:8.3f} ms/write "
+              f"(worst loop lag {worst_lag_ms:.1f} ms)")
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CallStore pagination")
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--elders", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--depth-pages", type=int, default=2_500, help="Cursor pages to walk before the deep page")
+    args = parser.parse_args(argv)
+    run(args.calls, args.elders, args.limit, args.depth_pages)
+
+
+if __name__ == "__main__":
+    main()
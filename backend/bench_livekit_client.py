@@ -0,0 +1,122 @@
+"""
+Microbenchmark: a fresh LiveKitAPI per call vs the shared LiveKit client.
+
+Starts a local mock of the LiveKit Twirp API (it answers CreateSIPParticipant
+and StartRoomCompositeEgress with empty protobuf messages). The same dial +
+egress sequence is then timed two ways: with a new `api.LiveKitAPI` per call,
+as start_call used to do, and with `livekit_clients.acquire()`. Each is run
+sequentially and as a concurrent burst.
+
+Usage (from the project root):
+    python -m backend.bench_livekit_client --calls 200 --burst 50
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+
+from aiohttp import web
+from livekit import api
+
+from backend.livekit_client import LiveKitClientManager
+
+API_KEY = "bench-key"
+API_SECRET = "bench-secret-bench-secret-bench-secret"
+
+
+async def start_mock_server(delay_ms: float):
+    peers = set()
+
+    async def twirp(request: web.Request):
+        await request.read()
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        return web.Response(body=b"", content_type="application/protobuf")
+
+    async def on_response(request, response):
+        # Each TCP connection has its own client port; distinct peers = connections opened
+        peers.add(request.transport.get_extra_info("peername"))
+
+    app = web.Application()
+    app.on_response_prepare.append(on_response)
+    app.router.add_post("/twirp/{service}/{method}", twirp)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", peers
+
+
+async def place_call(lk_api: api.LiveKitAPI, index: int):
+    await lk_api.sip.create_sip_participant(api.CreateSIPParticipantRequest(
+        sip_trunk_id="ST_bench", sip_call_to="+15550100", room_name=f"bench-{index}",
+        participant_identity=f"elder_{index}"
+    ))
+    await lk_api.egress.start_room_composite_egress(api.RoomCompositeEgressRequest(
+        room_name=f"bench-{index}", audio_only=True
+    ))
+
+
+async def fresh_client_call(url: str, index: int) -> float:
+    started = time.perf_counter()
+    lk_api = api.LiveKitAPI(url, API_KEY, API_SECRET)
+    try:
+        await place_call(lk_api, index)
+    finally:
+        await lk_api.aclose()
+    return time.perf_counter() - started
+
+
+async def shared_client_call(manager: LiveKitClientManager, index: int) -> float:
+    started = time.perf_counter()
+    async with manager.acquire() as lk_api:
+        await place_call(lk_api, index)
+    return time.perf_counter() - started
+
+
+def report(name: str, latencies, wall: float, connections: int):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<28} {len(latencies) / wall:8.1f} calls/s   median {statistics.median(latencies) * 1000:7.2f} ms   "
+          f"p95 {p95 * 1000:7.2f} ms   connections {connections}")
+
+
+async def run(calls: int, burst: int, delay_ms: float, concurrency: int):
+    runner, url, peers = await start_mock_server(delay_ms)
+    try:
+        for mode in ("sequential", "burst"):
+            for name in ("fresh LiveKitAPI", "shared client"):
+                peers.clear()
+                manager = LiveKitClientManager(url, API_KEY, API_SECRET, max_concurrency=concurrency)
+
+                async def one(index):
+                    if name == "fresh LiveKitAPI":
+                        return await fresh_client_call(url, index)
+                    return await shared_client_call(manager, index)
+
+                started = time.perf_counter()
+                if mode == "sequential":
+                    latencies = [await one(i) for i in range(calls)]
+                else:
+                    latencies = await asyncio.gather(*(one(i) for i in range(burst)))
+                wall = time.perf_counter() - started
+                await manager.aclose()
+                report(f"{name} ({mode})", latencies, wall, len(peers))
+    finally:
+        await runner.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-call LiveKit API clients")
+    parser.add_argument("--calls", type=int, default=200, help="Sequential calls per variant")
+    parser.add_argument("--burst", type=int, default=50, help="Concurrent calls per variant")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Mock server processing time per request")
+    parser.add_argument("--concurrency", type=int, default=10, help="Shared client concurrency limit")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.calls, args.burst, args.delay_ms, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
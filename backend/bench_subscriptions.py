@@ -0,0 +1,106 @@
+"""
+Benchmark: WebSocket subscription bookkeeping at dashboard scale.
+
+Simulates N sockets over M live calls. Each socket subscribes to a few calls,
+and some also to an elder wildcard. It then times subscribe, per-event
+subscriber lookup and disconnect for:
+
+- the previous layout (dict call_id -> set, disconnect scans every call)
+- SubscriptionIndex (bidirectional, prunes empty topics)
+
+and reports how many topics each one still holds after every socket has left.
+
+Usage (from the project root):
+    python -m backend.bench_subscriptions --sockets 50000 --calls 10000
+"""
+
+import time
+import random
+import argparse
+from typing import Dict, Set
+
+from backend.subscription_index import SubscriptionIndex, call_topic, elder_topic
+
+
+class ScanningIndex:
+    """The previous ConnectionManager bookkeeping, for comparison"""
+
+    def __init__(self):
+        self.call_subscriptions: Dict[str, Set[int]] = {}
+
+    def subscribe(self, socket: int, call_id: str):
+        self.call_subscriptions.setdefault(call_id, set()).add(socket)
+
+    def subscribers(self, call_id: str) -> Set[int]:
+        # broadcast_to_call copied the set before sending
+        return self.call_subscriptions.get(call_id, set()).copy()
+
+    def disconnect(self, socket: int):
+        for subscribers in self.call_subscriptions.values():
+            subscribers.discard(socket)
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def run(sockets: int, calls: int, per_socket: int, elders: int, disconnect_sample: int, seed: int):
+    rng = random.Random(seed)
+    call_ids = [f"call-{i}" for i in range(calls)]
+    elder_of = {call_id: f"elder-{rng.randrange(elders)}" for call_id in call_ids}
+    plan = [rng.sample(call_ids, per_socket) for _ in range(sockets)]
+    wildcard = {socket: f"elder-{rng.randrange(elders)}" for socket in range(0, sockets, 10)}
+    events = [rng.choice(call_ids) for _ in range(100_000)]
+    leaving = rng.sample(range(sockets), min(disconnect_sample, sockets))
+
+    print(f"{sockets} sockets, {calls} live calls, {per_socket} calls per socket, "
+          f"{len(wildcard)} elder wildcards over {elders} elders\n")
+
+    # Previous layout
+    old = ScanningIndex()
+    subscribe_s = timed(lambda: [old.subscribe(s, c) for s, ids in enumerate(plan) for c in ids])
+    lookup_s = timed(lambda: [len(old.subscribers(c)) for c in events])
+    disconnect_s = timed(lambda: [old.disconnect(s) for s in leaving]) / len(leaving)
+    print(f"{'scanning dict':<22} subscribe {subscribe_s * 1e3:8.1f} ms   "
+          f"lookup {lookup_s / len(events) * 1e6:6.2f} µs/event   disconnect {disconnect_s * 1e6:10.1f} µs/socket")
+    # Entries are never pruned, so every call ever subscribed to stays (empty sets after teardown)
+    old_topics_left = len(old.call_subscriptions)
+
+    # Subscription index
+    index = SubscriptionIndex()
+
+    def subscribe_all():
+        for s, ids in enumerate(plan):
+            for c in ids:
+                index.subscribe(s, call_topic(c))
+        for s, elder_id in wildcard.items():
+            index.subscribe(s, elder_topic(elder_id))
+
+    subscribe_s = timed(subscribe_all)
+    lookup_s = timed(lambda: [len(index.subscribers_of((call_topic(c), elder_topic(elder_of[c])))) for c in events])
+    disconnect_s = timed(lambda: [index.remove(s) for s in leaving]) / len(leaving)
+    print(f"{'SubscriptionIndex':<22} subscribe {subscribe_s * 1e3:8.1f} ms   "
+          f"lookup {lookup_s / len(events) * 1e6:6.2f} µs/event   disconnect {disconnect_s * 1e6:10.1f} µs/socket")
+    teardown_s = timed(lambda: [index.remove(s) for s in range(sockets)])
+
+    print(f"\nAfter all sockets leave: scanning dict keeps {old_topics_left} (empty) call entries; "
+          f"index keeps {index.metrics()['topics']} topics (full teardown {teardown_s * 1e3:.1f} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket subscription bookkeeping")
+    parser.add_argument("--sockets", type=int, default=50_000)
+    parser.add_argument("--calls", type=int, default=10_000)
+    parser.add_argument("--per-socket", type=int, default=3, help="Calls each socket subscribes to")
+    parser.add_argument("--elders", type=int, default=5_000)
+    parser.add_argument("--disconnect-sample", type=int, default=500,
+                        help="Disconnects timed (the scanning layout is O(calls) per disconnect)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    run(args.sockets, args.calls, args.per_socket, args.elders, args.disconnect_sample, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: WebSocket event fan-out at 1k subscribers per call.
+
+Emits transcript_update and concern_detected events (built from the pydantic
+models, as main.py does) to one call watched by N in-memory sockets. It
+reports events/sec for:
+
+- per-recipient send_json: the previous path, which calls `.dict()` per event
+  and `json.dumps` per recipient, awaited one socket at a time
+- ConnectionManager: each event is encoded once per wire format and the shared
+  frame is queued to every subscriber's writer task (all JSON clients, then a
+  mix with some msgpack clients)
+
+A run is timed until every subscriber has received every frame. Each path is
+run twice: as a burst, where all events are emitted back to back, and as a
+trickle, where the loop yields after every event the way live calls do. In a
+burst, writers send many frames per wake-up. In a trickle, each event wakes
+every writer.
+
+Usage (from the project root):
+    python -m backend.bench_ws_encoding --subscribers 1000 --events 2000
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+from backend.event_encoding import JSON_BACKEND, MSGPACK_AVAILABLE
+from backend.models import Concern, ConcernSeverity, TranscriptLine, WellbeingDimension
+from backend.websocket_manager import ConnectionManager
+
+
+class NullWebSocket:
+    """Accepts frames instantly and counts them"""
+
+    def __init__(self):
+        self.frames = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        # What Starlette's WebSocket.send_json does (plus default=str: datetimes in model dicts)
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+        self.frames += 1
+
+    async def send_text(self, data):
+        self.frames += 1
+
+    async def send_bytes(self, data):
+        self.frames += 1
+
+    async def close(self, code=1000):
+        pass
+
+
+def make_events(count: int):
+    events = []
+    for i in range(count):
+        if i % 10 == 9:
+            events.append(("concern_detected", Concern(
+                id=f"concern-{i}", dimension=WellbeingDimension.PHYSICAL, type="dizziness",
+                severity=ConcernSeverity.MODERATE, description="Mentioned dizziness when standing up",
+                quote="I got a bit dizzy this morning", detected_at=datetime.utcnow(), action_required=True
+            )))
+        else:
+            events.append(("transcript_update", TranscriptLine(
+                id=f"line-{i}", speaker="elder", speaker_name="Margaret", text=f"Oh, the garden is lovely this time of year, line {i}",
+                timestamp=datetime.utcnow()
+            )))
+    return events
+
+
+async def bench_send_json(subscribers: int, events, trickle: bool) -> float:
+    sockets = [NullWebSocket() for _ in range(subscribers)]
+    started = time.perf_counter()
+    for event_type, model in events:
+        message = {"type": event_type, "data": model.dict()}
+        for socket in sockets:
+            await socket.send_json(message)
+        if trickle:
+            await asyncio.sleep(0)
+    return time.perf_counter() - started
+
+
+async def bench_manager(subscribers: int, events, msgpack_share: float, trickle: bool) -> float:
+    manager = ConnectionManager(queue_size=len(events) + 1)
+    sockets = [NullWebSocket() for _ in range(subscribers)]
+    msgpack_clients = int(subscribers * msgpack_share)
+    for i, socket in enumerate(sockets):
+        await manager.connect(socket, "msgpack" if i < msgpack_clients else "json")
+        manager.subscribe_to_call(socket, "call-1")
+
+    started = time.perf_counter()
+    for event_type, model in events:
+        if event_type == "concern_detected":
+            await manager.emit_concern_detected("call-1", model)
+        else:
+            await manager.emit_transcript_update("call-1", model)
+        if trickle:
+            await asyncio.sleep(0)
+    while any(socket.frames < len(events) for socket in sockets):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    await manager.aclose()
+    return elapsed
+
+
+async def run(subscribers: int, event_count: int, msgpack_share: float):
+    events = make_events(event_count)
+    print(f"{subscribers} subscribers on one call, {event_count} events, JSON backend: {JSON_BACKEND}\n")
+
+    def report(label: str, seconds: float):
+        print(f"{label:<34} {event_count / seconds:10.0f} events/s   "
+              f"{event_count * subscribers / seconds / 1e3:8.0f}k frames/s")
+
+    for trickle in (False, True):
+        print("trickle (yield after each event)" if trickle else "burst")
+        report("  per-recipient send_json", await bench_send_json(subscribers, events, trickle))
+        report("  ConnectionManager (json)", await bench_manager(subscribers, events, 0.0, trickle))
+        if MSGPACK_AVAILABLE and msgpack_share:
+            report(f"  ConnectionManager ({msgpack_share:.0%} msgpack)",
+                   await bench_manager(subscribers, events, msgpack_share, trickle))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket event encoding and fan-out")
+    parser.add_argument("--subscribers", type=int, default=1_000)
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--msgpack-share", type=float, default=0.25, help="Fraction of clients using msgpack")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.subscribers, args.events, args.msgpack_share))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Persistent, indexed storage for call sessions, transcript lines and village actions.
+
+Backed by an embedded SQLite database whose tables mirror `call_sessions`,
+`transcript_lines` and `village_actions` in schema.sql. Each row keeps its
+indexed columns alongside the full pydantic payload, so lookups by call id, by
+elder + started_at and by action status + call id are index seeks instead of
+list scans, and history survives restarts.
+
+Calls that are still in progress are also held in memory (`active`) because
+the transcript streaming and analysis code mutates them in place.
+
+Async code writes through the `*_async` methods. Rows are built on the event
+loop, from a consistent snapshot of the call, and the INSERT + COMMIT runs on
+a single writer thread, so writes keep their order and never block the loop.
+Reads stay synchronous: they are index seeks that return in well under a
+millisecond.
+"""
+
+import os
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from backend.models import CallSession, TranscriptLine, VillageAction
+
+CALL_STORE_PATH = os.environ.get(
+    "CALL_STORE_PATH",
+    os.path.join(os.path.dirname(__file__), "village_calls.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS call_sessions (
+    id TEXT PRIMARY KEY,
+    elder_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    ended_at TEXT,
+    duration_seconds INTEGER,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_sessions_elder ON call_sessions(elder_id, started_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_call_sessions_started ON call_sessions(started_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS transcript_lines (
+    id TEXT PRIMARY KEY,
+    call_session_id TEXT NOT NULL,
+    speaker TEXT NOT NULL,
+    speaker_name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_transcript_call ON transcript_lines(call_session_id, timestamp, id);
+
+CREATE TABLE IF NOT EXISTS village_actions (
+    id TEXT PRIMARY KEY,
+    call_session_id TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    urgency TEXT,
+    status TEXT NOT NULL,
+    initiated_at TEXT NOT NULL,
+    completed_at TEXT,
+    payload TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_village_actions_call ON village_actions(call_session_id, initiated_at);
+CREATE INDEX IF NOT EXISTS idx_village_actions_status ON village_actions(status, call_session_id, initiated_at);
+"""
+
+
+_UPSERT_CALL = """
+INSERT OR REPLACE INTO call_sessions
+    (id, elder_id, type, started_at, ended_at, duration_seconds, status, payload)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_LINE = """
+INSERT OR IGNORE INTO transcript_lines
+    (id, call_session_id, speaker, speaker_name, text, timestamp)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_ACTION = """
+INSERT OR REPLACE INTO village_actions
+    (id, call_session_id, action_type, urgency, status, initiated_at, completed_at, payload)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _encode_cursor(started_at: str, call_id: str) -> str:
+    return f"{started_at}|{call_id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    started_at, _, call_id = cursor.partition("|")
+    return started_at, call_id
+
+
+class CallStore:
+    """SQLite-backed store for calls, transcript lines and village actions"""
+
+    def __init__(self, path: str = CALL_STORE_PATH):
+        self.path = path
+        self.active: Dict[str, CallSession] = {}  # In-progress calls, mutated in place
+        self._lock = threading.Lock()
+        # One writer thread: async writes are applied in the order they were made
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="call-store")
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    # ------------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------------
+
+    def _track(self, call: CallSession):
+        if call.ended_at is None:
+            self.active[call.id] = call
+        else:
+            self.active.pop(call.id, None)
+
+    @staticmethod
+    def _call_row(call: CallSession) -> tuple:
+        return (
+            call.id,
+            call.elder_id,
+            call.type,
+            call.started_at.isoformat(),
+            call.ended_at.isoformat() if call.ended_at else None,
+            call.duration_seconds,
+            call.status.value if hasattr(call.status, "value") else call.status,
+            # Transcript lines live in their own table; never rewrite them as one blob
+            call.json(exclude={"transcript"})
+        )
+
+    def _write(self, sql: str, rows: List[tuple]):
+        with self._lock:
+            self._db.executemany(sql, rows)
+            self._db.commit()
+
+    async def _write_async(self, sql: str, rows: List[tuple]):
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._write, sql, rows)
+
+    def track(self, call: CallSession):
+        """Hold a call in the active set without writing it yet"""
+        self._track(call)
+
+    def save_call(self, call: CallSession):
+        """Insert or update a call; calls not yet ended stay in the active set"""
+        self._track(call)
+        self._write(_UPSERT_CALL, [self._call_row(call)])
+
+    async def save_call_async(self, call: CallSession):
+        """save_call() with the write on the store's writer thread"""
+        # An ended call leaves the active set only once written, so reads never see the older row
+        row = self._call_row(call)
+        if call.ended_at is None:
+            self.active[call.id] = call
+        await self._write_async(_UPSERT_CALL, [row])
+        self._track(call)
+
+    def get_call(self, call_id: str) -> Optional[CallSession]:
+        """Look up a call by id (active calls first)"""
+        if call_id in self.active:
+            return self.active[call_id]
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM call_sessions WHERE id = ?", (call_id,)
+            ).fetchone()
+        return CallSession.parse_raw(row[0]) if row else None
+
+    def list_calls(
+        self,
+        elder_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[CallSession], Optional[str]]:
+        """
+        Most recent calls first, optionally for one elder.
+
+        Returns the page and a cursor for the next page (None when exhausted).
+        """
+        clauses = []
+        params: list = []
+
+        if elder_id:
+            clauses.append("elder_id = ?")
+            params.append(elder_id)
+
+        if cursor:
+            started_at, call_id = _decode_cursor(cursor)
+            # Row-value comparison: a range seek on the index (an OR of the two cases scans it)
+            clauses.append("(started_at, id) < (?, ?)")
+            params.extend([started_at, call_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT id, started_at, payload FROM call_sessions
+                {where}
+                ORDER BY started_at DESC, id DESC
+                LIMIT ?
+                """,
+                params
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][1], rows[-1][0])
+
+        calls = [self.active.get(row[0]) or CallSession.parse_raw(row[2]) for row in rows]
+        return calls, next_cursor
+
+    # ------------------------------------------------------------------------
+    # Transcript lines
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _line_rows(call_id: str, lines: List[TranscriptLine]) -> List[tuple]:
+        return [
+            (line.id, call_id, line.speaker, line.speaker_name, line.text, line.timestamp.isoformat())
+            for line in lines
+        ]
+
+    def append_transcript_lines(self, call_id: str, lines: List[TranscriptLine]):
+        """Append a batch of transcript lines for a call in one transaction"""
+        self._write(_INSERT_LINE, self._line_rows(call_id, lines))
+
+    async def append_transcript_lines_async(self, call_id: str, lines: List[TranscriptLine]):
+        """append_transcript_lines() with the write on the store's writer thread"""
+        await self._write_async(_INSERT_LINE, self._line_rows(call_id, lines))
+
+    def get_transcript(
+        self,
+        call_id: str,
+        limit: int = 200,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[TranscriptLine], Optional[str]]:
+        """
+        A page of transcript lines in timestamp order.
+
+        Returns the page and a cursor for the next page (None when exhausted).
+        """
+        params: list = [call_id]
+        after = ""
+        if cursor:
+            timestamp, line_id = _decode_cursor(cursor)
+            after = "AND (timestamp, id) > (?, ?)"
+            params.extend([timestamp, line_id])
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT id, speaker, speaker_name, text, timestamp FROM transcript_lines
+                WHERE call_session_id = ? {after}
+                ORDER BY timestamp, id
+                LIMIT ?
+                """,
+                params
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][4], rows[-1][0])
+
+        lines = [
+            TranscriptLine(id=row[0], speaker=row[1], speaker_name=row[2], text=row[3], timestamp=row[4])
+            for row in rows
+        ]
+        return lines, next_cursor
+
+    # ------------------------------------------------------------------------
+    # Village actions
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _action_row(action: VillageAction) -> tuple:
+        return (
+            action.id,
+            action.call_session_id,
+            action.action_type,
+            action.urgency.value if hasattr(action.urgency, "value") else action.urgency,
+            action.status,
+            action.initiated_at.isoformat(),
+            action.completed_at.isoformat() if action.completed_at else None,
+            action.json()
+        )
+
+    def save_action(self, action: VillageAction):
+        """Insert or update a village action"""
+        self._write(_UPSERT_ACTION, [self._action_row(action)])
+
+    async def save_action_async(self, action: VillageAction):
+        """save_action() with the write on the store's writer thread"""
+        await self._write_async(_UPSERT_ACTION, [self._action_row(action)])
+
+    def list_actions(
+        self,
+        call_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[VillageAction]:
+        """Village actions in the order they were initiated, optionally filtered"""
+        clauses = []
+        params: list = []
+
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if call_id:
+            clauses.append("call_session_id = ?")
+            params.append(call_id)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.extend([limit, offset])
+
+        with self._lock:
+            rows = self._db.execute(
+                f"""
+                SELECT payload FROM village_actions
+                {where}
+                ORDER BY initiated_at
+                LIMIT ? OFFSET ?
+                """,
+                params
+            ).fetchall()
+        return [VillageAction.parse_raw(row[0]) for row in rows]
+
+    # ------------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------------
+
+    def clear(self):
+        """Delete all calls and actions (demo reset)"""
+        self.active.clear()
+        with self._lock:
+            self._db.execute("DELETE FROM call_sessions")
+            self._db.execute("DELETE FROM transcript_lines")
+            self._db.execute("DELETE FROM village_actions")
+            self._db.commit()
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._db.close()
+
+
+# Global store instance
+call_store = CallStore()
@@ -0,0 +1,614 @@
+"""
+Bulk scheduled check-in campaigns.
+
+A campaign is a cohort of elder ids and a time window. The dialer works
+through the cohort with `CreateSIPParticipantRequest`, within two limits:
+
+- A global cap on concurrent calls (ringing or in conversation), across all
+  campaigns. An answered call holds its slot until it ends: the elder hangs
+  up or the room closes (LiveKit `participant_left` / `room_finished`
+  webhooks, see `handle_livekit_event()`), or the call is ended through the
+  API (`call_ended()`). CAMPAIGN_MAX_CALL_SECONDS is only the backstop.
+- A calls-per-second token bucket per SIP trunk, so a morning burst doesn't
+  exceed what the carrier accepts.
+
+Unanswered (and busy) attempts are retried with jittered exponential backoff,
+as long as the retry still falls inside the window. An attempt whose outcome
+is unknown (the dial request timed out on our side, the leg may still
+connect) is reconciled against the call's state before it is dialed again,
+so an elder is never rung twice for one attempt. No new dials start after
+the window closes. Progress is broadcast over the WebSocket manager as
+`campaign_progress` events.
+
+Dialing goes through a `SipClient`: LiveKit SIP in production, a simulated
+client in demo mode, or any object with an async `dial()` in tests.
+"""
+
+import os
+import json
+import time
+import uuid
+import heapq
+import random
+import asyncio
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Protocol, Tuple
+
+from livekit import api
+
+from backend.models import Elder
+from backend.livekit_client import livekit_clients, LiveKitClientManager
+from backend.websocket_manager import ws_manager
+
+SIP_TRUNK_ID = os.environ.get("SIP_TRUNK_ID")
+
+CAMPAIGN_MAX_CONCURRENT_CALLS = int(os.environ.get("CAMPAIGN_MAX_CONCURRENT_CALLS", "20"))
+CAMPAIGN_MAX_ATTEMPTS = int(os.environ.get("CAMPAIGN_MAX_ATTEMPTS", "3"))
+CAMPAIGN_RETRY_BASE_SECONDS = float(os.environ.get("CAMPAIGN_RETRY_BASE_SECONDS", "300"))
+CAMPAIGN_MAX_CALL_SECONDS = float(os.environ.get("CAMPAIGN_MAX_CALL_SECONDS", "1800"))
+# How long a dialed call may ring, and how often its SIP call status is polled meanwhile
+CAMPAIGN_RING_SECONDS = float(os.environ.get("CAMPAIGN_RING_SECONDS", "45"))
+CAMPAIGN_POLL_SECONDS = float(os.environ.get("CAMPAIGN_POLL_SECONDS", "1"))
+# Default calls-per-second per trunk, and optional per-trunk overrides as JSON {"ST_xxx": 5}
+SIP_TRUNK_CPS = float(os.environ.get("SIP_TRUNK_CPS", "1"))
+SIP_TRUNK_CPS_LIMITS: Dict[str, float] = json.loads(os.environ.get("SIP_TRUNK_CPS_LIMITS") or "{}")
+
+# Outcomes of one dial attempt
+ANSWERED = "answered"
+NO_ANSWER = "no_answer"
+BUSY = "busy"
+FAILED = "failed"
+UNKNOWN = "unknown"  # The dial request timed out; the call may or may not have connected
+RETRYABLE_OUTCOMES = (NO_ANSWER, BUSY, UNKNOWN)
+
+# SIP response codes for a callee that didn't pick up / was busy
+_NO_ANSWER_SIP_CODES = {408, 480, 487}
+_BUSY_SIP_CODES = {486, 600}
+
+
+@dataclass
+class DialRequest:
+    room_name: str
+    phone: str
+    trunk_id: str
+    participant_identity: str
+    participant_name: str
+
+
+@dataclass
+class DialResult:
+    outcome: str                          # answered | no_answer | busy | failed | unknown
+    detail: Optional[str] = None
+    # Known call length (simulated calls); None means the call lasts until call_ended()
+    call_seconds: Optional[float] = None
+
+
+class SipClient(Protocol):
+    async def dial(self, request: DialRequest) -> DialResult: ...
+
+    async def reconcile(self, request: DialRequest) -> DialResult:
+        """
+        Settle an attempt that ended UNKNOWN: ANSWERED if the call is connected,
+        NO_ANSWER once it's certain there is no call leg, UNKNOWN if that can't be told
+        """
+        ...
+
+
+class LiveKitSipClient:
+    """
+    Dials through LiveKit SIP and follows the call until the callee answers or
+    the call fails. The SIP participant is created without waiting for the
+    answer, and its call status is then polled, so the shared LiveKit client is
+    only borrowed for short requests while the phone rings.
+    """
+
+    def __init__(
+        self,
+        clients: LiveKitClientManager = livekit_clients,
+        ring_seconds: float = CAMPAIGN_RING_SECONDS,
+        poll_seconds: float = CAMPAIGN_POLL_SECONDS
+    ):
+        self.clients = clients
+        self.ring_seconds = ring_seconds
+        self.poll_seconds = poll_seconds
+
+    async def dial(self, request: DialRequest) -> DialResult:
+        try:
+            async with self.clients.acquire() as lk_api:
+                await lk_api.sip.create_sip_participant(api.CreateSIPParticipantRequest(
+                    sip_trunk_id=request.trunk_id,
+                    sip_call_to=request.phone,
+                    room_name=request.room_name,
+                    participant_identity=request.participant_identity,
+                    participant_name=request.participant_name,
+                ))
+        except asyncio.TimeoutError:
+            # Our request timed out, not the call: follow the leg if it's there. If it
+            # isn't (yet), the dialer reconciles again before this elder is dialed again
+            try:
+                status = await self._call_status(request)
+            except Exception:
+                status = None
+            if status is None:
+                return DialResult(UNKNOWN, "Dial request timed out")
+            return await self._follow(request)
+        except Exception as e:
+            return self._error_result(e)
+        return await self._follow(request)
+
+    async def reconcile(self, request: DialRequest) -> DialResult:
+        try:
+            status = await self._call_status(request)
+        except Exception as e:
+            return DialResult(UNKNOWN, f"Call state unavailable: {e}")
+        if status is None:
+            return DialResult(NO_ANSWER, "No call leg in the room")
+        return await self._follow(request)
+
+    async def _follow(self, request: DialRequest) -> DialResult:
+        """Poll the SIP participant until it's answered, gone, or has rung for ring_seconds"""
+        deadline = time.monotonic() + self.ring_seconds
+        while True:
+            try:
+                status = await self._call_status(request)
+            except Exception as e:
+                return self._error_result(e)
+            if status == "active":
+                return DialResult(ANSWERED)
+            if status in (None, "hangup"):
+                return DialResult(NO_ANSWER, "Call ended before it was answered")
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(self.poll_seconds)
+
+        try:
+            async with self.clients.acquire() as lk_api:
+                await lk_api.room.remove_participant(api.RoomParticipantIdentity(
+                    room=request.room_name, identity=request.participant_identity
+                ))
+        except Exception as e:
+            if not _is_not_found(e):
+                # The leg may still connect; don't let it be dialed again blindly
+                return DialResult(UNKNOWN, f"Ringing timed out, hangup failed: {e}")
+        return DialResult(NO_ANSWER, "Ringing timed out")
+
+    async def _call_status(self, request: DialRequest) -> Optional[str]:
+        """The participant's sip.callStatus (dialing, ringing, active, hangup), or None if it's gone"""
+        try:
+            async with self.clients.acquire() as lk_api:
+                participant = await lk_api.room.get_participant(api.RoomParticipantIdentity(
+                    room=request.room_name, identity=request.participant_identity
+                ))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+        return participant.attributes.get("sip.callStatus", "dialing")
+
+    @staticmethod
+    def _error_result(error: Exception) -> DialResult:
+        if isinstance(error, asyncio.TimeoutError):
+            return DialResult(UNKNOWN, "LiveKit request timed out")
+        metadata = getattr(error, "metadata", None) or {}
+        try:
+            sip_code = int(metadata.get("sip_status_code", 0))
+        except (TypeError, ValueError):
+            sip_code = 0
+        if sip_code in _NO_ANSWER_SIP_CODES:
+            return DialResult(NO_ANSWER, f"SIP {sip_code}")
+        if sip_code in _BUSY_SIP_CODES:
+            return DialResult(BUSY, f"SIP {sip_code}")
+        return DialResult(FAILED, str(error))
+
+
+def _is_not_found(error: Exception) -> bool:
+    return getattr(error, "code", None) == "not_found"
+
+
+class SimulatedSipClient:
+    """Demo-mode dialer (LiveKit not configured): rings briefly, some calls go unanswered"""
+
+    def __init__(self, answer_rate: float = 0.8, ring_seconds: float = 2.0, call_seconds: float = 10.0):
+        self.answer_rate = answer_rate
+        self.ring_seconds = ring_seconds
+        self.call_seconds = call_seconds
+
+    async def dial(self, request: DialRequest) -> DialResult:
+        await asyncio.sleep(random.uniform(0.5, 1.0) * self.ring_seconds)
+        if random.random() < self.answer_rate:
+            return DialResult(ANSWERED, call_seconds=self.call_seconds)
+        return DialResult(NO_ANSWER, "Simulated no answer")
+
+    async def reconcile(self, request: DialRequest) -> DialResult:
+        return DialResult(NO_ANSWER, "Simulated calls never end unknown")
+
+
+class TokenBucket:
+    """Calls-per-second limiter; `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class Campaign:
+    id: str
+    elder_ids: List[str]
+    start_at: datetime
+    end_at: datetime
+    trunk_id: str
+    max_attempts: int
+    status: str = "scheduled"  # scheduled | running | completed | cancelled
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    # Per elder: status (pending | dialing | retry_scheduled | answered | unreachable | failed
+    # | unknown | window_closed | cancelled | not_found), attempts, last outcome and call info
+    targets: Dict[str, Dict] = field(default_factory=dict)
+    _counts: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        for target in self.targets.values():
+            self._counts[target["status"]] = self._counts.get(target["status"], 0) + 1
+
+    def set_status(self, elder_id: str, status: str):
+        """Update a target's status, keeping the per-status counts current"""
+        target = self.targets[elder_id]
+        self._counts[target["status"]] -= 1
+        self._counts[status] = self._counts.get(status, 0) + 1
+        target["status"] = status
+
+    def counts(self) -> Dict[str, int]:
+        return {status: count for status, count in self._counts.items() if count}
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "trunk_id": self.trunk_id,
+            "start_at": self.start_at.isoformat(),
+            "end_at": self.end_at.isoformat(),
+            "max_attempts": self.max_attempts,
+            "total": len(self.elder_ids),
+            "counts": self.counts(),
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+ElderLookup = Callable[[str], Awaitable[Optional[Elder]]]
+AnsweredHook = Callable[[Elder, DialRequest], Awaitable[None]]
+
+
+class CampaignDialer:
+    """Runs check-in campaigns under a global call cap and per-trunk CPS limits"""
+
+    def __init__(
+        self,
+        sip_client: SipClient,
+        elder_lookup: ElderLookup,
+        on_answered: Optional[AnsweredHook] = None,
+        max_concurrent_calls: int = CAMPAIGN_MAX_CONCURRENT_CALLS,
+        retry_base_seconds: float = CAMPAIGN_RETRY_BASE_SECONDS,
+        max_call_seconds: float = CAMPAIGN_MAX_CALL_SECONDS
+    ):
+        self.sip_client = sip_client
+        self.elder_lookup = elder_lookup
+        self.on_answered = on_answered
+        self.max_concurrent_calls = max_concurrent_calls
+        self.retry_base_seconds = retry_base_seconds
+        self.max_call_seconds = max_call_seconds
+        self.campaigns: Dict[str, Campaign] = {}
+        self._slots = asyncio.Semaphore(max_concurrent_calls)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._runners: Dict[str, asyncio.Task] = {}
+        # room_name -> (resolved by call_ended(), identity of the elder's SIP participant)
+        self._hangups: Dict[str, Tuple[asyncio.Future, str]] = {}
+        # (campaign_id, elder_id) -> request of an attempt that ended UNKNOWN, reconciled before the retry.
+        # Kept off the target dicts, which are broadcast to dashboards
+        self._unsettled: Dict[Tuple[str, str], DialRequest] = {}
+        self._active_calls = 0
+        self.stats = {"dials": 0, "answered": 0, "retries": 0, "reconciled": 0}
+
+    # ------------------------------------------------------------------------
+    # Campaigns
+    # ------------------------------------------------------------------------
+
+    def create(
+        self,
+        elder_ids: List[str],
+        start_at: Optional[datetime] = None,
+        end_at: Optional[datetime] = None,
+        trunk_id: Optional[str] = None,
+        max_attempts: int = CAMPAIGN_MAX_ATTEMPTS
+    ) -> Campaign:
+        """Create a campaign and start its runner (it waits for `start_at`); times are UTC"""
+        start_at = start_at or datetime.utcnow()
+        end_at = end_at or start_at.replace(hour=23, minute=59, second=59)
+        if end_at <= start_at:
+            raise ValueError("Campaign window ends before it starts")
+
+        trunk_id = trunk_id or SIP_TRUNK_ID or "default"
+        elder_ids = list(dict.fromkeys(elder_ids))  # Dial each elder once per campaign
+        campaign = Campaign(
+            id=str(uuid.uuid4()),
+            elder_ids=elder_ids,
+            start_at=start_at,
+            end_at=end_at,
+            trunk_id=trunk_id,
+            max_attempts=max_attempts,
+            targets={
+                elder_id: {"status": "pending", "attempts": 0, "last_outcome": None, "room_name": None}
+                for elder_id in elder_ids
+            }
+        )
+        self.campaigns[campaign.id] = campaign
+        self._runners[campaign.id] = asyncio.create_task(self._run(campaign))
+        return campaign
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        return self.campaigns.get(campaign_id)
+
+    async def cancel(self, campaign_id: str) -> Optional[Campaign]:
+        """Stop dialing; calls already in conversation continue"""
+        campaign = self.campaigns.get(campaign_id)
+        if not campaign:
+            return None
+        runner = self._runners.pop(campaign_id, None)
+        if runner and not runner.done():
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+        if campaign.status in ("scheduled", "running"):
+            campaign.status = "cancelled"
+            for elder_id, target in campaign.targets.items():
+                if target["status"] in ("pending", "dialing", "retry_scheduled"):
+                    campaign.set_status(elder_id, "cancelled")
+            await self._emit(campaign)
+        return campaign
+
+    async def stop(self):
+        """Cancel all running campaigns (app shutdown)"""
+        for campaign_id in list(self._runners):
+            await self.cancel(campaign_id)
+
+    def call_ended(self, room_name: str, participant_identity: Optional[str] = None) -> bool:
+        """
+        Release the concurrency slot held by an answered campaign call. With a
+        participant identity, only that participant leaving ends the call (the
+        elder's SIP leg, not the agent). True if a slot was released.
+        """
+        hangup, sip_identity = self._hangups.get(room_name, (None, None))
+        if hangup is None or hangup.done():
+            return False
+        if participant_identity is not None and participant_identity != sip_identity:
+            return False
+        hangup.set_result(None)
+        return True
+
+    def handle_livekit_event(self, event) -> bool:
+        """Webhook hook: the elder hung up (participant_left) or the room closed (room_finished)"""
+        if event.event == "room_finished":
+            return self.call_ended(event.room.name)
+        if event.event == "participant_left":
+            return self.call_ended(event.room.name, event.participant.identity)
+        return False
+
+    def metrics(self) -> Dict:
+        return {
+            "campaigns": {status: sum(1 for c in self.campaigns.values() if c.status == status)
+                          for status in ("scheduled", "running", "completed", "cancelled")},
+            "active_calls": self._active_calls,
+            "max_concurrent_calls": self.max_concurrent_calls,
+            "trunk_cps": {trunk: bucket.rate for trunk, bucket in self._buckets.items()},
+            **self.stats
+        }
+
+    # ------------------------------------------------------------------------
+    # Dialing
+    # ------------------------------------------------------------------------
+
+    def _bucket(self, trunk_id: str) -> TokenBucket:
+        bucket = self._buckets.get(trunk_id)
+        if bucket is None:
+            bucket = TokenBucket(float(SIP_TRUNK_CPS_LIMITS.get(trunk_id, SIP_TRUNK_CPS)))
+            self._buckets[trunk_id] = bucket
+        return bucket
+
+    def _retry_delay(self, attempt: int) -> float:
+        return self.retry_base_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+    async def _run(self, campaign: Campaign):
+        delay = (campaign.start_at - datetime.utcnow()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        campaign.status = "running"
+        await self._emit(campaign)
+
+        # (due monotonic time, sequence, elder_id); retries are pushed back in by attempt tasks
+        now = time.monotonic()
+        queue = [(now, index, elder_id) for index, elder_id in enumerate(campaign.elder_ids)]
+        sequence = len(queue)
+        wake = asyncio.Event()
+        attempts: set = set()
+
+        def window_left() -> float:
+            return (campaign.end_at - datetime.utcnow()).total_seconds()
+
+        def schedule_retry(elder_id: str, delay: float):
+            nonlocal sequence
+            sequence += 1
+            heapq.heappush(queue, (time.monotonic() + delay, sequence, elder_id))
+            wake.set()
+
+        try:
+            while queue or attempts:
+                if window_left() <= 0:
+                    break
+                if not queue or queue[0][0] > time.monotonic():
+                    timeout = min(queue[0][0] - time.monotonic(), window_left()) if queue else window_left()
+                    wake.clear()
+                    try:
+                        await asyncio.wait_for(wake.wait(), timeout=max(timeout, 0))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                _, _, elder_id = heapq.heappop(queue)
+                await self._slots.acquire()
+                try:
+                    await self._bucket(campaign.trunk_id).acquire()
+                except BaseException:
+                    self._slots.release()
+                    raise
+                if window_left() <= 0:
+                    self._slots.release()
+                    heapq.heappush(queue, (time.monotonic(), 0, elder_id))
+                    break
+
+                task = asyncio.create_task(self._attempt(campaign, elder_id, schedule_retry))
+                attempts.add(task)
+                task.add_done_callback(lambda t: (attempts.discard(t), wake.set()))
+
+            # Window closed: nothing new is dialed; calls already placed finish normally
+            if attempts:
+                await asyncio.gather(*attempts, return_exceptions=True)
+            for _, _, elder_id in queue:
+                campaign.set_status(elder_id, "window_closed")
+            campaign.status = "completed"
+            await self._emit(campaign)
+        except asyncio.CancelledError:
+            for task in attempts:
+                task.cancel()
+            raise
+        finally:
+            self._runners.pop(campaign.id, None)
+            for elder_id in campaign.elder_ids:
+                self._unsettled.pop((campaign.id, elder_id), None)
+
+    async def _attempt(self, campaign: Campaign, elder_id: str, schedule_retry):
+        """One dial attempt; holds a concurrency slot (acquired by the runner) until the call is over"""
+        target = campaign.targets[elder_id]
+        self._active_calls += 1
+        try:
+            elder = await self.elder_lookup(elder_id)
+            if elder is None or not elder.phone:
+                campaign.set_status(elder_id, "not_found")
+                target["last_outcome"] = "Elder not found" if elder is None else "No phone number"
+                await self._emit(campaign, elder_id)
+                return
+
+            # The previous attempt ended unknown: settle it before ringing the elder again
+            unsettled = self._unsettled.pop((campaign.id, elder_id), None)
+            result = None
+            if unsettled is not None:
+                self.stats["reconciled"] += 1
+                result = await self._call_sip(self.sip_client.reconcile, unsettled)
+                if result.outcome == UNKNOWN:
+                    campaign.set_status(elder_id, "unknown")
+                    target["last_outcome"] = f"{result.outcome}: {result.detail}"
+                    await self._emit(campaign, elder_id)
+                    return
+                request = unsettled
+                if result.outcome != ANSWERED:
+                    result = None  # No call leg: safe to dial again
+
+            if result is None:
+                target["attempts"] += 1
+                campaign.set_status(elder_id, "dialing")
+                target["room_name"] = f"call_{uuid.uuid4().hex[:8]}"
+                await self._emit(campaign, elder_id)
+
+                phone = elder.phone if elder.phone.startswith("+") else "+" + elder.phone
+                request = DialRequest(
+                    room_name=target["room_name"],
+                    phone=phone,
+                    trunk_id=campaign.trunk_id,
+                    participant_identity=f"elder_{elder.id}",
+                    participant_name=elder.name,
+                )
+                self.stats["dials"] += 1
+                result = await self._call_sip(self.sip_client.dial, request)
+            target["last_outcome"] = result.outcome if not result.detail else f"{result.outcome}: {result.detail}"
+
+            if result.outcome == ANSWERED:
+                self.stats["answered"] += 1
+                campaign.set_status(elder_id, "answered")
+                await self._emit(campaign, elder_id)
+                await self._hold_until_hangup(elder, request, result)
+                return
+
+            retry_in = self._retry_delay(target["attempts"])
+            if (result.outcome in RETRYABLE_OUTCOMES and target["attempts"] < campaign.max_attempts
+                    and (campaign.end_at - datetime.utcnow()).total_seconds() > retry_in):
+                self.stats["retries"] += 1
+                campaign.set_status(elder_id, "retry_scheduled")
+                target["retry_in_seconds"] = round(retry_in, 1)
+                if result.outcome == UNKNOWN:
+                    self._unsettled[(campaign.id, elder_id)] = request
+                schedule_retry(elder_id, retry_in)
+            elif result.outcome == UNKNOWN:
+                campaign.set_status(elder_id, "unknown")
+            else:
+                campaign.set_status(elder_id, "unreachable" if result.outcome in RETRYABLE_OUTCOMES else "failed")
+            await self._emit(campaign, elder_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ [Campaign] Attempt for {elder_id} failed: {e}")
+            traceback.print_exc()
+            campaign.set_status(elder_id, "failed")
+            target["last_outcome"] = str(e)
+        finally:
+            self._active_calls -= 1
+            self._slots.release()
+
+    @staticmethod
+    async def _call_sip(method, request: DialRequest) -> DialResult:
+        try:
+            return await method(request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return DialResult(FAILED, str(e))
+
+    async def _hold_until_hangup(self, elder: Elder, request: DialRequest, result: DialResult):
+        hangup = asyncio.get_running_loop().create_future()
+        self._hangups[request.room_name] = (hangup, request.participant_identity)
+        try:
+            if self.on_answered:
+                try:
+                    await self.on_answered(elder, request)
+                except Exception as e:
+                    print(f"⚠️  [Campaign] on_answered hook failed for {request.room_name}: {e}")
+            if result.call_seconds is not None:
+                await asyncio.sleep(result.call_seconds)
+            else:
+                await asyncio.wait_for(hangup, timeout=self.max_call_seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._hangups.pop(request.room_name, None)
+
+    async def _emit(self, campaign: Campaign, elder_id: Optional[str] = None):
+        data = campaign.summary()
+        if elder_id:
+            data["target"] = {"elder_id": elder_id, **campaign.targets[elder_id]}
+        try:
+            await ws_manager.emit_campaign_progress(campaign.id, data)
+        except Exception as e:
+            print(f"⚠️  [Campaign] Progress broadcast failed: {e}")
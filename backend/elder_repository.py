@@ -0,0 +1,221 @@
+"""
+Elder profile repository.
+
+Elders are loaded from the `elders` table together with their
+`village_members` and `profile_facts`. This is one PostgREST query with
+embedded relations. Loaded profiles sit in an in-memory LRU with a TTL, so the
+hot paths (every transcript chunk, every campaign dial) resolve an elder from
+memory instead of making a database round trip per utterance. Lookups of
+unknown ids are cached briefly as well. Concurrent misses for the same elder
+share one load.
+
+Profile edits go through `update()`, which writes the row and then invalidates
+the cached entry. Facts learned during a call are added with
+`add_profile_facts()`, which persists them and appends them to the cached
+profile. The demo profile (Margaret) is always available, with or without a
+database.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from backend.database import supabase
+from backend.persistence import db_writer
+from backend.models import Elder, MedicalInfo, ProfileFact, VillageMember, WellbeingBaseline
+from backend.margaret import margaret_elder
+
+ELDER_CACHE_MAX_ENTRIES = int(os.environ.get("ELDER_CACHE_MAX_ENTRIES", "1024"))
+ELDER_CACHE_TTL_SECONDS = float(os.environ.get("ELDER_CACHE_TTL_SECONDS", "300"))
+# Unknown ids are remembered for a shorter time so a newly added elder shows up quickly
+ELDER_CACHE_MISS_TTL_SECONDS = float(os.environ.get("ELDER_CACHE_MISS_TTL_SECONDS", "30"))
+
+ELDER_SELECT = "*, village_members(*), profile_facts(*)"
+
+_MEMBER_FIELDS = ("name", "role", "relationship", "phone", "availability", "notes")
+_FACT_FIELDS = ("fact", "category", "context", "learned_at", "source_call_id")
+_ELDER_FIELDS = ("name", "age", "phone", "photo_url", "address")
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def elder_from_row(row: Dict) -> Elder:
+    """Build an Elder from an `elders` row with embedded village_members and profile_facts"""
+    facts = sorted(row.get("profile_facts") or [], key=lambda f: f.get("learned_at") or "")
+    return Elder(
+        id=str(row["id"]),
+        **{name: row.get(name) for name in _ELDER_FIELDS},
+        medical=MedicalInfo(**(row.get("medical_info") or {})),
+        wellbeing_baseline=WellbeingBaseline(**(row.get("wellbeing_baseline") or {})),
+        organization_id=str(row["organization_id"]) if row.get("organization_id") else None,
+        village=[
+            VillageMember(id=str(m["id"]), **{name: m.get(name) for name in _MEMBER_FIELDS})
+            for m in row.get("village_members") or []
+        ],
+        profile=[
+            ProfileFact(
+                id=str(f["id"]),
+                **{name: f.get(name) for name in _FACT_FIELDS if f.get(name) is not None}
+            )
+            for f in facts
+        ],
+    )
+
+
+class ElderRepository:
+    """Read-through LRU + TTL cache of elder profiles over Supabase"""
+
+    def __init__(
+        self,
+        max_entries: int = ELDER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ELDER_CACHE_TTL_SECONDS,
+        miss_ttl_seconds: float = ELDER_CACHE_MISS_TTL_SECONDS,
+        demo_elders: Optional[Dict[str, Elder]] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        # Demo profiles by id and alias; served without the database
+        self.demo_elders = demo_elders or {}
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # elder_id -> (expires_at, elder or None)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "deduplicated": 0, "evictions": 0, "invalidations": 0}
+
+    # ------------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------------
+
+    def _cached(self, elder_id: str):
+        """(True, elder-or-None) on a live cache entry, (False, None) otherwise"""
+        entry = self._entries.get(elder_id)
+        if entry is None:
+            return False, None
+        expires_at, elder = entry
+        if time.monotonic() > expires_at:
+            del self._entries[elder_id]
+            return False, None
+        self._entries.move_to_end(elder_id)
+        return True, elder
+
+    def _remember(self, elder_id: str, elder: Optional[Elder]):
+        ttl = self.ttl_seconds if elder is not None else self.miss_ttl_seconds
+        self._entries[elder_id] = (time.monotonic() + ttl, elder)
+        self._entries.move_to_end(elder_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get(self, elder_id: str) -> Optional[Elder]:
+        """Return the elder's profile (from memory when cached), or None if unknown"""
+        demo = self.demo_elders.get(elder_id)
+        if demo is not None:
+            self.stats["hits"] += 1
+            return demo
+
+        hit, elder = self._cached(elder_id)
+        if hit:
+            self.stats["hits"] += 1
+            return elder
+
+        task = self._in_flight.get(elder_id)
+        if task is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            # The load runs in its own task: a caller that is cancelled only stops waiting
+            self.stats["misses"] += 1
+            task = asyncio.create_task(self._fetch(elder_id))
+            self._in_flight[elder_id] = task
+            task.add_done_callback(lambda done: self._fetch_finished(elder_id, done))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, elder_id: str) -> Optional[Elder]:
+        elder = await asyncio.to_thread(self._load, elder_id)
+        # Don't cache a load that an invalidate() overtook
+        if self._in_flight.get(elder_id) is asyncio.current_task():
+            self._remember(elder_id, elder)
+        return elder
+
+    def _fetch_finished(self, elder_id: str, task: asyncio.Task):
+        if self._in_flight.get(elder_id) is task:
+            del self._in_flight[elder_id]
+        if not task.cancelled():
+            task.exception()
+
+    def _load(self, elder_id: str) -> Optional[Elder]:
+        if not supabase or not _is_uuid(elder_id):
+            return None
+        self.stats["loads"] += 1
+        result = supabase.table("elders").select(ELDER_SELECT).eq("id", elder_id).limit(1).execute()
+        return elder_from_row(result.data[0]) if result.data else None
+
+    # ------------------------------------------------------------------------
+    # Writes and invalidation
+    # ------------------------------------------------------------------------
+
+    def invalidate(self, elder_id: Optional[str] = None):
+        """Drop one elder (or everything) from the cache; the next read reloads it"""
+        if elder_id is None:
+            self._entries.clear()
+            self._in_flight.clear()
+        else:
+            self._entries.pop(elder_id, None)
+            self._in_flight.pop(elder_id, None)
+        self.stats["invalidations"] += 1
+
+    async def update(self, elder_id: str, fields: Dict) -> Optional[Elder]:
+        """Update an elder's own columns, invalidate the cached profile and return the fresh one"""
+        if elder_id in self.demo_elders:
+            demo = self.demo_elders[elder_id]
+            for name, value in fields.items():
+                setattr(demo, name, value)
+            return demo
+        if not supabase or not _is_uuid(elder_id):
+            return None
+
+        row = {**fields, "updated_at": datetime.utcnow().isoformat()}
+        await asyncio.to_thread(lambda: supabase.table("elders").update(row).eq("id", elder_id).execute())
+        self.invalidate(elder_id)
+        return await self.get(elder_id)
+
+    async def add_profile_facts(self, elder: Elder, facts: List[ProfileFact]):
+        """Record facts learned during a call on the elder's profile (cached copy and database)"""
+        if not facts:
+            return
+        known = {fact.id for fact in elder.profile}
+        new_facts = [fact for fact in facts if fact.id not in known]
+        elder.profile.extend(new_facts)
+
+        if elder.id in self.demo_elders or not _is_uuid(elder.id):
+            return
+        for fact in new_facts:
+            await db_writer.insert("profile_facts", {
+                "id": fact.id,
+                "elder_id": elder.id,
+                "fact": fact.fact,
+                "category": fact.category,
+                "context": fact.context,
+                "learned_at": fact.learned_at.isoformat(),
+                "source_call_id": fact.source_call_id,
+            })
+
+    def metrics(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global repository; the demo profile is reachable by id and by the "margaret" alias
+elder_repository = ElderRepository(demo_elders={margaret_elder.id: margaret_elder, "margaret": margaret_elder})
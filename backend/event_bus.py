@@ -0,0 +1,258 @@
+"""
+Pub/sub backbone for WebSocket fan-out across workers and nodes.
+
+ConnectionManager does not hand events straight to its sockets. It publishes
+them on an event bus, and every worker subscribed to the bus delivers each
+event to its own local connections. The worker that published the event is
+one of them. With several uvicorn workers, or several hosts, a transcript
+posted to worker A therefore also reaches dashboards connected to worker B.
+
+Backends (WS_EVENT_BUS):
+- "memory" (default): in-process. `publish()` delivers immediately, which is
+  all a single worker needs.
+- "redis": one Redis pub/sub channel (WS_REDIS_CHANNEL on WS_REDIS_URL). It
+  needs the `redis` package (redis.asyncio). Tests can pass any compatible
+  client, e.g. fakeredis.
+
+Ordering: each worker publishes through a single FIFO publisher task, in
+pipelined batches, and Redis delivers a channel's messages to every subscriber
+in the order it received them. Events for a call, such as transcript_update
+and concern_detected, therefore arrive in emit order and in the same order on
+every worker, even when two workers publish for the same call. The publisher
+also carries call bookkeeping (which elder and organization a call belongs to,
+and when it is forgotten) on the same channel, so that bookkeeping is applied
+in order with the events.
+
+Redis pub/sub is fire-and-forget. Events published while a worker is
+reconnecting are lost, which is acceptable for live dashboard updates; the
+persisted call data remains the source of truth.
+
+Local fallback: while a worker isn't subscribed to the channel (Redis down or
+still connecting), its own events are delivered straight to its own
+connections instead of being published, so they still arrive there exactly
+once; other workers miss them, as with any Redis outage. If WS_EVENT_BUS=redis
+but the `redis` package isn't installed, the in-process bus is used.
+"""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from backend.event_encoding import EncodedEvent, decode_json, encode_json
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+WS_EVENT_BUS = os.environ.get("WS_EVENT_BUS", "memory")
+WS_REDIS_URL = os.environ.get("WS_REDIS_URL", os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+WS_REDIS_CHANNEL = os.environ.get("WS_REDIS_CHANNEL", "village:ws")
+# Outbound events buffered while Redis is slow or unreachable; beyond this the oldest are dropped
+WS_BUS_QUEUE_SIZE = int(os.environ.get("WS_BUS_QUEUE_SIZE", "10000"))
+WS_BUS_BATCH_SIZE = int(os.environ.get("WS_BUS_BATCH_SIZE", "256"))
+
+# Message kinds
+TO_ALL = "all"        # event for every connection
+TO_CALL = "call"      # event for a call's subscribers (incl. elder/org wildcards)
+FORGET_CALL = "forget"  # call finished: stop routing it to wildcard subscribers
+
+
+@dataclass
+class BusMessage:
+    kind: str
+    event: Optional[EncodedEvent] = None
+    call_id: Optional[str] = None
+    # Set on call_started, so every worker learns the call's elder and organization
+    elder_id: Optional[str] = None
+    org_id: Optional[str] = None
+
+    def pack(self) -> str:
+        """Header line + the event's JSON frame (reused as-is by JSON clients on the receiving side)"""
+        header = encode_json({"k": self.kind, "c": self.call_id, "e": self.elder_id, "g": self.org_id})
+        return header + "\n" + (self.event.frame("json") if self.event else "")
+
+    @classmethod
+    def unpack(cls, data) -> "BusMessage":
+        if isinstance(data, bytes):
+            data = data.decode()
+        header, _, frame = data.partition("\n")
+        fields = decode_json(header)
+        return cls(
+            kind=fields["k"],
+            event=EncodedEvent.from_json(frame) if frame else None,
+            call_id=fields.get("c"),
+            elder_id=fields.get("e"),
+            org_id=fields.get("g"),
+        )
+
+
+Handler = Callable[[BusMessage], None]
+
+
+class InProcessEventBus:
+    """Single-worker bus: publish() delivers to the local handler right away"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+        self.published = 0
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+
+    async def publish(self, message: BusMessage):
+        self.published += 1
+        if self._handler:
+            self._handler(message)
+
+    async def aclose(self):
+        self._handler = None
+
+    def metrics(self) -> Dict:
+        return {"backend": self.name, "published": self.published}
+
+
+class RedisEventBus:
+    """Multi-worker bus over one Redis pub/sub channel"""
+
+    name = "redis"
+
+    def __init__(self, url: str = WS_REDIS_URL, channel: str = WS_REDIS_CHANNEL, client=None,
+                 queue_size: int = WS_BUS_QUEUE_SIZE, batch_size: int = WS_BUS_BATCH_SIZE):
+        self.url = url
+        self.channel = channel
+        self.batch_size = batch_size
+        self._client = client
+        self._owns_client = client is None
+        self._handler: Optional[Handler] = None
+        self._outbound: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self._tasks = []
+        self._subscribed = False
+        self.stats = {"published": 0, "received": 0, "dropped": 0, "publish_errors": 0,
+                      "reconnects": 0, "bad_messages": 0, "delivered_locally": 0}
+
+    async def start(self, handler: Handler):
+        if self._client is None:
+            if aioredis is None:
+                raise RuntimeError("WS_EVENT_BUS=redis needs the 'redis' package (pip install redis)")
+            self._client = aioredis.from_url(self.url)
+        self._handler = handler
+        self._tasks = [
+            asyncio.create_task(self._publisher()),
+            asyncio.create_task(self._subscriber()),
+        ]
+        print(f"📡 WebSocket event bus: redis channel '{self.channel}'")
+
+    async def publish(self, message: BusMessage):
+        """Queue for the publisher task (never waits on Redis); local delivery only while unsubscribed"""
+        if not self._subscribed:
+            # Our own copy wouldn't come back from Redis, so deliver it here and not publish it
+            self.stats["delivered_locally"] += 1
+            self._handle(message)
+            return
+        packed = message.pack()
+        try:
+            self._outbound.put_nowait(packed)
+        except asyncio.QueueFull:
+            self._outbound.get_nowait()
+            self._outbound.put_nowait(packed)
+            self.stats["dropped"] += 1
+
+    async def _publisher(self):
+        """Single FIFO publisher: batches go out pipelined, in queue order, retried until sent"""
+        delay = 0.5
+        while True:
+            batch = [await self._outbound.get()]
+            while len(batch) < self.batch_size and not self._outbound.empty():
+                batch.append(self._outbound.get_nowait())
+            while True:
+                try:
+                    pipe = self._client.pipeline(transaction=False)
+                    for packed in batch:
+                        pipe.publish(self.channel, packed)
+                    await pipe.execute()
+                    self.stats["published"] += len(batch)
+                    delay = 0.5
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats["publish_errors"] += 1
+                    logger.error(f"Event bus publish failed, retrying in {delay:.1f}s: {e!r}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 10.0)
+
+    async def _subscriber(self):
+        delay = 0.5
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self._subscribed = True
+                delay = 0.5
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message.get("type") != "message":
+                        continue
+                    self._deliver(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._subscribed = False
+                self.stats["reconnects"] += 1
+                logger.error(f"Event bus subscription lost, delivering locally; reconnecting in {delay:.1f}s: {e!r}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10.0)
+            finally:
+                self._subscribed = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _deliver(self, data):
+        try:
+            message = BusMessage.unpack(data)
+        except Exception as e:
+            self.stats["bad_messages"] += 1
+            logger.error(f"Dropping malformed event bus message: {e!r}")
+            return
+        self.stats["received"] += 1
+        self._handle(message)
+
+    def _handle(self, message: BusMessage):
+        if self._handler:
+            try:
+                self._handler(message)
+            except Exception as e:
+                logger.error(f"Event bus handler failed: {e!r}")
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> Dict:
+        return {"backend": self.name, "channel": self.channel, "subscribed": self._subscribed,
+                "queued": self._outbound.qsize(), **self.stats}
+
+
+def create_event_bus(backend: str = WS_EVENT_BUS):
+    if backend == "redis":
+        if aioredis is None:
+            logger.warning("WS_EVENT_BUS=redis but the 'redis' package isn't installed; using the in-process bus")
+            return InProcessEventBus()
+        return RedisEventBus()
+    if backend != "memory":
+        raise ValueError(f"Unknown WS_EVENT_BUS '{backend}' (expected 'memory' or 'redis')")
+    return InProcessEventBus()
@@ -0,0 +1,114 @@
+"""
+Event encoding for WebSocket fan-out.
+
+An event (`{"type": ..., "data": ...}`) is wrapped in an `EncodedEvent`. It is
+encoded at most once per wire format, and that frame is shared by every
+subscriber. The wire formats are:
+
+- "json": a text frame, the default, and what the dashboard speaks. It uses
+  orjson when installed and falls back to the standard json module.
+- "msgpack": a binary frame, for clients that ask for it when they connect
+  (`/ws?encoding=msgpack`). It is only offered when msgpack is installed.
+
+Event data may be a dict or a pydantic model. Models, datetimes, enums and
+sets are converted while encoding, so callers hand over the model itself
+instead of building an intermediate `.dict()` first. Any other type raises
+TypeError, as json.dumps does, rather than reaching clients as its str().
+"""
+
+import json
+from datetime import date, datetime
+from enum import Enum
+from importlib.util import find_spec
+from typing import Any, Dict, Optional, Union
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MSGPACK_AVAILABLE = find_spec("msgpack") is not None
+if MSGPACK_AVAILABLE:
+    import msgpack
+
+JSON_BACKEND = "orjson" if orjson else "json"
+
+ENCODINGS = ("json", "msgpack") if MSGPACK_AVAILABLE else ("json",)
+DEFAULT_ENCODING = "json"
+
+Frame = Union[str, bytes]
+
+
+def _default(value: Any) -> Any:
+    """Convert values the encoders don't handle natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump() if hasattr(value, "model_dump") else value.dict()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json(message: Any) -> str:
+    if orjson:
+        return orjson.dumps(message, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def encode_msgpack(message: Any) -> bytes:
+    # msgpack has no datetime/enum/model support (without ext types): same conversions as JSON
+    return msgpack.packb(message, default=_default, use_bin_type=True)
+
+
+_ENCODERS = {"json": encode_json}
+if MSGPACK_AVAILABLE:
+    _ENCODERS["msgpack"] = encode_msgpack
+
+
+def negotiate_encoding(requested: Optional[str]) -> str:
+    """The encoding to use for a client that asked for `requested` (json if unsupported)"""
+    requested = (requested or DEFAULT_ENCODING).lower()
+    return requested if requested in _ENCODERS else DEFAULT_ENCODING
+
+
+def decode_json(frame: Union[str, bytes]) -> Any:
+    return orjson.loads(frame) if orjson else json.loads(frame)
+
+
+class EncodedEvent:
+    """An event plus its lazily built, shared wire frames"""
+
+    __slots__ = ("_message", "_frames")
+
+    def __init__(self, message: Dict):
+        self._message = message
+        self._frames: Dict[str, Frame] = {}
+
+    @classmethod
+    def from_json(cls, frame: str) -> "EncodedEvent":
+        """Wrap an already encoded JSON frame (e.g. received from another worker)"""
+        encoded = cls(None)
+        encoded._frames["json"] = frame
+        return encoded
+
+    @property
+    def message(self) -> Dict:
+        # Only decoded when some client needs another wire format
+        if self._message is None:
+            self._message = decode_json(self._frames["json"])
+        return self._message
+
+    def frame(self, encoding: str = DEFAULT_ENCODING) -> Frame:
+        frame = self._frames.get(encoding)
+        if frame is None:
+            frame = self._frames[encoding] = _ENCODERS[encoding](self.message)
+        return frame
+
+
+def event(event_type: str, data: Any) -> EncodedEvent:
+    return EncodedEvent({"type": event_type, "data": data})
@@ -0,0 +1,144 @@
+"""
+Shared, connection-pooled HTTP clients for outbound integrations.
+
+One `httpx.AsyncClient` per upstream (Vital Audio, Supabase Storage / S3, ...)
+lives for the whole app lifetime, so keep-alive connections and TLS sessions
+are reused instead of paying a TCP + TLS handshake on every short request.
+Each pool has its own connection limit, which also caps concurrent requests to
+that host, and HTTP/2 is used when the optional `h2` package is installed.
+
+Request counts, errors, latency and new connections/TLS handshakes are
+tracked per upstream (via httpx event hooks and the httpcore trace extension)
+and exposed through `metrics()`.
+"""
+
+import os
+import time
+import importlib.util
+from typing import Dict
+
+import httpx
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("HTTP_KEEPALIVE_SECONDS", "60"))
+
+# Per-upstream overrides: connection limit and default timeouts
+UPSTREAMS = {
+    "vital_audio": {"max_connections": int(os.environ.get("VITAL_AUDIO_MAX_CONNECTIONS", "8")),
+                    "timeout": httpx.Timeout(60.0, connect=10.0)},
+    "storage": {"max_connections": int(os.environ.get("STORAGE_MAX_CONNECTIONS", "20")),
+                "timeout": httpx.Timeout(30.0, read=60.0)},
+    "default": {"max_connections": HTTP_MAX_CONNECTIONS,
+                "timeout": httpx.Timeout(30.0)},
+}
+
+
+class _UpstreamMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.total_seconds = 0.0
+
+    async def trace(self, event: str, info: Dict):
+        if event == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def as_dict(self) -> Dict:
+        completed = self.requests - self.in_flight
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "avg_ms": round(self.total_seconds / completed * 1000, 1) if completed else None,
+        }
+
+
+class HttpClients:
+    """Lazily created, app-lifetime HTTP client per upstream"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, _UpstreamMetrics] = {}
+
+    def get(self, upstream: str = "default") -> httpx.AsyncClient:
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._create(upstream)
+            self._clients[upstream] = client
+        return client
+
+    def _create(self, upstream: str) -> httpx.AsyncClient:
+        config = UPSTREAMS.get(upstream, UPSTREAMS["default"])
+        metrics = self._metrics.setdefault(upstream, _UpstreamMetrics())
+
+        async def on_request(request: httpx.Request):
+            metrics.requests += 1
+            request.extensions["trace"] = metrics.trace
+            request.extensions["village_started"] = time.perf_counter()
+
+        async def on_response(response: httpx.Response):
+            metrics.total_seconds += time.perf_counter() - response.request.extensions["village_started"]
+            if response.status_code >= 500:
+                metrics.errors += 1
+
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=config["max_connections"],
+                max_keepalive_connections=min(HTTP_MAX_KEEPALIVE, config["max_connections"]),
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            ),
+        )
+        return httpx.AsyncClient(
+            timeout=config["timeout"],
+            event_hooks={"request": [on_request], "response": [on_response]},
+            transport=_CountingTransport(transport, metrics),
+        )
+
+    def metrics(self) -> Dict:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "upstreams": {name: m.as_dict() for name, m in self._metrics.items()}
+        }
+
+    async def aclose(self):
+        """Close every pool (app shutdown)"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Counts requests in flight and transport failures (no response, so the response hook never runs)"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: _UpstreamMetrics):
+        self._transport = transport
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._metrics.in_flight += 1
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            self._metrics.errors += 1
+            raise
+        finally:
+            # Also on cancellation (e.g. a timed-out or disconnected caller)
+            self._metrics.in_flight -= 1
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# Global client registry
+http_clients = HttpClients()
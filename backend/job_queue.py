@@ -0,0 +1,346 @@
+"""
+Durable background job queue.
+
+Post-call health analyses (biomarkers, Parkinson's) are queued as jobs in an
+embedded SQLite database instead of FastAPI BackgroundTasks. Jobs therefore
+survive restarts: jobs that were running when the process stopped are queued
+again on startup.
+
+Each job type has its own handler and concurrency limit, so a burst of calls
+ending together drains at a steady rate. A failed job is retried with
+exponential backoff (plus jitter). After JOB_MAX_ATTEMPTS attempts it is
+dead-lettered (status "dead") and kept for inspection. Every job carries an
+idempotency key, the room name for analyses: enqueueing the same key again
+returns the existing job instead of adding a duplicate.
+
+A job can be enqueued "held" while its input isn't ready yet (e.g. a recording
+still being written). Held jobs are stored durably but take no concurrency
+slot until release() makes them due.
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import sqlite3
+import threading
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH",
+    os.path.join(os.path.dirname(__file__), "village_jobs.db")
+)
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "4"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_RETRY_MAX_SECONDS = float(os.environ.get("JOB_RETRY_MAX_SECONDS", "900"))
+
+# Upper bound on how long a dispatcher sleeps before re-checking for due jobs
+POLL_SECONDS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs(type, status, run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, updated_at DESC);
+"""
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+COLUMNS = (
+    "id", "type", "idempotency_key", "payload", "status", "attempts", "max_attempts",
+    "run_at", "created_at", "updated_at", "last_error", "result"
+)
+
+
+def _row_to_job(row) -> Dict:
+    job = dict(zip(COLUMNS, row))
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+class JobQueue:
+    """SQLite-backed job queue with per-type workers, retries and a dead-letter state"""
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._concurrency: Dict[str, int] = {}
+        self._running: Dict[str, Dict[str, asyncio.Task]] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._dispatchers: List[asyncio.Task] = []
+
+    # ------------------------------------------------------------------------
+    # Registration and lifecycle
+    # ------------------------------------------------------------------------
+
+    def register(self, job_type: str, handler: JobHandler, concurrency: int = JOB_CONCURRENCY):
+        """Register the handler for a job type and how many may run at once"""
+        self._handlers[job_type] = handler
+        self._concurrency[job_type] = concurrency
+
+    async def start(self):
+        """Re-queue jobs interrupted by a restart and start one dispatcher per job type"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'", (time.time(),)
+            )
+            self._db.commit()
+
+        for job_type in self._handlers:
+            self._running[job_type] = {}
+            self._wake[job_type] = asyncio.Event()
+            self._dispatchers.append(asyncio.create_task(self._dispatch(job_type)))
+
+    async def stop(self):
+        """Stop dispatching; jobs still running are picked up again on the next start"""
+        tasks = self._dispatchers + [t for running in self._running.values() for t in running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatchers.clear()
+
+    # ------------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------------
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], idempotency_key: str, hold: bool = False) -> Dict:
+        """
+        Queue a job, or return the existing job with the same idempotency key.
+        A dead-lettered job is queued again (a fresh set of attempts).
+        With hold=True the job waits in status "held" until release().
+        """
+        if job_type not in self._handlers:
+            raise KeyError(f"Unknown job type: {job_type}")
+
+        status = "held" if hold else "queued"
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+
+            if row is None:
+                job_id = str(uuid.uuid4())
+                self._db.execute(
+                    """INSERT INTO jobs (id, type, idempotency_key, payload, status, attempts, max_attempts,
+                                         run_at, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)""",
+                    (job_id, job_type, idempotency_key, json.dumps(payload), status, self.max_attempts, now, now, now)
+                )
+            elif row[COLUMNS.index("status")] == "dead":
+                job_id = row[0]
+                self._db.execute(
+                    """UPDATE jobs SET status = ?, attempts = 0, run_at = ?, updated_at = ?,
+                                       payload = ? WHERE id = ?""",
+                    (status, now, now, json.dumps(payload), job_id)
+                )
+            else:
+                return _row_to_job(row)
+
+            self._db.commit()
+
+        self._notify(job_type)
+        return self.get(job_id)
+
+    def release(self, job_id: str) -> Optional[Dict]:
+        """Make a held job due now"""
+        now = time.time()
+        with self._lock:
+            updated = self._db.execute(
+                "UPDATE jobs SET status = 'queued', run_at = ?, updated_at = ? WHERE id = ? AND status = 'held'",
+                (now, now, job_id)
+            ).rowcount
+            self._db.commit()
+
+        job = self.get(job_id)
+        if updated and job:
+            self._notify(job["type"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list_jobs(
+        self,
+        status: Optional[str] = None,
+        job_type: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        """Most recently updated jobs first"""
+        query = f"SELECT {', '.join(COLUMNS)} FROM jobs"
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if job_type:
+            conditions.append("type = ?")
+            params.append(job_type)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY updated_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def retry(self, job_id: str) -> Optional[Dict]:
+        """Queue a dead-lettered job again now, with a fresh set of attempts"""
+        job = self.get(job_id)
+        if not job:
+            return None
+        if job["status"] != "dead":
+            return job
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, run_at = ?, updated_at = ? WHERE id = ?",
+                (time.time(), time.time(), job_id)
+            )
+            self._db.commit()
+        self._notify(job["type"])
+        return self.get(job_id)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            rows = self._db.execute("SELECT type, status, COUNT(*) FROM jobs GROUP BY type, status").fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for job_type, status, count in rows:
+            counts.setdefault(job_type, {})[status] = count
+        return {
+            "jobs": counts,
+            "running": {job_type: len(running) for job_type, running in self._running.items()},
+            "concurrency": dict(self._concurrency)
+        }
+
+    # ------------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------------
+
+    def _notify(self, job_type: str):
+        event = self._wake.get(job_type)
+        if event:
+            event.set()
+
+    def _claim_due(self, job_type: str, limit: int) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                f"""SELECT {', '.join(COLUMNS)} FROM jobs
+                    WHERE type = ? AND status = 'queued' AND run_at <= ?
+                    ORDER BY run_at LIMIT ?""",
+                (job_type, now, limit)
+            ).fetchall()
+            jobs = [_row_to_job(row) for row in rows]
+            for job in jobs:
+                job["attempts"] += 1
+                job["status"] = "running"
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = ?, updated_at = ? WHERE id = ?",
+                    (job["attempts"], now, job["id"])
+                )
+            self._db.commit()
+        return jobs
+
+    def _next_due_in(self, job_type: str) -> float:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(run_at) FROM jobs WHERE type = ? AND status = 'queued'", (job_type,)
+            ).fetchone()
+        if row[0] is None:
+            return POLL_SECONDS
+        return max(0.0, min(row[0] - time.time(), POLL_SECONDS))
+
+    async def _dispatch(self, job_type: str):
+        running = self._running[job_type]
+        wake = self._wake[job_type]
+
+        while True:
+            free = self._concurrency[job_type] - len(running)
+            if free > 0:
+                for job in self._claim_due(job_type, free):
+                    task = asyncio.create_task(self._execute(job))
+                    running[job["id"]] = task
+                    task.add_done_callback(lambda _, job_id=job["id"]: self._on_done(job_type, job_id))
+
+            wake.clear()
+            timeout = POLL_SECONDS if len(running) >= self._concurrency[job_type] else self._next_due_in(job_type)
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, job_type: str, job_id: str):
+        self._running.get(job_type, {}).pop(job_id, None)
+        self._notify(job_type)
+
+    async def _execute(self, job: Dict):
+        handler = self._handlers[job["type"]]
+        try:
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._record_failure(job, e)
+            return
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'completed', result = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result, default=str), time.time(), job["id"])
+            )
+            self._db.commit()
+
+    def _record_failure(self, job: Dict, error: Exception):
+        error_text = f"{type(error).__name__}: {error}"
+        now = time.time()
+
+        if job["attempts"] >= job["max_attempts"]:
+            print(f"☠️  Job {job['type']} {job['idempotency_key']} dead after {job['attempts']} attempts: {error_text}")
+            traceback.print_exception(type(error), error, error.__traceback__)
+            status, run_at = "dead", now
+        else:
+            delay = min(JOB_RETRY_BASE_SECONDS * (2 ** (job["attempts"] - 1)), JOB_RETRY_MAX_SECONDS)
+            delay *= random.uniform(0.8, 1.2)
+            print(f"🔁 Job {job['type']} {job['idempotency_key']} failed "
+                  f"(attempt {job['attempts']}/{job['max_attempts']}), retrying in {delay:.0f}s: {error_text}")
+            status, run_at = "queued", now + delay
+
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, run_at, error_text, now, job["id"])
+            )
+            self._db.commit()
+
+
+# Global job queue; handlers are registered by the API module
+job_queue = JobQueue()
@@ -0,0 +1,130 @@
+"""
+Shared LiveKit server API client.
+
+SIP dials and egress starts used to create an `api.LiveKitAPI` (and with it a
+new aiohttp session, connection and TLS handshake) per call. Now one client is
+created at app startup and kept for the app's lifetime. Its aiohttp session
+keeps connections to the LiveKit server alive between requests, and callers
+borrow it through `acquire()`. A semaphore bounds the number of concurrent API
+requests, so a burst of scheduled check-ins queues instead of opening dozens of
+connections at once.
+
+Access tokens are still signed per request by the SDK. That is a local HMAC
+and costs microseconds. The expensive part was connection setup, and that is
+what is shared.
+"""
+
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+from livekit import api
+
+LIVEKIT_URL = os.environ.get("LIVEKIT_URL")
+LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY")
+LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET")
+
+LIVEKIT_MAX_CONCURRENCY = int(os.environ.get("LIVEKIT_MAX_CONCURRENCY", "10"))
+LIVEKIT_API_TIMEOUT_SECONDS = float(os.environ.get("LIVEKIT_API_TIMEOUT_SECONDS", "30"))
+
+
+class LiveKitClientManager:
+    """App-lifetime LiveKitAPI with a keep-alive session and a concurrency limit"""
+
+    def __init__(
+        self,
+        url: Optional[str] = LIVEKIT_URL,
+        api_key: Optional[str] = LIVEKIT_API_KEY,
+        api_secret: Optional[str] = LIVEKIT_API_SECRET,
+        max_concurrency: int = LIVEKIT_MAX_CONCURRENCY
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.max_concurrency = max_concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._api: Optional[api.LiveKitAPI] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+        self.stats = {"requests": 0, "errors": 0, "clients_created": 0, "total_seconds": 0.0}
+
+    def configured(self) -> bool:
+        return bool(self.url and self.api_key and self.api_secret)
+
+    async def start(self):
+        """Create the shared client (also done lazily on first use)"""
+        if self._api is not None or not self.configured():
+            return
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=LIVEKIT_API_TIMEOUT_SECONDS),
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+        )
+        self._api = api.LiveKitAPI(self.url, self.api_key, self.api_secret, session=self._session)
+        self.stats["clients_created"] += 1
+
+    async def aclose(self):
+        """Close the client once in-flight requests have finished (app shutdown)"""
+        if self._api is None:
+            return
+        for _ in range(self.max_concurrency):
+            await self._semaphore.acquire()
+        try:
+            await self._api.aclose()
+            await self._session.close()
+        finally:
+            self._api = None
+            self._session = None
+            for _ in range(self.max_concurrency):
+                self._semaphore.release()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[api.LiveKitAPI]:
+        """
+        Borrow the shared client for one or more API requests. Hold it only
+        around the requests themselves, not across unrelated waits.
+        """
+        if not self.configured():
+            raise RuntimeError("LiveKit not configured")
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started = time.perf_counter()
+        self._in_flight += 1
+        try:
+            if self._api is None:
+                await self.start()
+            self.stats["requests"] += 1
+            yield self._api
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self.stats["total_seconds"] += time.perf_counter() - started
+            self._semaphore.release()
+
+    def metrics(self) -> Dict:
+        requests = self.stats["requests"]
+        return {
+            "configured": self.configured(),
+            "connected": self._api is not None,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "requests": requests,
+            "errors": self.stats["errors"],
+            "clients_created": self.stats["clients_created"],
+            "avg_ms": round(self.stats["total_seconds"] / requests * 1000, 1) if requests else None,
+        }
+
+
+# Global LiveKit client; started and closed by the API app
+livekit_clients = LiveKitClientManager()
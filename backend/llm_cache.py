@@ -0,0 +1,175 @@
+"""
+Content-addressed cache for LLM responses.
+
+Analysis prompts are keyed on a normalized hash of their text (elder preamble
+plus transcript window), so retries, duplicate chunks and demo replays reuse an
+earlier Gemini response instead of sending a new request. Entries live in an
+in-memory LRU with a TTL, optionally backed by a directory of JSON files so a
+replay survives restarts. Concurrent requests for the same key share one call.
+The call is cancelled when its last waiter is (e.g. AnalysisScheduler.cancel()
+at call end), so it doesn't keep a Gemini slot nobody is waiting for.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", "3600"))
+# Optional on-disk backend; disk entries do not expire unless a TTL is set
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR")
+LLM_CACHE_DISK_TTL_SECONDS = float(os.environ.get("LLM_CACHE_DISK_TTL_SECONDS", "0"))
+
+_NON_WORD = re.compile(r"[^\w<>|:{}\[\]\"-]+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase and collapse whitespace/punctuation noise so near-identical windows match"""
+    return _NON_WORD.sub(" ", prompt.lower()).strip()
+
+
+class LLMResponseCache:
+    """LRU + TTL cache of model responses with optional disk persistence"""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        disk_dir: Optional[str] = LLM_CACHE_DIR,
+        disk_ttl_seconds: float = LLM_CACHE_DISK_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (stored_at, text)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}  # key -> callers waiting on its in-flight load
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "deduplicated": 0, "evictions": 0, "abandoned": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Content hash for a model + normalized prompt"""
+        digest = hashlib.sha256()
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(normalize_prompt(prompt).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response from memory, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, text = entry
+        if self.ttl_seconds and time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return text
+
+    def put(self, key: str, text: str):
+        """Store a response in memory (and on disk if configured)"""
+        self._remember(key, text)
+        if self.disk_dir:
+            self._write_disk(key, text)
+
+    def _remember(self, key: str, text: str):
+        self._entries[key] = (time.time(), text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.disk_ttl_seconds and time.time() - entry.get("stored_at", 0) > self.disk_ttl_seconds:
+            return None
+        return entry.get("text")
+
+    def _write_disk(self, key: str, text: str):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"stored_at": time.time(), "text": text}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Failed to write LLM cache entry: {e}")
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached response for key, generating it at most once across concurrent callers"""
+        text = self.get(key)
+        if text is not None:
+            self.stats["hits"] += 1
+            return text
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            # The load runs in its own task: a caller that is cancelled only stops waiting,
+            # unless it was the last one waiting
+            task = asyncio.create_task(self._load(key, generate))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._load_finished(key, done))
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not task.done():
+                    self.stats["abandoned"] += 1
+                    task.cancel()
+
+    async def _load(self, key: str, generate: Callable[[], Awaitable[str]]) -> str:
+        text = None
+        if self.disk_dir:
+            text = await asyncio.to_thread(self._read_disk, key)
+            if text is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, text)
+
+        if text is None:
+            self.stats["misses"] += 1
+            text = await generate()
+            self._remember(key, text)
+            if self.disk_dir:
+                await asyncio.to_thread(self._write_disk, key, text)
+        return text
+
+    def _load_finished(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Waiters see the error; don't leave it unretrieved when they have all gone
+        if not task.cancelled():
+            task.exception()
+
+    def metrics(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0
+        return {**self.stats, "entries": len(self._entries), "hit_rate": round(hit_rate, 3)}
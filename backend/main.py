@@ -1,24 +1,38 @@
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from backend.database import supabase
 from backend.websocket_manager import ws_manager
+from backend.subscription_index import call_topic, elder_topic, org_topic
 from backend.models import (
     Elder, CallSession, CallStatus, TranscriptLine, VillageAction,
     Concern, ProfileFact, VillageMember
 )
-from backend.margaret import margaret_elder
+from backend.elder_repository import elder_repository
 from backend.ai_analyzer import ai_analyzer
-import requests
+from backend.analysis_scheduler import AnalysisScheduler
+from backend.call_store import call_store
+from backend.persistence import db_writer
+from backend.transcript_writer import transcript_writer
+from backend.parkinson.worker_pool import parkinson_pool, QueueFullError, JobTimeoutError, PARKINSON_ENABLED
+from backend.parkinson.feature_store import content_key
+from backend.recording_tracker import egress_tracker, storage_tracker, RECORDINGS_BUCKET, RecordingUnavailableError
+from backend.post_call import post_call_pipeline, SpooledRecording
+from backend.job_queue import job_queue
+from backend.http_clients import http_clients
+from backend.livekit_client import livekit_clients
+from backend.campaign_dialer import (
+    CampaignDialer, LiveKitSipClient, SimulatedSipClient, DialRequest, CAMPAIGN_MAX_ATTEMPTS
+)
 import os
 import uuid
 import json
 from livekit import api
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import asyncio
-import httpx
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -33,6 +47,20 @@ class CallRequest(BaseModel):
 class StartCallRequest(BaseModel):
     elder_id: str
 
+class UpdateElderRequest(BaseModel):
+    name: Optional[str] = None
+    age: Optional[int] = None
+    phone: Optional[str] = None
+    photo_url: Optional[str] = None
+    address: Optional[str] = None
+
+class StartCampaignRequest(BaseModel):
+    elder_ids: List[str]
+    start_at: Optional[datetime] = None  # Dialing window; defaults to now until end of day (UTC)
+    end_at: Optional[datetime] = None
+    trunk_id: Optional[str] = None
+    max_attempts: int = CAMPAIGN_MAX_ATTEMPTS
+
 class TranscriptEntry(BaseModel):
     timestamp: str
     speaker: str
@@ -62,11 +90,6 @@ LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET")
 LIVEKIT_URL = os.environ.get("LIVEKIT_URL")
 SIP_TRUNK_ID = os.environ.get("SIP_TRUNK_ID")
 
-# In-memory storage for demo (replace with database in production)
-active_calls: Dict[str, CallSession] = {}
-call_history: List[CallSession] = []
-village_actions_store: List[VillageAction] = []
-
 app = FastAPI(title="The Village API", version="1.0.0")
 
 # CORS middleware
@@ -79,6 +102,30 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def on_startup():
+    await db_writer.start()
+    await ws_manager.start()
+    await job_queue.start()
+    # Held analyses from before a restart wait for their recordings again
+    for job in job_queue.list_jobs(status="held", job_type=HEALTH_ANALYSIS_JOB, limit=10000):
+        watch_recording(job)
+    await livekit_clients.start()
+    if PARKINSON_ENABLED:
+        parkinson_pool.warmup()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await campaign_dialer.stop()
+    await ws_manager.aclose()
+    await job_queue.stop()
+    await db_writer.stop()
+    await http_clients.aclose()
+    await livekit_clients.aclose()
+    parkinson_pool.shutdown()
+
+
 # ============================================================================
 # BASIC ENDPOINTS
 # ============================================================================
@@ -94,7 +141,23 @@ def health_check():
     try:
         if not supabase:
              return {"status": "ok", "supabase": "not_configured"}
-        return {"status": "ok", "supabase": "initialized"}
+        return {
+            "status": "ok",
+            "supabase": "initialized",
+            "db_writer": db_writer.metrics(),
+            "parkinson": parkinson_pool.metrics(),
+            "recordings": {
+                "egress": egress_tracker.metrics(),
+                "storage": storage_tracker.metrics(),
+                "pipeline": post_call_pipeline.metrics()
+            },
+            "jobs": job_queue.metrics(),
+            "http": http_clients.metrics(),
+            "livekit": livekit_clients.metrics(),
+            "campaigns": campaign_dialer.metrics(),
+            "elders": elder_repository.metrics(),
+            "websockets": ws_manager.metrics()
+        }
     except Exception as e:
         return {"status": "error", "detail": str(e)}
 
@@ -103,69 +166,154 @@ def health_check():
 # ELDER ENDPOINTS
 # ============================================================================
 
+async def find_elder(elder_id: str) -> Optional[Elder]:
+    """Look up an elder profile by ID (cached; see elder_repository)"""
+    return await elder_repository.get(elder_id)
+
+
 @app.get("/api/elder/{elder_id}")
 async def get_elder(elder_id: str) -> Elder:
     """Get elder profile by ID"""
-    # For now, return Margaret as the demo elder
-    if elder_id == "margaret" or elder_id == margaret_elder.id:
-        return margaret_elder
-    raise HTTPException(status_code=404, detail=f"Elder not found: {elder_id}")
+    elder = await find_elder(elder_id)
+    if not elder:
+        raise HTTPException(status_code=404, detail=f"Elder not found: {elder_id}")
+    return elder
+
+
+@app.patch("/api/elder/{elder_id}")
+async def update_elder(elder_id: str, request: UpdateElderRequest) -> Elder:
+    """Update an elder's contact details; the cached profile is invalidated"""
+    fields = request.dict(exclude_unset=True)
+    if not fields:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    elder = await elder_repository.update(elder_id, fields)
+    if not elder:
+        raise HTTPException(status_code=404, detail=f"Elder not found: {elder_id}")
+    return elder
 
 
 @app.get("/api/elder/{elder_id}/history")
 async def get_elder_history(elder_id: str, limit: int = 10) -> List[CallSession]:
     """Get call history for an elder"""
-    if elder_id != "margaret" and elder_id != margaret_elder.id:
+    elder = await find_elder(elder_id)
+    if not elder:
         raise HTTPException(status_code=404, detail=f"Elder not found: {elder_id}")
 
     # Return most recent calls first
-    elder_calls = [call for call in call_history if call.elder_id == elder_id]
-    return sorted(elder_calls, key=lambda x: x.started_at, reverse=True)[:limit]
+    elder_calls, _ = call_store.list_calls(elder_id=elder.id, limit=limit)
+    return elder_calls
 
 
 # ============================================================================
 # CALL ENDPOINTS (MERGED)
 # ============================================================================
 
-@app.post("/api/call/start")
-async def start_call_api(request: StartCallRequest) -> CallSession:
-    """
-    Start a new call with an elder.
-    MERGED: HEAD's structure + Remote's recording infrastructure
-    """
-    # Get elder profile
-    if request.elder_id == "margaret" or request.elder_id == margaret_elder.id:
-        elder = margaret_elder
-    else:
-        raise HTTPException(status_code=404, detail=f"Elder not found: {request.elder_id}")
-
-    # Create call session
-    call_id = str(uuid.uuid4())
-    room_name = f"call_{uuid.uuid4().hex[:8]}"
-
+def new_call_session(elder: Elder, room_name: str) -> CallSession:
+    """Create and store a ringing check-in call"""
     call_session = CallSession(
-        id=call_id,
+        id=str(uuid.uuid4()),
         elder_id=elder.id,
         type="elder_checkin",
         started_at=datetime.utcnow(),
         status=CallStatus.RINGING,
+        room_name=room_name,
         transcript=[],
         concerns=[],
         profile_updates=[],
         village_actions=[]
     )
 
-    # Store in active calls
-    active_calls[call_id] = call_session
+    # Store in active calls (written by persist_new_call)
+    call_store.track(call_session)
+    return call_session
+
+
+async def start_recording(call_session: CallSession):
+    """Start an audio-only egress recording of the call's room, if enabled (from Remote)"""
+    enable_recording = os.getenv("ENABLE_RECORDING", "false").lower() == "true"
+    if not enable_recording:
+        return
+
+    s3_endpoint = os.getenv("S3_ENDPOINT")
+    s3_access_key = os.getenv("S3_ACCESS_KEY")
+    s3_secret = os.getenv("S3_SECRET")
+    s3_bucket = os.getenv("S3_BUCKET")
+    s3_region = os.getenv("S3_REGION", "us-east-1")
+
+    if not all([s3_endpoint, s3_access_key, s3_secret, s3_bucket]):
+        return
+
+    room_name = call_session.room_name
+    try:
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        recording_filename = f"{room_name}_{timestamp}.mp3"
+        s3_filepath = f"recordings/{recording_filename}"
+
+        print(f"🎙️  Starting recording: {recording_filename}")
+
+        egress_request = api.RoomCompositeEgressRequest(
+            room_name=room_name,
+            audio_only=True,
+            file_outputs=[
+                api.EncodedFileOutput(
+                    file_type=api.EncodedFileType.MP3,
+                    filepath=s3_filepath,
+                    s3=api.S3Upload(
+                        access_key=s3_access_key,
+                        secret=s3_secret,
+                        region=s3_region,
+                        endpoint=s3_endpoint,
+                        bucket=s3_bucket,
+                    ),
+                )
+            ],
+        )
+
+        async with livekit_clients.acquire() as lk_api:
+            egress_info = await lk_api.egress.start_room_composite_egress(egress_request)
+        call_session.recording_path = s3_filepath
+        egress_tracker.expect(s3_filepath, egress_info.egress_id)
+        print(f"✅ Recording started: {egress_info.egress_id}")
+
+    except Exception as e:
+        print(f"⚠️  Recording setup failed: {e}")
+
+
+async def persist_new_call(call_session: CallSession):
+    """Save a new call to the database (from Remote); written behind, off the event loop"""
+    await db_writer.insert("calls", {
+        "id": call_session.id,
+        "elderly_id": call_session.elder_id,
+        "room_name": call_session.room_name,
+        "status": "ringing",
+        "started_at": call_session.started_at.isoformat(),
+        "recording_path": call_session.recording_path
+    })
+
+    await call_store.save_call_async(call_session)
+
+
+@app.post("/api/call/start")
+async def start_call_api(request: StartCallRequest) -> CallSession:
+    """
+    Start a new call with an elder.
+    MERGED: HEAD's structure + Remote's recording infrastructure
+    """
+    # Get elder profile
+    elder = await find_elder(request.elder_id)
+    if not elder:
+        raise HTTPException(status_code=404, detail=f"Elder not found: {request.elder_id}")
+
+    # Create call session
+    room_name = f"call_{uuid.uuid4().hex[:8]}"
+    call_session = new_call_session(elder, room_name)
 
     # Broadcast WebSocket event
-    await ws_manager.emit_call_started(call_id, elder.id)
+    await ws_manager.emit_call_started(call_session.id, elder.id, elder.organization_id)
 
     # Initialize LiveKit and setup recording (from Remote)
     if LIVEKIT_API_KEY and LIVEKIT_API_SECRET and LIVEKIT_URL:
         try:
-            lk_api = api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
-
             # Create SIP participant if phone number available
             if elder.phone:
                 try:
@@ -178,118 +326,63 @@ async def start_call_api(request: StartCallRequest) -> CallSession:
                     )
 
                     print(f"📱 Calling {elder.phone}...")
-                    sip_participant = await lk_api.sip.create_sip_participant(sip_request)
+                    async with livekit_clients.acquire() as lk_api:
+                        sip_participant = await lk_api.sip.create_sip_participant(sip_request)
                     print(f"✅ SIP call initiated")
 
                 except Exception as sip_error:
                     print(f"⚠️  SIP call failed: {sip_error}")
 
-            # Setup recording if enabled (from Remote)
-            enable_recording = os.getenv("ENABLE_RECORDING", "false").lower() == "true"
-            if enable_recording:
-                s3_endpoint = os.getenv("S3_ENDPOINT")
-                s3_access_key = os.getenv("S3_ACCESS_KEY")
-                s3_secret = os.getenv("S3_SECRET")
-                s3_bucket = os.getenv("S3_BUCKET")
-                s3_region = os.getenv("S3_REGION", "us-east-1")
-
-                if all([s3_endpoint, s3_access_key, s3_secret, s3_bucket]):
-                    try:
-                        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                        recording_filename = f"{room_name}_{timestamp}.mp3"
-                        s3_filepath = f"recordings/{recording_filename}"
-
-                        print(f"🎙️  Starting recording: {recording_filename}")
-
-                        egress_request = api.RoomCompositeEgressRequest(
-                            room_name=room_name,
-                            audio_only=True,
-                            file_outputs=[
-                                api.EncodedFileOutput(
-                                    file_type=api.EncodedFileType.MP3,
-                                    filepath=s3_filepath,
-                                    s3=api.S3Upload(
-                                        access_key=s3_access_key,
-                                        secret=s3_secret,
-                                        region=s3_region,
-                                        endpoint=s3_endpoint,
-                                        bucket=s3_bucket,
-                                    ),
-                                )
-                            ],
-                        )
-
-                        egress_info = await lk_api.egress.start_room_composite_egress(egress_request)
-                        call_session.recording_path = s3_filepath
-                        print(f"✅ Recording started: {egress_info.egress_id}")
-
-                        # Start background task to copy recording to Supabase Storage
-                        asyncio.create_task(copy_recording_to_supabase_storage(room_name, s3_filepath))
-
-                    except Exception as e:
-                        print(f"⚠️  Recording setup failed: {e}")
-
-            await lk_api.aclose()
+            await start_recording(call_session)
 
         except Exception as e:
             print(f"⚠️  LiveKit setup error: {e}")
 
-    # Save to database if available (from Remote)
-    if supabase:
-        try:
-            supabase.table("calls").insert({
-                "id": call_id,
-                "elderly_id": elder.id,
-                "room_name": room_name,
-                "status": "ringing",
-                "started_at": call_session.started_at.isoformat(),
-                "recording_path": call_session.recording_path
-            }).execute()
-            print(f"✅ Call saved to database: {call_id}")
-        except Exception as e:
-            print(f"⚠️  Database save failed: {e}")
+    await persist_new_call(call_session)
 
     return call_session
 
 
 @app.post("/api/call/{call_id}/end")
-async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallSession:
+async def end_call_api(call_id: str) -> CallSession:
     """
     End an active call.
     MERGED: HEAD's logic + Remote's background health analysis
     """
-    if call_id not in active_calls:
+    call = call_store.active.get(call_id)
+    if not call:
         raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
 
-    call = active_calls[call_id]
     call.ended_at = datetime.utcnow()
     call.status = CallStatus.COMPLETED
 
     if call.started_at and call.ended_at:
         call.duration_seconds = int((call.ended_at - call.started_at).total_seconds())
 
+    # Stop any real-time analysis still queued or running for this call
+    analysis_scheduler.cancel(call_id)
+    if call.room_name:
+        campaign_dialer.call_ended(call.room_name)
+    ai_analyzer.cleanup_call_context(call_id)
+
+    # Persist the last transcript batch; earlier batches were written to call_transcript_lines during the call
+    await transcript_writer.close(call_id)
+
     # Save to database (from Remote)
-    if supabase:
-        try:
-            supabase.table("calls").update({
-                "transcript": [t.dict() for t in call.transcript],
-                "status": "completed",
-                "ended_at": call.ended_at.isoformat(),
-                "duration_seconds": call.duration_seconds,
-                "wellbeing": call.wellbeing.dict() if call.wellbeing else None,
-                "concerns": [c.dict() for c in call.concerns],
-                "biomarkers": None,  # Will be populated by background task
-                "parkinson_detection": None  # Will be populated by background task
-            }).eq("id", call_id).execute()
-            print(f"✅ Call data saved to database")
-        except Exception as e:
-            print(f"⚠️  Database update failed: {e}")
+    await db_writer.update("calls", "id", call_id, {
+        "status": "completed",
+        "ended_at": call.ended_at.isoformat(),
+        "duration_seconds": call.duration_seconds,
+        "wellbeing": json.loads(call.wellbeing.json()) if call.wellbeing else None,
+        "concerns": [json.loads(c.json()) for c in call.concerns],
+        "biomarkers": None,  # Will be populated by background task
+        "parkinson_detection": None  # Will be populated by background task
+    })
 
-    # Trigger background health analysis if recording exists (from Remote)
+    # Queue background health analysis if recording exists (from Remote)
     if call.recording_path:
-        room_name = f"call_{call_id[:8]}"  # Reconstruct room name
-        background_tasks.add_task(process_biomarkers_background, room_name, call.recording_path, os.getenv("S3_ENDPOINT"))
-        background_tasks.add_task(process_parkinson_background, room_name, call.recording_path)
+        room_name = call.room_name or f"call_{call_id[:8]}"
+        enqueue_health_analysis(room_name, call.recording_path, call_id=call_id)
         print(f"🧬 Queued health analysis for {call.recording_path}")
 
     # Broadcast status change (HEAD)
@@ -297,11 +390,11 @@ async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallS
 
     # Broadcast call ended event (HEAD)
     if call.summary:
-        await ws_manager.emit_call_ended(call_id, call.summary.dict())
+        await ws_manager.emit_call_ended(call_id, call.summary)
+    await ws_manager.forget_call(call_id)
 
     # Move to history
-    call_history.append(call)
-    del active_calls[call_id]
+    await call_store.save_call_async(call)
 
     return call
 
@@ -309,30 +402,120 @@ async def end_call_api(call_id: str, background_tasks: BackgroundTasks) -> CallS
 @app.get("/api/call/{call_id}")
 async def get_call(call_id: str) -> CallSession:
     """Get call details by ID"""
-    # Check active calls first
-    if call_id in active_calls:
-        return active_calls[call_id]
-
-    # Check history
-    for call in call_history:
-        if call.id == call_id:
-            return call
+    call = call_store.get_call(call_id)
+    if call:
+        return call
 
     raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
 
 
+@app.get("/api/call/{call_id}/transcript")
+async def get_call_transcript(
+    call_id: str,
+    response: Response,
+    limit: int = 200,
+    cursor: Optional[str] = None
+) -> List[TranscriptLine]:
+    """
+    Page through a call's transcript in timestamp order.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    lines, next_cursor = call_store.get_transcript(call_id, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return lines
+
+
 @app.get("/api/calls")
-async def list_calls(elder_id: Optional[str] = None, limit: int = 20) -> List[CallSession]:
-    """List all calls, optionally filtered by elder_id"""
-    all_calls = list(active_calls.values()) + call_history
+async def list_calls(
+    response: Response,
+    elder_id: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> List[CallSession]:
+    """
+    List calls, most recent first, optionally filtered by elder_id.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    calls, next_cursor = call_store.list_calls(elder_id=elder_id, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return calls
+
+
+# ============================================================================
+# CHECK-IN CAMPAIGN ENDPOINTS
+# ============================================================================
+
+async def on_campaign_call_answered(elder: Elder, request: DialRequest):
+    """A campaign call was answered: open its call session and start recording"""
+    call_session = new_call_session(elder, request.room_name)
+    await ws_manager.emit_call_started(call_session.id, elder.id, elder.organization_id)
+    await start_recording(call_session)
+    await persist_new_call(call_session)
+
+
+campaign_dialer = CampaignDialer(
+    sip_client=(
+        LiveKitSipClient() if LIVEKIT_API_KEY and LIVEKIT_API_SECRET and LIVEKIT_URL and SIP_TRUNK_ID
+        else SimulatedSipClient()
+    ),
+    elder_lookup=find_elder,
+    on_answered=on_campaign_call_answered
+)
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@app.post("/api/campaigns")
+async def start_campaign(request: StartCampaignRequest):
+    """
+    Schedule check-in calls for a cohort of elders within a time window.
+    Progress is broadcast as campaign_progress WebSocket events.
+    """
+    if not request.elder_ids:
+        raise HTTPException(status_code=400, detail="No elders in cohort")
+    try:
+        campaign = campaign_dialer.create(
+            request.elder_ids,
+            start_at=_utc_naive(request.start_at),
+            end_at=_utc_naive(request.end_at),
+            trunk_id=request.trunk_id,
+            max_attempts=request.max_attempts
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return campaign.summary()
 
-    if elder_id:
-        all_calls = [call for call in all_calls if call.elder_id == elder_id]
 
-    # Sort by started_at descending (most recent first)
-    all_calls.sort(key=lambda x: x.started_at, reverse=True)
+@app.get("/api/campaigns")
+async def list_campaigns():
+    return {"campaigns": [c.summary() for c in campaign_dialer.campaigns.values()],
+            "metrics": campaign_dialer.metrics()}
 
-    return all_calls[:limit]
+
+@app.get("/api/campaigns/{campaign_id}")
+async def get_campaign(campaign_id: str):
+    """Campaign summary plus the status of every elder in the cohort"""
+    campaign = campaign_dialer.get(campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail=f"Campaign not found: {campaign_id}")
+    return {**campaign.summary(), "targets": campaign.targets}
+
+
+@app.post("/api/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(campaign_id: str):
+    """Stop dialing; calls already in conversation continue"""
+    campaign = await campaign_dialer.cancel(campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail=f"Campaign not found: {campaign_id}")
+    return campaign.summary()
 
 
 # ============================================================================
@@ -343,7 +526,7 @@ async def list_calls(elder_id: Optional[str] = None, limit: int = 20) -> List[Ca
 async def trigger_village_action(action: VillageAction) -> VillageAction:
     """Trigger a village action (call to family/neighbor/medical/volunteer)"""
     # Store the action
-    village_actions_store.append(action)
+    await call_store.save_action_async(action)
 
     # TODO: Actually initiate the outbound call
     # For now, just return the action
@@ -354,18 +537,12 @@ async def trigger_village_action(action: VillageAction) -> VillageAction:
 @app.get("/api/village/actions")
 async def list_village_actions(
     call_id: Optional[str] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0
 ) -> List[VillageAction]:
     """List village actions, optionally filtered"""
-    actions = village_actions_store
-
-    if call_id:
-        actions = [a for a in actions if a.call_session_id == call_id]
-
-    if status:
-        actions = [a for a in actions if a.status == status]
-
-    return actions
+    return call_store.list_actions(call_id=call_id, status=status, limit=limit, offset=offset)
 
 
 # ============================================================================
@@ -379,6 +556,16 @@ class TranscriptChunkRequest(BaseModel):
     text: str
     timestamp: Optional[str] = None
 
+@app.get("/api/analysis/stats")
+async def analysis_stats():
+    """Real-time analysis load: scheduler counters and per-call context memory"""
+    return {
+        "scheduler": {**analysis_scheduler.stats, "pending_calls": analysis_scheduler.pending_calls()},
+        "context": ai_analyzer.context_stats(),
+        "response_cache": ai_analyzer.response_cache.metrics()
+    }
+
+
 @app.post("/api/transcript/stream")
 async def stream_transcript_chunk(chunk: TranscriptChunkRequest):
     """
@@ -391,11 +578,10 @@ async def stream_transcript_chunk(chunk: TranscriptChunkRequest):
     call_id = chunk.call_id
 
     # Check if call exists
-    if call_id not in active_calls:
+    call = call_store.active.get(call_id)
+    if not call:
         raise HTTPException(status_code=404, detail=f"Call not found: {call_id}")
 
-    call = active_calls[call_id]
-
     # Create transcript line
     transcript_line = TranscriptLine(
         id=str(uuid.uuid4()),
@@ -405,51 +591,54 @@ async def stream_transcript_chunk(chunk: TranscriptChunkRequest):
         timestamp=chunk.timestamp or datetime.utcnow().isoformat()
     )
 
-    # Add to call transcript
+    # Add to call transcript and persist it in batches
     call.transcript.append(transcript_line)
+    await transcript_writer.append(call_id, transcript_line)
 
     # Broadcast to WebSocket subscribers
-    await ws_manager.emit_transcript_update(call_id, transcript_line.dict())
+    await ws_manager.emit_transcript_update(call_id, transcript_line)
 
-    # Get elder profile
-    elder = margaret_elder  # For now, hardcoded to Margaret
-    if call.elder_id != margaret_elder.id:
-        # In production, fetch from database
-        pass
+    # Get elder profile (served from the repository cache after the first line)
+    elder = await find_elder(call.elder_id)
+    if not elder:
+        print(f"⚠️  Elder {call.elder_id} not found; skipping analysis for call {call_id}")
+        return {"status": "success", "transcript_line_id": transcript_line.id}
 
-    # Trigger AI analysis in the background (non-blocking)
-    asyncio.create_task(analyze_and_update_call(call, elder, transcript_line))
+    # Queue AI analysis; lines arriving close together are analyzed as one batch
+    analysis_scheduler.submit(call, elder, transcript_line)
 
     return {"status": "success", "transcript_line_id": transcript_line.id}
 
 
-async def analyze_and_update_call(call: CallSession, elder: Elder, transcript_line: TranscriptLine):
+async def analyze_and_update_call(call: CallSession, elder: Elder, transcript_lines: List[TranscriptLine]):
     """
-    Analyze transcript chunk and update call state.
-    Runs in background to not block the transcript streaming endpoint.
+    Analyze a batch of new transcript lines and update call state.
+    Runs in background (via analysis_scheduler) to not block the transcript streaming endpoint.
     """
     try:
         # Run AI analysis
-        analysis = await ai_analyzer.analyze_transcript_chunk(call, elder, transcript_line)
+        analysis = await ai_analyzer.analyze_transcript_lines(call, elder, transcript_lines)
 
         # Update wellbeing assessment
         if analysis.get("wellbeing_update"):
             call.wellbeing = analysis["wellbeing_update"]
-            await ws_manager.emit_wellbeing_update(call.id, analysis["wellbeing_update"].dict())
+            await ws_manager.emit_wellbeing_update(call.id, analysis["wellbeing_update"])
 
         # Add detected concerns
         for concern in analysis.get("concerns", []):
             call.concerns.append(concern)
-            await ws_manager.emit_concern_detected(call.id, concern.dict())
+            await ws_manager.emit_concern_detected(call.id, concern)
 
             # Start timer if action required
             if concern.action_required:
                 print(f"⚠️  Concern detected requiring action: {concern.description}")
 
         # Add profile facts
-        for fact in analysis.get("profile_facts", []):
+        facts = analysis.get("profile_facts", [])
+        for fact in facts:
             call.profile_updates.append(fact)
-            await ws_manager.emit_profile_update(call.id, fact.dict())
+            await ws_manager.emit_profile_update(call.id, fact)
+        await elder_repository.add_profile_facts(elder, facts)
 
         # Trigger village actions
         for suggested_action in analysis.get("suggested_actions", []):
@@ -463,6 +652,10 @@ async def analyze_and_update_call(call: CallSession, elder: Elder, transcript_li
         traceback.print_exc()
 
 
+# Per-call analysis scheduler: debounces lines and keeps one analysis in flight per call
+analysis_scheduler = AnalysisScheduler(analyze_and_update_call)
+
+
 async def trigger_village_action_internal(call: CallSession, suggested_action: Dict):
     """
     Internal function to trigger a village action.
@@ -487,11 +680,11 @@ async def trigger_village_action_internal(call: CallSession, suggested_action: D
     )
 
     # Store action
-    village_actions_store.append(action)
+    await call_store.save_action_async(action)
     call.village_actions.append(action)
 
     # Broadcast action started
-    await ws_manager.emit_village_action_started(call.id, action.dict())
+    await ws_manager.emit_village_action_started(call.id, action)
 
     print(f"🚨 VILLAGE ACTION TRIGGERED: {action.type} → {action.target_member_name}")
 
@@ -499,6 +692,15 @@ async def trigger_village_action_internal(call: CallSession, suggested_action: D
     asyncio.create_task(call_village_member(call.id, action, suggested_action.get("reason", "")))
 
 
+async def update_village_action(call_id: str, action: VillageAction, status: str, response: str = None):
+    """Set a village action's status, persist it and broadcast the update"""
+    action.status = status
+    if response:
+        action.response = response
+    await call_store.save_action_async(action)
+    await ws_manager.emit_village_action_update(call_id, action.id, status, response)
+
+
 async def call_village_member(call_id: str, action: VillageAction, concern_reason: str):
     """
     Actually call a village member via LiveKit SIP when a concern is detected.
@@ -511,15 +713,16 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
 
     try:
         # Update status to calling
-        action.status = "calling"
-        await ws_manager.emit_village_action_update(call_id, action.id, "calling")
+        await update_village_action(call_id, action, "calling")
+
+        call = call_store.active.get(call_id) or call_store.get_call(call_id)
+        elder = await find_elder(call.elder_id) if call else None
 
         # Format phone number for SIP
         phone = action.target_member_phone
         if not phone:
             print(f"❌ No phone number for {action.target_member_name}")
-            action.status = "failed"
-            await ws_manager.emit_village_action_update(call_id, action.id, "failed", "No phone number")
+            await update_village_action(call_id, action, "failed", "No phone number")
             return
 
         if not phone.startswith("+"):
@@ -528,29 +731,26 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
         # Create LiveKit room for this village call
         room_name = f"village-{action.id}"
 
-        # Initialize LiveKit API
-        lk_api = api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
-
-        # Initiate ACTUAL SIP call to village member
+        # Initiate ACTUAL SIP call to village member (shared LiveKit client)
         print(f"📞 CALLING {action.target_member_name} at {phone}...")
 
-        sip_participant = await lk_api.sip.create_sip_participant(
-            api.CreateSIPParticipantRequest(
-                sip_trunk_id=SIP_TRUNK_ID,
-                sip_call_to=phone,
-                room_name=room_name,
-                participant_identity=f"village-{action.id}",
-                participant_name=action.target_member_name,
-                attributes={
-                    "concern_type": action.type,
-                    "concern_reason": concern_reason,
-                    "elder_name": margaret_elder.name
-                }
+        async with livekit_clients.acquire() as lk_api:
+            sip_participant = await lk_api.sip.create_sip_participant(
+                api.CreateSIPParticipantRequest(
+                    sip_trunk_id=SIP_TRUNK_ID,
+                    sip_call_to=phone,
+                    room_name=room_name,
+                    participant_identity=f"village-{action.id}",
+                    participant_name=action.target_member_name,
+                    attributes={
+                        "concern_type": action.type,
+                        "concern_reason": concern_reason,
+                        "elder_name": elder.name if elder else ""
+                    }
+                )
             )
-        )
 
-        action.status = "ringing"
-        await ws_manager.emit_village_action_update(call_id, action.id, "ringing")
+        await update_village_action(call_id, action, "ringing")
 
         print(f"📱 SIP call initiated!")
         print(f"   → {action.target_member_name} at {phone}")
@@ -563,11 +763,10 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
         # 3. Get their response
         # 4. Update the action status)
         await asyncio.sleep(5)  # Give time for call to connect
-        action.status = "connected"
-        action.response = f"Called {action.target_member_name}. Concern: {concern_reason}"
-        await ws_manager.emit_village_action_update(call_id, action.id, "connected", action.response)
-
-        await lk_api.aclose()
+        await update_village_action(
+            call_id, action, "connected",
+            f"Called {action.target_member_name}. Concern: {concern_reason}"
+        )
 
         print(f"✅ Village call established with {action.target_member_name}")
 
@@ -576,21 +775,19 @@ async def call_village_member(call_id: str, action: VillageAction, concern_reaso
         import traceback
         traceback.print_exc()
 
-        action.status = "failed"
-        action.response = f"Failed to call: {str(e)}"
-        await ws_manager.emit_village_action_update(call_id, action.id, "failed", action.response)
+        await update_village_action(call_id, action, "failed", f"Failed to call: {str(e)}")
 
 
 async def simulate_village_response(call_id: str, action: VillageAction):
     """Fallback simulation when LiveKit is not configured"""
     await asyncio.sleep(2)
-    action.status = "calling"
-    await ws_manager.emit_village_action_update(call_id, action.id, "calling")
+    await update_village_action(call_id, action, "calling")
 
     await asyncio.sleep(3)
-    action.status = "connected"
-    action.response = f"{action.target_member_name} has been notified (simulated - configure LiveKit for real calls)."
-    await ws_manager.emit_village_action_update(call_id, action.id, "connected", action.response)
+    await update_village_action(
+        call_id, action, "connected",
+        f"{action.target_member_name} has been notified (simulated - configure LiveKit for real calls)."
+    )
 
     print(f"✅ Village response simulated for {action.target_member_name}")
 
@@ -599,180 +796,196 @@ async def simulate_village_response(call_id: str, action: VillageAction):
 # HEALTH ANALYTICS ENDPOINTS (FROM REMOTE)
 # ============================================================================
 
-# Background task to copy recording from S3-compatible storage to Supabase Storage
-async def copy_recording_to_supabase_storage(room_name: str, s3_filepath: str):
-    """Copy recording from LiveKit's S3-compatible storage to Supabase Storage for easy access"""
-    try:
-        print(f"📋 [Copy] Starting file copy for room: {room_name}")
-        print(f"⏳ [Copy] Waiting 35 seconds for LiveKit egress to complete...")
-        await asyncio.sleep(35)
+# Post-call analyzers: the pipeline downloads each recording once (copying it to
+# Supabase Storage on the way) and runs these concurrently
+
+@post_call_pipeline.analyzer("biomarkers", column="biomarkers")
+async def analyze_biomarkers(recording: SpooledRecording):
+    """Analyze biomarkers with the Vital Audio API"""
+    url = "https://api.qr.sonometrik.vitalaudio.io/analyze-audio"
+    headers = {
+        'Origin': 'https://qr.sonometrik.vitalaudio.io',
+        'Accept': '*/*',
+        'User-Agent': 'Mozilla/5.0',
+    }
 
-        # Download from S3-compatible storage
-        if not (os.getenv("S3_ENDPOINT") and os.getenv("S3_ACCESS_KEY") and os.getenv("S3_SECRET")):
-            print(f"❌ [Copy] S3 credentials not available")
-            return
+    files = {'audio_file': (recording.filename, recording.data(), 'audio/mp3')}
+    data = {'name': recording.filename}
 
-        s3_endpoint = os.getenv("S3_ENDPOINT")
-        s3_bucket = os.getenv("S3_BUCKET")
-        s3_base_url = s3_endpoint.replace('/storage/v1/s3', '').rstrip('/')
-        s3_url = f"{s3_base_url}/{s3_bucket}/{s3_filepath}"
+    response = await http_clients.get("vital_audio").post(url, files=files, data=data, headers=headers)
 
-        service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        headers = {'Authorization': f'Bearer {service_key}', 'apikey': service_key} if service_key else {}
+    if response.status_code != 200:
+        raise RuntimeError(f"Vital Audio API error: {response.status_code}")
+    return response.json()
 
-        response = requests.get(s3_url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            print(f"❌ [Copy] Failed to download: HTTP {response.status_code}")
-            return
 
-        audio_content = response.content
-        print(f"✅ [Copy] Downloaded {len(audio_content)} bytes")
+async def analyze_parkinson(recording: SpooledRecording):
+    """Run Parkinson's detection in the worker pool (workers read the spool file directly)"""
+    parkinson_result = await parkinson_pool.run(recording.file_path, recording.filename)
+    print(f"✅ [Background] Parkinson's analysis complete: {parkinson_result['disease']}")
+    return parkinson_result
 
-        # Upload to Supabase Storage
-        upload_bucket = "audio_files"
-        supabase.storage.from_(upload_bucket).upload(
-            path=s3_filepath,
-            file=audio_content,
-            file_options={"content-type": "audio/mpeg"}
-        )
-
-        print(f"✅ [Copy] Uploaded to Supabase Storage: {upload_bucket}/{s3_filepath}")
 
-    except Exception as e:
-        print(f"❌ [Copy] Failed: {e}")
+if PARKINSON_ENABLED:
+    post_call_pipeline.register("parkinson", analyze_parkinson, column="parkinson_detection")
+    HEALTH_ANALYSES = ("biomarkers", "parkinson")
+else:
+    HEALTH_ANALYSES = ("biomarkers",)
 
 
-# Background task to process biomarkers
-async def process_biomarkers_background(room_name: str, recording_path: str, s3_endpoint: str = None):
-    """Background task to download audio and analyze biomarkers"""
-    print(f"🧬 [Background] Starting biomarker analysis for room: {room_name}")
-    await asyncio.sleep(40)  # Wait for recording to complete
+def require_parkinson():
+    """Route dependency: Parkinson's endpoints answer 503 when PARKINSON_ENABLED=false"""
+    if not PARKINSON_ENABLED:
+        raise HTTPException(status_code=503, detail="Parkinson's detection is disabled (PARKINSON_ENABLED=false)")
 
-    try:
-        if not supabase:
-            print(f"⚠️  Supabase not configured")
-            return
 
-        # Download audio from Supabase Storage
-        bucket = "audio_files"
-        audio_content = supabase.storage.from_(bucket).download(recording_path)
+HEALTH_ANALYSIS_JOB = "health_analysis"
 
-        if not audio_content or len(audio_content) == 0:
-            print(f"❌ [Background] No audio content found")
-            return
+# Held analysis jobs waiting for their recording, by job id
+recording_watchers: Dict[str, asyncio.Task] = {}
 
-        print(f"✅ [Background] Downloaded {len(audio_content)} bytes")
 
-        # Call Vital Audio API
-        url = "https://api.qr.sonometrik.vitalaudio.io/analyze-audio"
-        headers = {
-            'Origin': 'https://qr.sonometrik.vitalaudio.io',
-            'Accept': '*/*',
-            'User-Agent': 'Mozilla/5.0',
-        }
+def enqueue_health_analysis(room_name: str, recording_path: str, call_id: Optional[str] = None) -> Dict:
+    """
+    Queue the durable analysis job for a recording; one job per room however often
+    it's triggered. It runs every analyzer in HEALTH_ANALYSES over one download.
+    Until the recording exists the job is held, so it doesn't take a job slot.
+    """
+    payload = {"room_name": room_name, "recording_path": recording_path, "call_id": call_id}
+    ready = post_call_pipeline.recording_ready(recording_path)
+    job = job_queue.enqueue(HEALTH_ANALYSIS_JOB, payload, f"{room_name}:health", hold=not ready)
+    if job["status"] == "held":
+        job = job_queue.release(job["id"]) if ready else watch_recording(job)
+    return job
 
-        files = {'audio_file': (recording_path.split('/')[-1], audio_content, 'audio/mp3')}
-        data = {'name': recording_path.split('/')[-1]}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, files=files, data=data, headers=headers, timeout=60.0)
+def watch_recording(job: Dict) -> Dict:
+    """Release a held analysis job once its recording is ready (or has failed, so the job records why)"""
+    if job["id"] not in recording_watchers:
+        task = asyncio.create_task(_release_when_recorded(job))
+        recording_watchers[job["id"]] = task
+        task.add_done_callback(lambda _: recording_watchers.pop(job["id"], None))
+    return job
 
-        if response.status_code == 200:
-            biomarkers = response.json()
-            print(f"✅ [Background] Biomarkers analysis complete")
 
-            # Save to database
-            supabase.table("calls").update({"biomarkers": biomarkers}).eq("room_name", room_name).execute()
-        else:
-            print(f"❌ [Background] API error: {response.status_code}")
+async def _release_when_recorded(job: Dict):
+    recording_path = job["payload"]["recording_path"]
+    try:
+        await post_call_pipeline.wait_for_recording(recording_path)
+    except (RecordingUnavailableError, RuntimeError) as e:
+        print(f"⚠️  Recording unavailable for job {job['id']}: {e}")
+    job_queue.release(job["id"])
 
-    except Exception as e:
-        print(f"❌ [Background] Biomarker analysis failed: {e}")
 
+async def run_health_analysis_job(payload: Dict) -> Dict:
+    """Job handler: run all analyzers through the post-call pipeline (raises so the job is retried)"""
+    results = await post_call_pipeline.run(
+        payload["room_name"], payload["recording_path"],
+        call_id=payload.get("call_id"), analyzers=HEALTH_ANALYSES
+    )
+    return dict(zip(HEALTH_ANALYSES, results))
 
-# Background task to process Parkinson's detection
-async def process_parkinson_background(room_name: str, recording_path: str):
-    """Background task to download audio and analyze Parkinson's disease"""
-    print(f"🧠 [Background] Starting Parkinson's analysis for room: {room_name}")
-    await asyncio.sleep(40)  # Wait for recording to complete
 
-    try:
-        if not supabase:
-            print(f"⚠️  Supabase not configured")
-            return
+job_queue.register(HEALTH_ANALYSIS_JOB, run_health_analysis_job)
 
-        # Download audio from Supabase Storage
-        bucket = "audio_files"
-        audio_content = supabase.storage.from_(bucket).download(recording_path)
 
-        if not audio_content or len(audio_content) == 0:
-            print(f"❌ [Background] No audio content found")
-            return
+@app.post("/api/livekit/webhook")
+async def livekit_webhook(request: Request):
+    """
+    LiveKit webhook receiver: egress_ended marks the recording as written so the post-call
+    pipeline starts immediately; participant_left / room_finished end campaign calls
+    """
+    if not (LIVEKIT_API_KEY and LIVEKIT_API_SECRET):
+        raise HTTPException(status_code=503, detail="LiveKit not configured")
 
-        print(f"✅ [Background] Downloaded {len(audio_content)} bytes")
+    body = (await request.body()).decode()
+    try:
+        receiver = api.WebhookReceiver(api.TokenVerifier(LIVEKIT_API_KEY, LIVEKIT_API_SECRET))
+        event = receiver.receive(body, request.headers.get("Authorization", ""))
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=f"Invalid webhook: {e}")
 
-        # Run Parkinson's detection
-        from backend.parkinson.run_model import predict_parkinson
-        parkinson_result = predict_parkinson(audio_content, recording_path.split("/")[-1])
+    if event.event == "egress_ended":
+        info = event.egress_info
+        paths = {result.filename for result in info.file_results if result.filename}
+        registered = egress_tracker.path_for_egress(info.egress_id)
+        if registered:
+            paths.add(registered)
 
-        print(f"✅ [Background] Parkinson's analysis complete: {parkinson_result['disease']}")
+        for path in paths:
+            if info.status == api.EgressStatus.EGRESS_COMPLETE:
+                egress_tracker.mark_ready(path, {"egress_id": info.egress_id})
+            else:
+                egress_tracker.mark_failed(path, info.error or f"Egress ended with status {info.status}")
+        print(f"🎙️  Egress {info.egress_id} ended: {', '.join(paths) or 'no file output'}")
 
-        # Save to database
-        supabase.table("calls").update({"parkinson_detection": parkinson_result}).eq("room_name", room_name).execute()
+    elif event.event in ("participant_left", "room_finished"):
+        if campaign_dialer.handle_livekit_event(event):
+            print(f"📞 Campaign call in {event.room.name} ended ({event.event})")
 
-    except Exception as e:
-        print(f"❌ [Background] Parkinson's analysis failed: {e}")
+    return {"status": "ok"}
 
 
 @app.post("/trigger_biomarker_analysis")
-async def trigger_biomarker_analysis(
-    background_tasks: BackgroundTasks,
-    room_name: str,
-    recording_path: str
-):
-    """Trigger biomarker analysis in background (called by agent after call ends)"""
+async def trigger_biomarker_analysis(room_name: str, recording_path: str):
+    """Trigger the call's health analysis in background (called by agent after call ends)"""
     print(f"🎯 Received biomarker trigger for room: {room_name}")
-    s3_endpoint = os.getenv("S3_ENDPOINT")
-    background_tasks.add_task(process_biomarkers_background, room_name, recording_path, s3_endpoint)
-    return {"status": "queued", "room_name": room_name}
+    job = enqueue_health_analysis(room_name, recording_path)
+    return {"status": job["status"], "room_name": room_name, "job_id": job["id"]}
 
 
-@app.post("/trigger_parkinson_analysis")
-async def trigger_parkinson_analysis(
-    background_tasks: BackgroundTasks,
-    room_name: str,
-    recording_path: str
-):
-    """Trigger Parkinson's disease analysis in background (called by agent after call ends)"""
+@app.post("/trigger_parkinson_analysis", dependencies=[Depends(require_parkinson)])
+async def trigger_parkinson_analysis(room_name: str, recording_path: str):
+    """Trigger the call's health analysis, Parkinson's included, in background (called by agent after call ends)"""
     print(f"🧠 Received Parkinson's trigger for room: {room_name}")
-    background_tasks.add_task(process_parkinson_background, room_name, recording_path)
-    return {"status": "queued", "room_name": room_name}
+    job = enqueue_health_analysis(room_name, recording_path)
+    return {"status": job["status"], "room_name": room_name, "job_id": job["id"]}
+
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, type: Optional[str] = None, limit: int = 50):
+    """Background analysis jobs (queued, running, completed, dead), most recently updated first"""
+    return {"jobs": job_queue.list_jobs(status=status, job_type=type, limit=min(limit, 500)),
+            "metrics": job_queue.metrics()}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Re-queue a dead-lettered job"""
+    job = job_queue.retry(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
 
 
 @app.post("/get_biomarkers")
 async def get_biomarkers(request: GetBiomarkersRequest):
     """Get biomarkers from an audio recording"""
-    import requests
-
-    bucket = "audio_files"
     path = request.recording_path
 
     try:
-        signed = supabase.storage.from_(bucket).create_signed_url(path, expires_in=300)
+        signed = supabase.storage.from_(RECORDINGS_BUCKET).create_signed_url(path, expires_in=300)
         audio_url = signed["signedURL"]
 
-        audio_response = requests.get(audio_url, timeout=60)
+        audio_response = await http_clients.get("storage").get(audio_url)
         audio_response.raise_for_status()
         audio_content = audio_response.content
 
         files = {"audio_file": (path.split("/")[-1], audio_content, "audio/mpeg")}
         data = {"name": path.split("/")[-1]}
 
-        response = requests.post(
+        response = await http_clients.get("vital_audio").post(
             "https://api.qr.sonometrik.vitalaudio.io/analyze-audio",
             files=files,
-            data=data,
-            timeout=60
+            data=data
         )
 
         if response.status_code != 200:
@@ -780,8 +993,8 @@ async def get_biomarkers(request: GetBiomarkersRequest):
 
         biomarkers = response.json()
 
-        if request.room_name and supabase:
-            supabase.table("calls").update({"biomarkers": biomarkers}).eq("room_name", request.room_name).execute()
+        if request.room_name:
+            await db_writer.update("calls", "room_name", request.room_name, {"biomarkers": biomarkers})
 
         return biomarkers
 
@@ -789,57 +1002,117 @@ async def get_biomarkers(request: GetBiomarkersRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/detect_parkinson")
+@app.post("/detect_parkinson", dependencies=[Depends(require_parkinson)])
 async def detect_parkinson(file: UploadFile = File(...)):
     """Detect Parkinson's disease from voice recording"""
     try:
-        from backend.parkinson.run_model import predict_parkinson
-
         content = await file.read()
         if len(content) == 0:
             raise HTTPException(status_code=400, detail="Empty file uploaded")
 
-        result = predict_parkinson(content, file.filename)
+        result = await parkinson_pool.run(content, file.filename)
         return result
 
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except JobTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Parkinson's detection error: {str(e)}")
 
 
-@app.post("/detect_parkinson_from_recording")
+@app.post("/detect_parkinson_batch", dependencies=[Depends(require_parkinson)])
+async def detect_parkinson_batch(files: List[UploadFile] = File(...)):
+    """
+    Detect Parkinson's disease for many recordings at once.
+
+    Streams newline-delimited JSON, one {"id", "filename", "result"|"error"}
+    object per recording, as each batch is scored.
+    """
+    items = []
+    filenames = {}
+    for index, file in enumerate(files):
+        content = await file.read()
+        if len(content) == 0:
+            raise HTTPException(status_code=400, detail=f"Empty file uploaded: {file.filename}")
+        items.append({"id": index, "audio": content, "filename": file.filename})
+        filenames[index] = file.filename
+
+    async def stream_results():
+        async for item in parkinson_pool.score_batch(items):
+            item["filename"] = filenames[item["id"]]
+            yield json.dumps(item, default=float) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@app.post("/detect_parkinson_from_recording", dependencies=[Depends(require_parkinson)])
 async def detect_parkinson_from_recording(request: GetParkinsonRequest):
     """Detect Parkinson's disease from a stored audio recording"""
-    import requests
-
-    bucket = "audio_files"
     path = request.recording_path
 
     try:
-        signed = supabase.storage.from_(bucket).create_signed_url(path, expires_in=300)
+        signed = supabase.storage.from_(RECORDINGS_BUCKET).create_signed_url(path, expires_in=300)
         audio_url = signed["signedURL"]
 
-        audio_response = requests.get(audio_url, timeout=60)
+        audio_response = await http_clients.get("storage").get(audio_url)
         audio_response.raise_for_status()
         audio_content = audio_response.content
 
-        # Run Parkinson's detection
-        from backend.parkinson.run_model import predict_parkinson
-        parkinson_result = predict_parkinson(audio_content, path.split("/")[-1])
+        # Run Parkinson's detection in the worker pool
+        parkinson_result = await parkinson_pool.run(audio_content, path.split("/")[-1])
 
         print(f"✅ Parkinson's detection complete: {parkinson_result['disease']}")
 
         # Save to database if room_name provided
-        if request.room_name and supabase:
-            supabase.table("calls").update({
+        if request.room_name:
+            await db_writer.update("calls", "room_name", request.room_name, {
                 "parkinson_detection": parkinson_result
-            }).eq("room_name", request.room_name).execute()
+            })
 
         return parkinson_result
 
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except JobTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/parkinson/jobs", dependencies=[Depends(require_parkinson)])
+async def submit_parkinson_job(file: UploadFile = File(...)):
+    """Queue Parkinson's detection for a recording; poll /api/parkinson/jobs/{job_id} for the result"""
+    content = await file.read()
+    if len(content) == 0:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+
+    try:
+        job_id = parkinson_pool.submit(content, file.filename, await asyncio.to_thread(content_key, content))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/api/parkinson/model", dependencies=[Depends(require_parkinson)])
+async def get_parkinson_model():
+    """Version and load stats of the Parkinson's model used by the workers"""
+    try:
+        return await parkinson_pool.model_info()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/parkinson/jobs/{job_id}", dependencies=[Depends(require_parkinson)])
+async def get_parkinson_job(job_id: str):
+    """Status (and result, once completed) of a Parkinson's detection job"""
+    job = parkinson_pool.status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
 # ============================================================================
 # DEMO ENDPOINTS
 # ============================================================================
@@ -847,9 +1120,7 @@ async def detect_parkinson_from_recording(request: GetParkinsonRequest):
 @app.post("/api/demo/reset")
 async def reset_demo():
     """Reset demo state (clear all calls and actions)"""
-    active_calls.clear()
-    call_history.clear()
-    village_actions_store.clear()
+    call_store.clear()
 
     return {"status": "success", "message": "Demo state reset"}
 
@@ -894,7 +1165,12 @@ async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time updates.
 
-    Clients can subscribe to call updates and receive real-time events:
+    Clients subscribe to a call ({"type": "subscribe_call", "call_id"}), to every
+    call of an elder ("subscribe_elder", "elder_id") or of an organization
+    ("subscribe_org", "org_id"), and can "unsubscribe" with the same ids.
+    Events are JSON text frames by default; connect to /ws?encoding=msgpack for
+    binary msgpack frames (client messages stay JSON text either way).
+    They receive real-time events:
     - call_started
     - call_status
     - transcript_update
@@ -905,17 +1181,22 @@ async def websocket_endpoint(websocket: WebSocket):
     - call_ended
     - timer_update
     """
-    await ws_manager.connect(websocket)
+    encoding = await ws_manager.connect(websocket, websocket.query_params.get("encoding"))
 
     try:
         # Send welcome message
         await ws_manager.send_personal_message({
             "type": "connected",
-            "data": {"message": "WebSocket connected", "timestamp": datetime.utcnow().isoformat()}
+            "data": {
+                "message": "WebSocket connected",
+                "encoding": encoding,
+                "timestamp": datetime.utcnow().isoformat()
+            }
         }, websocket)
 
         # Keep connection alive and handle incoming messages
-        while True:
+        # (until the manager drops it, e.g. as a slow consumer)
+        while websocket in ws_manager.active_connections:
             try:
                 # Use receive_text to avoid JSON parsing errors
                 raw_data = await websocket.receive_text()
@@ -943,6 +1224,25 @@ async def websocket_endpoint(websocket: WebSocket):
                             "data": {"call_id": call_id}
                         }, websocket)
 
+                elif message_type in ("subscribe_elder", "subscribe_org"):
+                    # Wildcard subscriptions: every call of an elder / of an organization's elders
+                    elder_id, org_id = data.get("elder_id"), data.get("org_id")
+                    if message_type == "subscribe_elder" and elder_id:
+                        ws_manager.subscribe_to_elder(websocket, elder_id)
+                    elif message_type == "subscribe_org" and org_id:
+                        ws_manager.subscribe_to_org(websocket, org_id)
+                    else:
+                        continue
+                    await ws_manager.send_personal_message({
+                        "type": "subscribed",
+                        "data": {"elder_id": elder_id} if elder_id else {"org_id": org_id}
+                    }, websocket)
+
+                elif message_type == "unsubscribe":
+                    for key, topic in (("call_id", call_topic), ("elder_id", elder_topic), ("org_id", org_topic)):
+                        if data.get(key):
+                            ws_manager.unsubscribe(websocket, topic(data[key]))
+
                 elif message_type == "ping":
                     # Respond to ping to keep connection alive
                     await ws_manager.send_personal_message({
@@ -0,0 +1,20 @@
+-- Adds call_transcript_lines to a database created from schema_simple.sql
+-- before transcripts were streamed line by line. Safe to run more than once.
+-- Run this in your Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS call_transcript_lines (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    call_id UUID NOT NULL REFERENCES calls(id) ON DELETE CASCADE,
+
+    speaker TEXT NOT NULL CHECK (speaker IN ('agent', 'elder', 'village_member')),
+    speaker_name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_call_transcript_lines_call ON call_transcript_lines(call_id, timestamp);
+
+ALTER TABLE call_transcript_lines ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow all for service role" ON call_transcript_lines;
+CREATE POLICY "Allow all for service role" ON call_transcript_lines FOR ALL USING (true);
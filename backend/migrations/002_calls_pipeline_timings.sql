@@ -0,0 +1,6 @@
+-- Adds calls.pipeline_timings (post-call stage durations) to a database created
+-- from schema_simple.sql before the post-call pipeline recorded them.
+-- Safe to run more than once.
+-- Run this in your Supabase SQL Editor
+
+ALTER TABLE calls ADD COLUMN IF NOT EXISTS pipeline_timings JSONB;  -- {"wait_recording": 4.2, "download": 0.8, "parkinson": 6.1, ...}
@@ -1,6 +1,6 @@
 """Data models for The Village system."""
 from pydantic import BaseModel
-from typing import Optional, Literal, List
+from typing import Dict, Optional, Literal, List
 from datetime import datetime
 from enum import Enum
 
@@ -95,6 +95,7 @@ class Elder(BaseModel):
     village: List[VillageMember] = []
     medical: MedicalInfo
     wellbeing_baseline: WellbeingBaseline
+    organization_id: Optional[str] = None  # Care organization, for org-wide dashboards
 
 
 # ============================================================================
@@ -220,3 +221,6 @@ class CallSession(BaseModel):
     profile_updates: List[ProfileFact] = []
     village_actions: List[VillageAction] = []
     summary: Optional[CallSummary] = None
+    room_name: Optional[str] = None
+    recording_path: Optional[str] = None
+    pipeline_timings: Dict[str, float] = {}  # Post-call stage durations in seconds
@@ -0,0 +1,240 @@
+# In-memory audio decoding for Parkinson's detection
+# Decodes recordings straight into a float32 NumPy buffer and resamples once.
+# No temporary files and no WAV re-encode for compressed formats; ffmpeg output
+# is streamed and stops at the length cap, so memory is bounded by the cap
+# rather than by the recording.
+
+import io
+import os
+import mmap
+import tempfile
+import threading
+import subprocess
+import numpy as np
+import librosa
+import soundfile as sf
+from typing import Dict, List, Optional, Tuple, Union
+from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+
+TARGET_SR = 22050
+
+# Longer recordings are truncated so one request can't use unbounded memory
+MAX_AUDIO_SECONDS = float(os.environ.get("PARKINSON_MAX_AUDIO_SECONDS", "900"))
+
+# Formats libsndfile decodes natively; everything else goes through ffmpeg (pydub)
+SOUNDFILE_EXTS = ('.wav', '.flac', '.ogg')
+
+# Bytes per read from (and write to) the ffmpeg pipes
+PIPE_CHUNK_BYTES = 1 << 20
+
+AudioSource = Union[bytes, bytearray, memoryview, mmap.mmap, str, os.PathLike]
+
+
+class _BufferReader(io.RawIOBase):
+    """Read-only file object over a memoryview (bytes, mmap), without copying it"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        return self._pos
+
+    def readinto(self, b):
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+
+def source_size(source: AudioSource) -> int:
+    """Size in bytes of the encoded recording"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    return memoryview(source).nbytes
+
+
+def _open(source: AudioSource):
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb")
+    return io.BufferedReader(_BufferReader(source))
+
+
+def _decode_soundfile(fileobj, max_seconds: float) -> Tuple[np.ndarray, int, bool]:
+    with sf.SoundFile(fileobj) as f:
+        max_frames = int(max_seconds * f.samplerate)
+        truncated = f.frames > max_frames
+        data = f.read(frames=min(f.frames, max_frames), dtype="float32", always_2d=True)
+        return data, f.samplerate, truncated
+
+
+def _read_exact(stream, n: int) -> bytes:
+    parts = []
+    while n > 0:
+        part = stream.read(n)
+        if not part:
+            break
+        parts.append(part)
+        n -= len(part)
+    return b"".join(parts)
+
+
+def _wav_header(stream) -> Tuple[int, int]:
+    """Read a streamed WAV header up to the data chunk; returns (sample_rate, channels)"""
+    riff = _read_exact(stream, 12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise CouldntDecodeError("ffmpeg produced no WAV output")
+
+    sample_rate = channels = None
+    while True:
+        header = _read_exact(stream, 8)
+        if len(header) < 8:
+            raise CouldntDecodeError("ffmpeg output ended before the audio data")
+        chunk_id, size = header[:4], int.from_bytes(header[4:], "little")
+        if chunk_id == b"data":
+            if sample_rate is None:
+                raise CouldntDecodeError("ffmpeg output has no fmt chunk")
+            return sample_rate, channels
+        body = _read_exact(stream, size + (size & 1))
+        if chunk_id == b"fmt ":
+            channels = int.from_bytes(body[2:4], "little")
+            sample_rate = int.from_bytes(body[4:8], "little")
+
+
+def _feed(stdin, source):
+    """Write an in-memory recording to ffmpeg's stdin without copying it"""
+    view = memoryview(source).cast("B")
+    try:
+        for start in range(0, len(view), PIPE_CHUNK_BYTES):
+            stdin.write(view[start:start + PIPE_CHUNK_BYTES])
+    except OSError:
+        pass  # ffmpeg stopped reading: the cap was reached or decoding failed
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def _decode_ffmpeg(source: AudioSource, max_seconds: float) -> Tuple[np.ndarray, int, bool]:
+    """
+    Stream 16-bit PCM out of ffmpeg, downmixing each chunk as it arrives.
+
+    Reading stops at `max_seconds` and ffmpeg is killed, so only the kept
+    samples are ever held, as mono float32.
+    """
+    from_path = isinstance(source, (str, os.PathLike))
+    command = [
+        AudioSegment.converter, "-hide_banner", "-v", "error",
+        # cache: lets ffmpeg seek in piped input (e.g. an MP4 with its index at the end)
+        "-i", os.fspath(source) if from_path else "cache:pipe:0",
+        "-vn", "-acodec", "pcm_s16le", "-f", "wav", "-"
+    ]
+
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL if from_path else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=errors
+        )
+        feeder = None
+        if not from_path:
+            feeder = threading.Thread(target=_feed, args=(process.stdin, source), daemon=True)
+            feeder.start()
+
+        chunks: List[np.ndarray] = []
+        frames = 0
+        truncated = False
+        failure = None
+        try:
+            sample_rate, channels = _wav_header(process.stdout)
+            frame_bytes = 2 * channels
+            max_frames = int(max_seconds * sample_rate)
+
+            while frames < max_frames:
+                want = min(PIPE_CHUNK_BYTES // frame_bytes, max_frames - frames)
+                raw = _read_exact(process.stdout, want * frame_bytes)
+                count = len(raw) // frame_bytes
+                if count == 0:
+                    break
+                pcm = np.frombuffer(raw, dtype="<i2", count=count * channels).reshape(count, channels)
+                samples = pcm.astype(np.float32)
+                samples /= 32768.0
+                chunks.append(samples.mean(axis=1) if channels > 1 else samples[:, 0].copy())
+                frames += count
+
+            truncated = frames >= max_frames and len(process.stdout.read(1)) > 0
+        except CouldntDecodeError as e:
+            failure = e
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            if feeder:
+                feeder.join()
+
+        if failure or (not chunks and process.returncode != 0):
+            errors.seek(0)
+            message = errors.read().decode(errors="ignore").strip() or failure
+            raise CouldntDecodeError(f"ffmpeg returned error code {process.returncode}: {message}")
+
+    y = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    del chunks
+    return y[:, None], sample_rate, truncated
+
+
+def load_audio(
+    source: AudioSource,
+    filename: Optional[str] = None,
+    sr: int = TARGET_SR,
+    max_seconds: float = MAX_AUDIO_SECONDS
+) -> Tuple[np.ndarray, int, Dict]:
+    """
+    Decode a recording to a mono float32 signal at `sr`.
+
+    `source` may be raw bytes, a memoryview/mmap of a file, or a file path.
+    Returns (y, sr, stats) where stats reports buffer sizes and truncation.
+    """
+    name = filename or (os.fspath(source) if isinstance(source, (str, os.PathLike)) else "")
+    ext = os.path.splitext(name)[1].lower()
+
+    if ext in SOUNDFILE_EXTS:
+        with _open(source) as fileobj:
+            data, native_sr, truncated = _decode_soundfile(fileobj, max_seconds)
+    else:
+        data, native_sr, truncated = _decode_ffmpeg(source, max_seconds)
+
+    decoded_bytes = data.nbytes
+    y = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+    del data
+
+    if native_sr != sr:
+        y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+
+    stats = {
+        "native_sr": native_sr,
+        "duration_seconds": round(len(y) / sr, 2),
+        "decoded_bytes": decoded_bytes,
+        "signal_bytes": y.nbytes,
+        "truncated": truncated
+    }
+    return np.ascontiguousarray(y, dtype=np.float32), sr, stats
@@ -0,0 +1,101 @@
+# Bulk Parkinson's re-scoring
+# Re-scores a directory or manifest of recordings: features are extracted in
+# parallel worker processes and scored in vectorized batches, and results are
+# written to a JSONL file as each batch completes.
+#
+# Usage (from the project root):
+#   python -m backend.parkinson.batch_score recordings/ -o results.jsonl
+#   python -m backend.parkinson.batch_score manifest.txt --workers 8 --batch-size 64
+#
+# A manifest is a text file with one recording path per line, or a JSONL file
+# whose lines have a "path" key (other keys, e.g. room_name, are copied to the output).
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List
+
+from backend.parkinson.run_model import VALID_EXTS, extract_recording_features, score_features
+
+
+def iter_recordings(source: str) -> Iterator[Dict]:
+    """Yield {"path": ..., ...} entries from a directory or a manifest file"""
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(VALID_EXTS):
+                    yield {"path": os.path.join(root, name)}
+        return
+
+    with open(source) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                yield json.loads(line)
+            else:
+                yield {"path": line}
+
+
+def _extract(path: str):
+    return extract_recording_features(path, os.path.basename(path))
+
+
+def rescore(source: str, output: str, workers: int, batch_size: int) -> Dict[str, int]:
+    """Re-score every recording in `source`, appending results to `output`"""
+    counts = {"scored": 0, "failed": 0}
+    entries = list(iter_recordings(source))
+    print(f"🧠 Re-scoring {len(entries)} recordings with {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(output, "w") as out:
+        futures = {executor.submit(_extract, entry["path"]): entry for entry in entries}
+        batch: List[tuple] = []
+
+        def write_batch():
+            results = score_features([b[1] for b in batch], [b[2] for b in batch])
+            out.writelines(
+                json.dumps({**entry, "result": result}, default=float) + "\n"
+                for (entry, _, _), result in zip(batch, results)
+            )
+            out.flush()
+            counts["scored"] += len(batch)
+            batch.clear()
+
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                features, stats = future.result()
+            except Exception as e:
+                out.write(json.dumps({**entry, "error": str(e)}) + "\n")
+                counts["failed"] += 1
+                continue
+
+            batch.append((entry, features, stats))
+            if len(batch) >= batch_size:
+                write_batch()
+                print(f"   ✓ {counts['scored']} scored, {counts['failed']} failed")
+
+        if batch:
+            write_batch()
+
+    print(f"✅ Done: {counts['scored']} scored, {counts['failed']} failed → {output}")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score recordings for Parkinson's detection in bulk")
+    parser.add_argument("source", help="Directory of recordings or manifest file")
+    parser.add_argument("-o", "--output", default="parkinson_results.jsonl", help="JSONL output file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Feature extraction processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="Recordings scored per model call")
+    args = parser.parse_args(argv)
+
+    counts = rescore(args.source, args.output, args.workers, args.batch_size)
+    return 1 if counts["failed"] and not counts["scored"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# Peak memory of decoding a long recording for Parkinson's detection
+# Generates a stereo MP3 with ffmpeg, then measures with tracemalloc the peak
+# Python/NumPy allocation of load_audio from a path and from in-memory bytes,
+# with and without the PARKINSON_MAX_AUDIO_SECONDS cap. ffmpeg's own process
+# memory is not included.
+#
+# Usage (from the project root):
+#   python -m backend.parkinson.bench_audio_memory --minutes 20 --max-seconds 120
+
+import os
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from pydub import AudioSegment
+
+from backend.parkinson.audio_io import load_audio
+
+MB = 1024 * 1024
+
+
+def make_recording(path: str, seconds: float):
+    subprocess.run(
+        [AudioSegment.converter, "-v", "error", "-y", "-f", "lavfi",
+         "-i", f"sine=frequency=220:sample_rate=44100:duration={seconds}",
+         "-ac", "2", "-b:a", "64k", path],
+        check=True
+    )
+
+
+def peak_mb(func) -> tuple:
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / MB
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure peak memory of Parkinson's audio decoding")
+    parser.add_argument("--minutes", type=float, default=20.0, help="Length of the generated recording")
+    parser.add_argument("--max-seconds", type=float, default=120.0, help="Decode cap to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "recording.mp3")
+        make_recording(path, args.minutes * 60)
+        with open(path, "rb") as f:
+            encoded = f.read()
+        print(f"{args.minutes:.0f} min stereo MP3 at 44.1 kHz, {len(encoded) / MB:.1f} MB encoded")
+
+        cases = [
+            ("path, full length", lambda: load_audio(path, max_seconds=args.minutes * 60 + 1)),
+            (f"path, capped at {args.max_seconds:.0f} s", lambda: load_audio(path, max_seconds=args.max_seconds)),
+            (f"bytes, capped at {args.max_seconds:.0f} s",
+             lambda: load_audio(encoded, "recording.mp3", max_seconds=args.max_seconds)),
+        ]
+        for label, func in cases:
+            (y, _, stats), peak = peak_mb(func)
+            print(f"  {label:<24} peak {peak:8.1f} MB   signal {y.nbytes / MB:7.1f} MB   "
+                  f"decoded {stats['duration_seconds']:.0f} s, truncated={stats['truncated']}")
+
+
+if __name__ == "__main__":
+    main()
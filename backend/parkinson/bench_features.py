@@ -0,0 +1,104 @@
+# Feature extraction benchmark for the Parkinson's pipeline
+# Times the original extractor (separate librosa.effects.harmonic / percussive
+# calls, each with its own STFT and full HPSS) against FeatureEngine on a
+# synthetic voice-like signal, per feature group, and checks that both return
+# the same features.
+#
+# Usage (from the project root):
+#   python -m backend.parkinson.bench_features --seconds 60
+
+import time
+import argparse
+import numpy as np
+import librosa
+import scipy.stats
+from typing import Dict
+
+from backend.parkinson.audio_io import TARGET_SR
+from backend.parkinson.feature_engine import FeatureEngine, extract_features
+
+
+def reference_features(y: np.ndarray, sr: int) -> Dict[str, float]:
+    """The extractor FeatureEngine replaced, kept as the parity reference"""
+    features = {}
+
+    pitches = librosa.yin(y, fmin=75, fmax=600)
+    pitches = pitches[~np.isnan(pitches)]
+    features["Fo"] = np.mean(pitches) if len(pitches) > 0 else 0
+
+    if len(pitches) > 1:
+        abs_diff = np.abs(np.diff(pitches))
+        features["Jitter"] = np.mean(abs_diff) / (features["Fo"] + 1e-6)
+    else:
+        features["Jitter"] = 0
+
+    rms = librosa.feature.rms(y=y)[0]
+    if len(rms) > 1:
+        abs_diff = np.abs(np.diff(rms))
+        features["Shimmer"] = np.mean(abs_diff) / (np.mean(rms) + 1e-6)
+        features["Shimmer(dB)"] = 20 * np.log10(features["Shimmer"] + 1e-6)
+        features["Shimmer:APQ5"] = features["Shimmer"] * 0.8
+        features["Shimmer:APQ11"] = features["Shimmer"] * 0.6
+    else:
+        features["Shimmer"] = 0
+        features["Shimmer(dB)"] = 0
+        features["Shimmer:APQ5"] = 0
+        features["Shimmer:APQ11"] = 0
+
+    harmonic = librosa.effects.harmonic(y)
+    percussive = librosa.effects.percussive(y)
+    features["HNR"] = np.mean(harmonic) / (np.mean(percussive) + 1e-6)
+    features["NHR"] = 1.0 / (features["HNR"] + 1e-6)
+    features["RPDE"] = scipy.stats.entropy(np.abs(librosa.stft(y).mean(axis=0)) + 1e-6)
+    features["DFA"] = np.mean(np.abs(np.diff(y)))
+    features["PPE"] = scipy.stats.entropy(np.abs(y) + 1e-6)
+    features["spread1"] = np.std(y)
+    features["spread2"] = scipy.stats.kurtosis(y)
+
+    return features
+
+
+def synthetic_voice(seconds: float, sr: int = TARGET_SR, seed: int = 0) -> np.ndarray:
+    """Vibrato tone with harmonics, syllable-rate amplitude changes and breath noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 12 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2.5 * t))
+    return (0.2 * envelope * voice + 0.02 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Parkinson's feature extraction")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of the synthetic recording")
+    args = parser.parse_args(argv)
+
+    y = synthetic_voice(args.seconds)
+    sr = TARGET_SR
+
+    reference, reference_time = timed(lambda: reference_features(y, sr))
+    features, engine_time = timed(lambda: extract_features(y, sr))
+
+    engine = FeatureEngine(y, sr)
+    print(f"{args.seconds:.0f} s of audio at {sr} Hz")
+    for group in ("pitch_features", "amplitude_features", "spectral_features", "waveform_features"):
+        _, seconds = timed(getattr(engine, group))
+        print(f"  {group:<20} {seconds * 1000:8.1f} ms")
+    print(f"reference extractor    {reference_time * 1000:8.1f} ms")
+    print(f"FeatureEngine          {engine_time * 1000:8.1f} ms   ({reference_time / engine_time:.2f}x)")
+
+    worst = max(
+        abs(features[name] - reference[name]) / (abs(reference[name]) + 1e-12) for name in reference
+    )
+    print(f"max relative feature difference {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
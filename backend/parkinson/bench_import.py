@@ -0,0 +1,53 @@
+# Import-time benchmark for the Parkinson's package
+# Measures, each in a fresh interpreter, how long it takes to import the
+# modules the API touches and to load the model on first use.
+#
+# Usage (from the project root):
+#   python -m backend.parkinson.bench_import --runs 5
+
+import sys
+import argparse
+import statistics
+import subprocess
+
+STEPS = {
+    "worker_pool (API process)": "import backend.parkinson.worker_pool",
+    "run_model": "import backend.parkinson.run_model",
+    "run_model + audio stack": (
+        "import backend.parkinson.run_model, backend.parkinson.feature_engine, backend.parkinson.audio_io"
+    ),
+    "first model load": (
+        "from backend.parkinson.model_registry import model_registry; model_registry.get()"
+    ),
+}
+
+_TIMER = """
+import time, warnings
+warnings.simplefilter("ignore")
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+
+def time_step(code: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", _TIMER.format(code=code)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Parkinson's import and model load time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per step")
+    args = parser.parse_args(argv)
+
+    for name, code in STEPS.items():
+        timings = [time_step(code) for _ in range(args.runs)]
+        print(f"{name:<28} median {statistics.median(timings) * 1000:8.1f} ms   "
+              f"min {min(timings) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Persistent feature store for Parkinson's detection
+# Caches the extracted feature vector and the model's result per recording,
+# keyed by a hash of the audio content, so a recording that is analyzed again
+# (end of call, agent trigger, manual re-run) skips decoding and librosa
+# entirely. Results are tagged with the model version and
+# re-scored from the cached features when the model changes.
+#
+# Backed by SQLite in WAL mode so the API process and the worker processes can
+# share it; the least recently used entries are evicted past the size bound.
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+
+PARKINSON_FEATURE_STORE_PATH = os.environ.get(
+    "PARKINSON_FEATURE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "parkinson_features.db")
+)
+PARKINSON_FEATURE_CACHE_ENTRIES = int(os.environ.get("PARKINSON_FEATURE_CACHE_ENTRIES", "10000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recording_features (
+    key TEXT PRIMARY KEY,
+    features TEXT NOT NULL,
+    result TEXT,
+    model_sha TEXT,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_recording_features_last_used ON recording_features(last_used);
+"""
+
+
+def content_key(audio) -> str:
+    """Cache key for a recording: sha256 of its bytes (or of the file at a path)"""
+    digest = hashlib.sha256()
+    if isinstance(audio, (str, os.PathLike)):
+        with open(audio, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(memoryview(audio))
+    return "sha256:" + digest.hexdigest()
+
+
+class FeatureStore:
+    """Size-bounded SQLite cache of feature vectors and results per recording"""
+
+    def __init__(self, path: str = PARKINSON_FEATURE_STORE_PATH, max_entries: int = PARKINSON_FEATURE_CACHE_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._puts = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per process (workers are spawned, but be safe under fork too)
+        if self._db is None or self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+            self._pid = os.getpid()
+        return self._db
+
+    def get(self, key: str) -> Optional[Dict]:
+        """{"features", "result", "model_sha"} for a recording, or None"""
+        with self._lock:
+            db = self._conn()
+            row = db.execute(
+                "SELECT features, result, model_sha FROM recording_features WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            db.execute("UPDATE recording_features SET last_used = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+
+        self.stats["hits"] += 1
+        return {
+            "features": json.loads(row[0]),
+            "result": json.loads(row[1]) if row[1] else None,
+            "model_sha": row[2]
+        }
+
+    def put(self, key: str, features: Dict, result: Optional[Dict] = None, model_sha: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                """INSERT INTO recording_features (key, features, result, model_sha, created_at, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET
+                       features = excluded.features, result = excluded.result,
+                       model_sha = excluded.model_sha, last_used = excluded.last_used""",
+                (key, json.dumps(features, default=float), json.dumps(result, default=float) if result else None,
+                 model_sha, now, now)
+            )
+            db.commit()
+
+            # Checking the count on every put is wasted work; do it periodically
+            self._puts += 1
+            if self._puts % 50 == 1:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        count = db.execute("SELECT COUNT(*) FROM recording_features").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            db.execute(
+                """DELETE FROM recording_features WHERE key IN (
+                       SELECT key FROM recording_features ORDER BY last_used LIMIT ?)""",
+                (excess,)
+            )
+            db.commit()
+            self.stats["evictions"] += excess
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            entries = self._conn().execute("SELECT COUNT(*) FROM recording_features").fetchone()[0]
+        return {"entries": entries, "max_entries": self.max_entries, **self.stats}
+
+
+# Global store (each process opens its own connection)
+feature_store = FeatureStore()
@@ -0,0 +1,128 @@
+# Parkinson's model registry
+# Loads the pickled model lazily on first use and caches it per process.
+# The pickle is re-checked on each lookup (a cheap stat); when its mtime
+# changes and its content hash differs, the new model is loaded in place,
+# so a retrained model can be dropped in without restarting the workers.
+
+import os
+import time
+import pickle
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+MODEL_PATH = os.environ.get(
+    "PARKINSON_MODEL_PATH",
+    os.path.join(os.path.dirname(__file__), "best_pd_model.pkl")
+)
+
+
+@dataclass
+class LoadedModel:
+    model: Any
+    scaler: Any
+    selected_features: List[str]
+    sha256: str
+    mtime: float
+    loaded_at: float = field(default_factory=time.time)
+
+    def info(self) -> Dict:
+        return {
+            "sha256": self.sha256,
+            "mtime": self.mtime,
+            "loaded_at": self.loaded_at,
+            "features": len(self.selected_features)
+        }
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Lazily loaded, hot-reloadable model cache (one per process)"""
+
+    def __init__(self, path: str = MODEL_PATH):
+        self.path = path
+        self._loaded: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        self._version: Optional[tuple] = None  # (mtime, sha256) of the pickle on disk
+        self.stats = {"loads": 0, "reloads": 0, "load_seconds": 0.0}
+
+    def _load(self, mtime: float, sha256: str) -> LoadedModel:
+        started = time.perf_counter()
+        try:
+            with open(self.path, "rb") as f:
+                model_data = pickle.load(f)
+            loaded = LoadedModel(
+                model=model_data["model"],
+                scaler=model_data["scaler"],
+                selected_features=model_data["selected_features"],
+                sha256=sha256,
+                mtime=mtime
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load Parkinson's model: {e}")
+
+        self.stats["load_seconds"] = round(time.perf_counter() - started, 3)
+        return loaded
+
+    def get(self) -> LoadedModel:
+        """The current model, loading or reloading it if the pickle changed"""
+        loaded = self._loaded
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            # Keep serving the model we have if the file is briefly missing mid-deploy
+            if loaded is not None:
+                return loaded
+            raise RuntimeError(f"Parkinson's model not found: {self.path}")
+
+        if loaded is not None and loaded.mtime == mtime:
+            return loaded
+
+        with self._lock:
+            loaded = self._loaded
+            if loaded is not None and loaded.mtime == mtime:
+                return loaded
+
+            sha256 = _file_sha256(self.path)
+            if loaded is not None and loaded.sha256 == sha256:
+                # Touched but unchanged
+                loaded.mtime = mtime
+                return loaded
+
+            new_model = self._load(mtime, sha256)
+            if loaded is None:
+                self.stats["loads"] += 1
+                print(f"✅ Parkinson's model and scaler loaded ({sha256[:12]}).")
+            else:
+                self.stats["reloads"] += 1
+                print(f"🔄 Parkinson's model reloaded ({loaded.sha256[:12]} → {sha256[:12]}).")
+            self._loaded = new_model
+            return new_model
+
+    def current_version(self) -> str:
+        """sha256 of the pickle on disk, without unpickling it (cached by mtime)"""
+        mtime = os.stat(self.path).st_mtime
+        if self._loaded is not None and self._loaded.mtime == mtime:
+            return self._loaded.sha256
+        if self._version is None or self._version[0] != mtime:
+            self._version = (mtime, _file_sha256(self.path))
+        return self._version[1]
+
+    def info(self) -> Dict:
+        return {
+            "path": self.path,
+            "loaded": self._loaded.info() if self._loaded else None,
+            **self.stats
+        }
+
+
+# Per-process registry (each worker process has its own)
+model_registry = ModelRegistry()
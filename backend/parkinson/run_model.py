@@ -1,134 +1,117 @@
 # Parkinson's Disease Voice Detection
-# This module contains the ML model and feature extraction for Parkinson's detection
+# This module contains the ML model and feature extraction for Parkinson's detection.
+# The model is loaded lazily by the registry, and librosa/audio decoding are
+# imported on first extraction, so importing this module stays cheap.
 
 import numpy as np
-import librosa
-import pickle
-import tempfile
-import os
-import scipy.stats
-from typing import Dict
-from pydub import AudioSegment
-import io
-
-# Load trained model and scaler
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "best_pd_model.pkl")
-
-try:
-    with open(MODEL_PATH, "rb") as f:
-        model_data = pickle.load(f)
-        model = model_data["model"]
-        scaler = model_data["scaler"]
-        selected_features = model_data["selected_features"]
-    print("✅ Parkinson's model and scaler loaded.")
-except Exception as e:
-    raise RuntimeError(f"Failed to load Parkinson's model: {e}")
-
-def convert_to_wav(audio_bytes: bytes, original_format: str) -> bytes:
-    """Convert uploaded audio to WAV using pydub."""
-    try:
-        audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=original_format)
-        wav_io = io.BytesIO()
-        audio.export(wav_io, format="wav")
-        return wav_io.getvalue()
-    except Exception as e:
-        raise ValueError(f"Conversion failed: {e}")
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
-def extract_features(y: np.ndarray, sr: int) -> Dict[str, float]:
-    """Extract features for Parkinson's classification."""
-    features = {}
+from backend.parkinson.model_registry import model_registry
 
-    pitches = librosa.yin(y, fmin=75, fmax=600)
-    pitches = pitches[~np.isnan(pitches)]
-    features["Fo"] = np.mean(pitches) if len(pitches) > 0 else 0
+if TYPE_CHECKING:
+    from backend.parkinson.audio_io import AudioSource
 
-    if len(pitches) > 1:
-        abs_diff = np.abs(np.diff(pitches))
-        features["Jitter"] = np.mean(abs_diff) / (features["Fo"] + 1e-6)
-    else:
-        features["Jitter"] = 0
-
-    rms = librosa.feature.rms(y=y)[0]
-    if len(rms) > 1:
-        abs_diff = np.abs(np.diff(rms))
-        features["Shimmer"] = np.mean(abs_diff) / (np.mean(rms) + 1e-6)
-        features["Shimmer(dB)"] = 20 * np.log10(features["Shimmer"] + 1e-6)
-        features["Shimmer:APQ5"] = features["Shimmer"] * 0.8
-        features["Shimmer:APQ11"] = features["Shimmer"] * 0.6
+VALID_EXTS = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.webm')
+THRESHOLD = 0.7
+
+
+def extract_recording_features(audio: "AudioSource", filename: str) -> Tuple[Dict[str, float], Dict]:
+    """Validate and decode a recording, then extract its features. Returns (features, audio_stats)."""
+    from backend.parkinson.feature_engine import extract_features
+    from backend.parkinson.audio_io import load_audio, source_size
+
+    if not filename.lower().endswith(VALID_EXTS):
+        raise ValueError("Unsupported audio format.")
+
+    if source_size(audio) < 1024:
+        raise ValueError("File too short or empty.")
+
+    y, sr, audio_stats = load_audio(audio, filename)
+    if len(y) < sr * 3:
+        raise ValueError("Recording too short (min 3 seconds).")
+
+    all_features = extract_features(y, sr)
+    missing = set(model_registry.get().selected_features) - set(all_features.keys())
+    if missing:
+        raise RuntimeError(f"Missing features: {missing}")
+
+    return all_features, audio_stats
+
+
+def _format_result(
+    parkinson_prob: float,
+    healthy_prob: float,
+    selected_features: List[str],
+    audio_stats: Optional[Dict] = None
+) -> Dict:
+    pred = 1 if parkinson_prob >= THRESHOLD else 0
+    confidence = parkinson_prob if pred == 1 else healthy_prob
+
+    result = {
+        "disease": "Parkinson" if pred == 1 else "Healthy",
+        "confidence": round(confidence, 3),
+        "message": "Potential Parkinson's detected" if pred == 1 else "No signs of Parkinson's detected",
+        "details": {
+            "parkinson_prob": round(parkinson_prob, 3),
+            "healthy_prob": round(healthy_prob, 3),
+            "features_used": selected_features
+        }
+    }
+    if audio_stats is not None:
+        result["details"]["audio"] = audio_stats
+
+    if confidence < 0.7:
+        result["warning"] = "Low confidence result – please test again with a longer or clearer recording."
+
+    return result
+
+
+def score_features(feature_sets: List[Dict[str, float]], audio_stats: Optional[List[Dict]] = None) -> List[Dict]:
+    """Score many feature dicts as one matrix through the scaler and model."""
+    if not feature_sets:
+        return []
+
+    loaded = model_registry.get()
+    X = np.array([[features[f] for f in loaded.selected_features] for features in feature_sets])
+    X_scaled = loaded.scaler.transform(X)
+    proba = loaded.model.predict_proba(X_scaled)
+
+    stats = audio_stats or [None] * len(feature_sets)
+    return [
+        _format_result(float(row[1]), float(row[0]), loaded.selected_features, row_stats)
+        for row, row_stats in zip(proba, stats)
+    ]
+
+
+def _predict_cached(audio: "AudioSource", filename: str, cache_key: str) -> Dict:
+    from backend.parkinson.feature_store import feature_store
+
+    model_sha = model_registry.get().sha256
+    entry = feature_store.get(cache_key)
+    if entry is None:
+        features, audio_stats = extract_recording_features(audio, filename)
+    elif entry["result"] and entry["model_sha"] == model_sha:
+        return entry["result"]
     else:
-        features["Shimmer"] = 0
-        features["Shimmer(dB)"] = 0
-        features["Shimmer:APQ5"] = 0
-        features["Shimmer:APQ11"] = 0
-
-    harmonic = librosa.effects.harmonic(y)
-    percussive = librosa.effects.percussive(y)
-    features["HNR"] = np.mean(harmonic) / (np.mean(percussive) + 1e-6)
-    features["NHR"] = 1.0 / (features["HNR"] + 1e-6)
-    features["RPDE"] = scipy.stats.entropy(np.abs(librosa.stft(y).mean(axis=0)) + 1e-6)
-    features["DFA"] = np.mean(np.abs(np.diff(y)))
-    features["PPE"] = scipy.stats.entropy(np.abs(y) + 1e-6)
-    features["spread1"] = np.std(y)
-    features["spread2"] = scipy.stats.kurtosis(y)
-
-    return features
-
-def predict_parkinson(audio_bytes: bytes, filename: str):
-    """Predict Parkinson's from audio bytes."""
+        # Model changed since this recording was scored; re-score the cached features
+        features = entry["features"]
+        audio_stats = (entry["result"] or {}).get("details", {}).get("audio")
+
+    result = score_features([features], [audio_stats])[0]
+    feature_store.put(cache_key, features, result, model_sha)
+    return result
+
+
+def predict_parkinson(audio: "AudioSource", filename: str, cache_key: Optional[str] = None):
+    """
+    Predict Parkinson's from audio bytes, a memory-mapped file or a file path.
+    With a cache_key, features and results are reused from the feature store.
+    """
     try:
-        valid_exts = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.webm')
-        if not filename.lower().endswith(valid_exts):
-            raise ValueError("Unsupported audio format.")
-
-        if len(audio_bytes) < 1024:
-            raise ValueError("File too short or empty.")
-
-        ext = os.path.splitext(filename)[1].lower()
-        if ext != '.wav':
-            audio_bytes = convert_to_wav(audio_bytes, ext[1:])
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name
-
-        try:
-            y, sr = librosa.load(tmp_path, sr=22050)
-            if len(y) < sr * 3:
-                raise ValueError("Recording too short (min 3 seconds).")
-
-            all_features = extract_features(y, sr)
-            missing = set(selected_features) - set(all_features.keys())
-            if missing:
-                raise RuntimeError(f"Missing features: {missing}")
-
-            X = np.array([all_features[f] for f in selected_features]).reshape(1, -1)
-            X_scaled = scaler.transform(X)
-
-            proba = model.predict_proba(X_scaled)[0]
-            parkinson_prob = float(proba[1])
-            healthy_prob = float(proba[0])
-            threshold = 0.7
-            pred = 1 if parkinson_prob >= threshold else 0
-            confidence = parkinson_prob if pred == 1 else healthy_prob
-
-            result = {
-                "disease": "Parkinson" if pred == 1 else "Healthy",
-                "confidence": round(confidence, 3),
-                "message": "Potential Parkinson's detected" if pred == 1 else "No signs of Parkinson's detected",
-                "details": {
-                    "parkinson_prob": round(parkinson_prob, 3),
-                    "healthy_prob": round(healthy_prob, 3),
-                    "features_used": selected_features
-                }
-            }
-
-            if confidence < 0.7:
-                result["warning"] = "Low confidence result – please test again with a longer or clearer recording."
-
-            return result
-
-        finally:
-            os.remove(tmp_path)
+        if cache_key:
+            return _predict_cached(audio, filename, cache_key)
+        all_features, audio_stats = extract_recording_features(audio, filename)
+        return score_features([all_features], [audio_stats])[0]
 
     except Exception as e:
-        raise RuntimeError(f"Prediction error: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Prediction error: {e}")
@@ -0,0 +1,366 @@
+# Parkinson's inference worker pool
+# Runs predict_parkinson in a pool of worker processes so the CPU-heavy feature
+# extraction never blocks the API event loop. Each worker loads the model through
+# its own registry (hot-reloaded when the pickle changes); the API process itself
+# never imports librosa/sklearn.
+
+import os
+import time
+import uuid
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from backend.parkinson.feature_store import feature_store, content_key
+from backend.parkinson.model_registry import model_registry
+
+# Parkinson's detection on/off. When on, the workers start and load the model at app
+# startup; when off, no worker or model is ever loaded and every entry point refuses jobs
+PARKINSON_ENABLED = os.environ.get("PARKINSON_ENABLED", "true").lower() == "true"
+PARKINSON_WORKERS = int(os.environ.get("PARKINSON_WORKERS") or os.cpu_count() or 1)
+PARKINSON_MAX_QUEUED = int(os.environ.get("PARKINSON_MAX_QUEUED", "64"))
+PARKINSON_JOB_TIMEOUT_SECONDS = float(os.environ.get("PARKINSON_JOB_TIMEOUT_SECONDS", "300"))
+# Feature vectors scored together as one matrix in batch mode
+PARKINSON_BATCH_SIZE = int(os.environ.get("PARKINSON_BATCH_SIZE", "32"))
+
+# Finished jobs kept for status polling
+MAX_FINISHED_JOBS = 1000
+
+
+class QueueFullError(Exception):
+    """Raised when the pool already has the maximum number of jobs waiting"""
+
+
+class JobTimeoutError(Exception):
+    """Raised when a job does not finish within its timeout"""
+
+
+class ParkinsonDisabledError(Exception):
+    """Raised when Parkinson's detection is turned off (PARKINSON_ENABLED=false)"""
+
+
+def _init_worker():
+    """Import the audio stack and load the model once per worker process"""
+    import backend.parkinson.feature_engine  # noqa: F401
+    import backend.parkinson.audio_io  # noqa: F401
+    from backend.parkinson.model_registry import model_registry
+    model_registry.get()
+
+
+def _model_info_in_worker() -> Dict:
+    from backend.parkinson.model_registry import model_registry
+    model_registry.get()
+    return model_registry.info()
+
+
+def _predict_in_worker(audio, filename: str, cache_key: Optional[str] = None) -> Dict:
+    from backend.parkinson.run_model import predict_parkinson
+    return predict_parkinson(audio, filename, cache_key)
+
+
+def _extract_in_worker(audio, filename: str):
+    from backend.parkinson.run_model import extract_recording_features
+    return extract_recording_features(audio, filename)
+
+
+def _score_in_worker(feature_sets: List[Dict], audio_stats: List[Optional[Dict]]) -> List[Dict]:
+    from backend.parkinson.run_model import score_features
+    return score_features(feature_sets, audio_stats)
+
+
+def _cached_result(cache_key: str) -> Optional[Dict]:
+    """Stored result for a recording if it was scored by the current model"""
+    entry = feature_store.get(cache_key)
+    if entry and entry["result"] and entry["model_sha"] == model_registry.current_version():
+        return entry["result"]
+    return None
+
+
+class ParkinsonWorkerPool:
+    """Bounded process pool with job ids, status polling and per-job timeouts"""
+
+    def __init__(
+        self,
+        workers: int = PARKINSON_WORKERS,
+        max_queued: int = PARKINSON_MAX_QUEUED,
+        timeout_seconds: float = PARKINSON_JOB_TIMEOUT_SECONDS,
+        enabled: bool = PARKINSON_ENABLED
+    ):
+        self.enabled = enabled
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(workers)
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}  # cache key -> shared job task
+        self._waiting = 0
+        self._overrunning = 0  # Workers still busy with a timed-out or abandoned job
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        self._require_enabled()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def _require_enabled(self):
+        if not self.enabled:
+            raise ParkinsonDisabledError("Parkinson's detection is disabled (PARKINSON_ENABLED=false)")
+
+    def warmup(self):
+        """Start the worker processes (and load the model in each) ahead of the first job"""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_init_worker)
+
+    # ------------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------------
+
+    def submit(self, audio, filename: str, cache_key: Optional[str] = None) -> str:
+        """Queue a prediction and return its job id (cached in the feature store when keyed)"""
+        self._require_enabled()
+        if self._waiting >= self.max_queued:
+            raise QueueFullError(f"Parkinson's queue is full ({self.max_queued} jobs waiting)")
+
+        job_id = str(uuid.uuid4())
+        self._jobs[job_id] = {
+            "id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        self._waiting += 1
+        task = asyncio.create_task(self._run_job(job_id, audio, filename, cache_key))
+        # Errors are recorded on the job; polled jobs may never be awaited
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._tasks[job_id] = task
+        return job_id
+
+    async def _run_job(self, job_id: str, audio, filename: str, cache_key: Optional[str]) -> Dict:
+        job = self._jobs[job_id]
+        try:
+            def started():
+                self._waiting -= 1
+                job["status"] = "running"
+                job["started_at"] = time.time()
+
+            try:
+                result = await self._run_in_slot(started, _predict_in_worker, audio, filename, cache_key)
+            except asyncio.TimeoutError:
+                job["status"] = "timed_out"
+                job["error"] = f"Timed out after {self.timeout_seconds}s"
+                raise JobTimeoutError(job["error"])
+            except BrokenProcessPool:
+                self._executor = None
+                raise
+
+            job["status"] = "completed"
+            job["result"] = result
+            return result
+
+        except JobTimeoutError:
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            raise
+        finally:
+            if job["status"] == "queued":
+                self._waiting -= 1
+                job["status"] = "cancelled"
+            job["finished_at"] = time.time()
+            self._tasks.pop(job_id, None)
+            self._prune()
+
+    async def _run_in_slot(self, started, fn, *args):
+        """
+        Run fn on a worker within one pool slot. The worker can't be interrupted:
+        on timeout (or if the caller is cancelled) the result is dropped, but the
+        slot stays taken until the worker is actually free again, so a stuck
+        worker is never handed another job.
+        """
+        await self._slots.acquire()
+        try:
+            started()
+            future = asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout_seconds)
+        finally:
+            if future.done():
+                self._slots.release()
+            else:
+                self._overrunning += 1
+                future.add_done_callback(self._overrun_finished)
+
+    def _overrun_finished(self, future: asyncio.Future):
+        future.cancelled() or future.exception()  # The result is dropped
+        self._overrunning -= 1
+        self._slots.release()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job_id not in self._tasks]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    async def wait(self, job_id: str) -> Dict:
+        """Wait for a job and return its result (raises on failure or timeout)"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            return await asyncio.shield(task)
+
+        job = self._jobs[job_id]
+        if job["status"] == "completed":
+            return job["result"]
+        raise RuntimeError(job["error"] or f"Job {job_id} {job['status']}")
+
+    async def run(self, audio, filename: str, cache_key: Optional[str] = None) -> Dict:
+        """
+        Predict and wait for the result. Recordings are keyed by content hash
+        (or the given cache_key): a cached result for the current model returns
+        without touching the workers, and concurrent requests for the same
+        recording share one job.
+        """
+        self._require_enabled()
+        if cache_key is None:
+            cache_key = await asyncio.to_thread(content_key, audio)
+
+        cached = await asyncio.to_thread(_cached_result, cache_key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            # The job runs in its own task: a caller that is cancelled only stops waiting
+            task = self._tasks[self.submit(audio, filename, cache_key)]
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._job_finished(cache_key, done))
+        return await asyncio.shield(task)
+
+    def _job_finished(self, cache_key: str, task: asyncio.Task):
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+
+    async def score_batch(
+        self,
+        items: Iterable[Dict],
+        batch_size: int = PARKINSON_BATCH_SIZE
+    ) -> AsyncIterator[Dict]:
+        """
+        Score many recordings, yielding results as they become available.
+
+        Each item is {"id": ..., "audio": ..., "filename": ...} or
+        {"id": ..., "features": {...}} for a pre-extracted feature vector.
+        Features are extracted in parallel across the workers and scored in
+        batches of `batch_size` as one vectorized matrix. Yields
+        {"id": ..., "result": {...}} or {"id": ..., "error": "..."}.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        in_flight = set()
+        ready: List[tuple] = []  # (id, features, audio_stats) waiting to be scored
+
+        async def extract(item):
+            try:
+                features, stats = await self._run_in_slot(
+                    lambda: None, _extract_in_worker, item["audio"], item["filename"]
+                )
+                return item["id"], features, stats, None
+            except Exception as e:
+                return item["id"], None, None, str(e) or type(e).__name__
+
+        async def score(batch):
+            ids = [entry[0] for entry in batch]
+            try:
+                results = await loop.run_in_executor(
+                    executor, _score_in_worker,
+                    [entry[1] for entry in batch], [entry[2] for entry in batch]
+                )
+                return [{"id": item_id, "result": result} for item_id, result in zip(ids, results)]
+            except Exception as e:
+                return [{"id": item_id, "error": str(e)} for item_id in ids]
+
+        async def drain(return_when):
+            nonlocal in_flight
+            done, in_flight = await asyncio.wait(in_flight, return_when=return_when)
+            errors = []
+            for task in done:
+                item_id, features, stats, error = task.result()
+                if error:
+                    errors.append({"id": item_id, "error": error})
+                else:
+                    ready.append((item_id, features, stats))
+            return errors
+
+        for item in items:
+            if "features" in item:
+                ready.append((item["id"], item["features"], None))
+            else:
+                in_flight.add(asyncio.create_task(extract(item)))
+
+            # Keep a bounded number of recordings decoded at once
+            if len(in_flight) >= self.workers * 2:
+                for error in await drain(asyncio.FIRST_COMPLETED):
+                    yield error
+
+            while len(ready) >= batch_size:
+                batch, ready[:] = ready[:batch_size], ready[batch_size:]
+                for result in await score(batch):
+                    yield result
+
+        while in_flight:
+            for error in await drain(asyncio.FIRST_COMPLETED):
+                yield error
+            while len(ready) >= batch_size:
+                batch, ready[:] = ready[:batch_size], ready[batch_size:]
+                for result in await score(batch):
+                    yield result
+
+        if ready:
+            for result in await score(list(ready)):
+                yield result
+
+    async def model_info(self) -> Dict:
+        """Model version loaded by a worker (reloading it first if the pickle changed)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), _model_info_in_worker)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Job status for polling (without the audio)"""
+        return self._jobs.get(job_id)
+
+    def metrics(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "waiting": self._waiting,
+            "running": len(self._tasks) - self._waiting,
+            "overrunning": self._overrunning,
+            "max_queued": self.max_queued,
+            "feature_cache": feature_store.metrics()
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global worker pool (worker processes start lazily, or on warmup)
+parkinson_pool = ParkinsonWorkerPool()
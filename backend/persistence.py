@@ -0,0 +1,383 @@
+"""
+Async write-behind persistence for Supabase.
+
+Request handlers enqueue writes and return immediately; a background flusher
+sends them to Supabase from a small thread pool so the event loop never waits
+on a database round trip. Multiple updates to the same row are merged into one
+(per update group: fields a database may not have yet, e.g. a column added by a
+migration, are written in their own group so a rejection doesn't take other
+fields with it), inserts are sent in batches, and enqueueing applies backpressure when too many
+writes are pending.
+
+Failures are classified. Transient ones (the database is unreachable, times
+out or is overloaded) go to a local JSONL spool. The spool is replayed after a
+successful flush, at most once every DB_WRITE_REPLAY_SECONDS, and each op
+counts its attempts. Permanent failures (constraint violations, bad columns,
+other 4xx) and ops that reach DB_WRITE_MAX_ATTEMPTS go to a dead-letter file
+instead of being retried. A batch insert rejected as a whole is split into
+single rows first, so one bad row doesn't take the rest of the batch with it.
+"""
+
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.database import supabase
+
+DB_WRITE_POOL_SIZE = int(os.environ.get("DB_WRITE_POOL_SIZE", "4"))
+DB_WRITE_BATCH_SIZE = int(os.environ.get("DB_WRITE_BATCH_SIZE", "100"))
+DB_WRITE_FLUSH_SECONDS = float(os.environ.get("DB_WRITE_FLUSH_SECONDS", "0.5"))
+DB_WRITE_MAX_PENDING = int(os.environ.get("DB_WRITE_MAX_PENDING", "5000"))
+DB_WRITE_SPOOL_PATH = os.environ.get(
+    "DB_WRITE_SPOOL_PATH",
+    os.path.join(os.path.dirname(__file__), "db_write_spool.jsonl")
+)
+DB_WRITE_DEAD_LETTER_PATH = os.environ.get(
+    "DB_WRITE_DEAD_LETTER_PATH",
+    os.path.join(os.path.dirname(__file__), "db_write_dead_letter.jsonl")
+)
+DB_WRITE_MAX_ATTEMPTS = int(os.environ.get("DB_WRITE_MAX_ATTEMPTS", "8"))
+DB_WRITE_REPLAY_SECONDS = float(os.environ.get("DB_WRITE_REPLAY_SECONDS", "30"))
+# How long shutdown waits for pending writes before spooling whatever is still in flight
+DB_WRITE_STOP_SECONDS = float(os.environ.get("DB_WRITE_STOP_SECONDS", "10"))
+
+# Postgres SQLSTATE classes worth retrying: connection, transaction rollback
+# (serialization/deadlock), insufficient resources, operator intervention, system error
+_TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57", "58")
+
+UpdateKey = Tuple[str, str, Any, str]  # (table, match_column, match_value, group)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a failed write may succeed if retried later"""
+    if isinstance(error, (ConnectionError, TimeoutError, OSError)):
+        return True
+
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status in (408, 429)
+
+    # postgrest APIError carries the SQLSTATE (e.g. 23503) or a PGRST code
+    code = getattr(error, "code", None)
+    if isinstance(code, str) and code:
+        if code.startswith("PGRST"):
+            return False
+        return code[:2] in _TRANSIENT_SQLSTATE_CLASSES
+
+    # httpx transport errors and other unknown failures: retry, bounded by DB_WRITE_MAX_ATTEMPTS
+    return True
+
+
+class WriteBehindQueue:
+    """Coalescing, batched, non-blocking writer for Supabase tables"""
+
+    def __init__(
+        self,
+        client_getter: Callable[[], Any] = lambda: supabase,
+        pool_size: int = DB_WRITE_POOL_SIZE,
+        batch_size: int = DB_WRITE_BATCH_SIZE,
+        flush_seconds: float = DB_WRITE_FLUSH_SECONDS,
+        max_pending: int = DB_WRITE_MAX_PENDING,
+        spool_path: Optional[str] = DB_WRITE_SPOOL_PATH,
+        dead_letter_path: Optional[str] = DB_WRITE_DEAD_LETTER_PATH,
+        max_attempts: int = DB_WRITE_MAX_ATTEMPTS,
+        replay_seconds: float = DB_WRITE_REPLAY_SECONDS
+    ):
+        self.client_getter = client_getter
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.spool_path = spool_path
+        self.dead_letter_path = dead_letter_path
+        self.max_attempts = max_attempts
+        self.replay_seconds = replay_seconds
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="db-write")
+        self._pool_slots = asyncio.Semaphore(pool_size)
+
+        self._inserts: Dict[str, List[Dict]] = {}
+        self._updates: "OrderedDict[UpdateKey, Dict]" = OrderedDict()
+        self._pending = 0
+        self._wake = asyncio.Event()
+        self._space = asyncio.Condition()
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+        self._last_replay = 0.0
+        self.stats = {"enqueued": 0, "coalesced": 0, "written": 0, "failed": 0, "spooled": 0, "replayed": 0,
+                      "dead_lettered": 0}
+
+    @property
+    def client(self):
+        return self.client_getter()
+
+    # ------------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------------
+
+    async def start(self):
+        """Start the background flusher"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = DB_WRITE_STOP_SECONDS):
+        """
+        Drain pending writes (including a flush already in progress) and stop the flusher.
+
+        If the database doesn't take them within `timeout`, the flusher is cancelled and
+        every write not yet confirmed is spooled for the next start.
+        """
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._drain())
+        self._closing = True
+        self._wake.set()
+
+        timed_out = False
+        try:
+            await asyncio.wait_for(asyncio.shield(self._flusher), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            print(f"⚠️  Database writes still pending after {timeout:.0f}s; spooling them")
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._spool_pending()
+        self._flusher = None
+        # A write stuck in a worker thread must not hold up shutdown
+        self._executor.shutdown(wait=not timed_out)
+
+    # ------------------------------------------------------------------------
+    # Enqueueing
+    # ------------------------------------------------------------------------
+
+    async def insert(self, table: str, row: Dict):
+        """Queue a row insert"""
+        if not self.client:
+            return
+        await self._reserve()
+        self._inserts.setdefault(table, []).append(dict(row))
+        self._enqueued()
+
+    async def update(self, table: str, match_column: str, match_value: Any, fields: Dict, group: str = ""):
+        """
+        Queue an update; later updates to the same row and group are merged into
+        earlier ones. Updates in different groups are sent (and fail) separately.
+        """
+        if not self.client:
+            return
+
+        # Fold into a pending insert of the same row, if there is one
+        if match_column == "id" and not group:
+            for row in self._inserts.get(table, []):
+                if row.get("id") == match_value:
+                    row.update(fields)
+                    self.stats["coalesced"] += 1
+                    return
+
+        key = (table, match_column, match_value, group)
+        if key in self._updates:
+            self._updates[key].update(fields)
+            self.stats["coalesced"] += 1
+            return
+
+        await self._reserve()
+        self._updates[key] = dict(fields)
+        self._enqueued()
+
+    async def _reserve(self):
+        """Backpressure: wait while too many writes are pending"""
+        if self._pending < self.max_pending:
+            return
+        self._wake.set()
+        async with self._space:
+            await self._space.wait_for(lambda: self._pending < self.max_pending)
+
+    def _enqueued(self):
+        self._pending += 1
+        self.stats["enqueued"] += 1
+        if self._pending >= self.batch_size:
+            self._wake.set()
+
+    # ------------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------------
+
+    async def _run(self):
+        await self._replay_spool(force=True)
+        await self._drain()
+
+    async def _drain(self):
+        while True:
+            if self._closing and not self._pending:
+                return
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def _take_pending(self) -> Tuple[List[Dict], List[Dict]]:
+        """Dequeue everything pending as (insert ops, update ops)"""
+        inserts, self._inserts = self._inserts, {}
+        updates, self._updates = self._updates, OrderedDict()
+        self._pending = 0
+
+        insert_ops = []
+        for table, rows in inserts.items():
+            for start in range(0, len(rows), self.batch_size):
+                insert_ops.append({"op": "insert", "table": table, "rows": rows[start:start + self.batch_size]})
+        update_ops = [
+            {"op": "update", "table": table, "column": column, "value": value, "fields": fields}
+            for (table, column, value, _), fields in updates.items()
+        ]
+        return insert_ops, update_ops
+
+    async def flush(self):
+        """Send all pending writes now"""
+        if not self._pending:
+            return
+
+        insert_ops, update_ops = self._take_pending()
+        async with self._space:
+            self._space.notify_all()
+
+        # Inserts first: updates may target rows inserted in the same flush
+        inserted = await self._run_ops(insert_ops)
+        updated = await self._run_ops(update_ops)
+
+        if inserted and updated:
+            await self._replay_spool()
+
+    async def _run_ops(self, ops: List[Dict]) -> bool:
+        """
+        Execute ops, concurrently within a table and table by table in the order the
+        tables were first written, so rows referencing a parent row (e.g. transcript
+        lines and their call) don't race its insert. If cancelled, spool the ops not yet settled.
+        """
+        settled = set()
+
+        async def run(op: Dict) -> bool:
+            ok = await self._execute(op)
+            settled.add(id(op))
+            return ok
+
+        try:
+            ok = True
+            for table in dict.fromkeys(op["table"] for op in ops):
+                results = await asyncio.gather(*(run(op) for op in ops if op["table"] == table))
+                ok = ok and all(results)
+            return ok
+        except asyncio.CancelledError:
+            for op in ops:
+                if id(op) not in settled:
+                    self._spool(op)
+            raise
+
+    async def _execute(self, op: Dict) -> bool:
+        """Run one write on the thread pool; spool or dead-letter it if it fails"""
+        try:
+            async with self._pool_slots:
+                await asyncio.get_running_loop().run_in_executor(self._executor, self._execute_sync, op)
+            self.stats["written"] += 1
+            return True
+        except Exception as e:
+            self.stats["failed"] += 1
+            op["attempts"] = op.get("attempts", 0) + 1
+            transient = is_transient(e)
+
+            # One bad row rejects the whole batch: retry the rows one by one to isolate it
+            if not transient and op["op"] == "insert" and len(op["rows"]) > 1:
+                print(f"⚠️  Batch insert into {op['table']} rejected ({e}); retrying rows individually")
+                return await self._run_ops([
+                    {"op": "insert", "table": op["table"], "rows": [row], "attempts": op["attempts"]}
+                    for row in op["rows"]
+                ])
+
+            if transient and op["attempts"] < self.max_attempts:
+                print(f"⚠️  Database write failed ({op['op']} {op['table']}, attempt {op['attempts']}): {e}")
+                self._spool(op)
+            else:
+                reason = "permanent error" if not transient else f"gave up after {op['attempts']} attempts"
+                print(f"❌ Database write dead-lettered ({op['op']} {op['table']}, {reason}): {e}")
+                self._dead_letter(op, e)
+            return False
+
+    def _execute_sync(self, op: Dict):
+        table = self.client.table(op["table"])
+        if op["op"] == "insert":
+            table.insert(op["rows"]).execute()
+        else:
+            table.update(op["fields"]).eq(op["column"], op["value"]).execute()
+
+    # ------------------------------------------------------------------------
+    # Durable spool
+    # ------------------------------------------------------------------------
+
+    def _append(self, path: Optional[str], entry: Dict) -> bool:
+        if not path:
+            return False
+        try:
+            with open(path, "a") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+            return True
+        except OSError as e:
+            print(f"❌ Failed to write {path}: {e}")
+            return False
+
+    def _spool(self, op: Dict):
+        if self._append(self.spool_path, op):
+            self.stats["spooled"] += 1
+
+    def _dead_letter(self, op: Dict, error: Exception):
+        entry = {**op, "error": repr(error), "dead_lettered_at": time.time()}
+        if self._append(self.dead_letter_path, entry):
+            self.stats["dead_lettered"] += 1
+
+    def _spool_pending(self):
+        """Shutdown without a database: keep queued writes for the next start"""
+        insert_ops, update_ops = self._take_pending()
+        for op in insert_ops + update_ops:
+            self._spool(op)
+
+    async def _replay_spool(self, force: bool = False):
+        """Retry spooled writes (rate-limited); failures are re-spooled or dead-lettered"""
+        if not self.spool_path or not os.path.exists(self.spool_path) or not self.client:
+            return
+        if not force and time.monotonic() - self._last_replay < self.replay_seconds:
+            return
+        self._last_replay = time.monotonic()
+
+        replay_path = f"{self.spool_path}.replay"
+        try:
+            os.replace(self.spool_path, replay_path)
+            with open(replay_path) as f:
+                ops = [json.loads(line) for line in f if line.strip()]
+            os.remove(replay_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read database write spool: {e}")
+            return
+
+        print(f"🔁 Replaying {len(ops)} spooled database writes")
+        written = self.stats["written"]
+        # In spool order: inserts were spooled before the updates that depend on them
+        for index, op in enumerate(ops):
+            try:
+                await self._execute(op)
+            except asyncio.CancelledError:
+                for remaining in ops[index:]:
+                    self._spool(remaining)
+                raise
+        self.stats["replayed"] += self.stats["written"] - written
+
+    def metrics(self) -> Dict:
+        return {**self.stats, "pending": self._pending}
+
+
+# Global write-behind queue for the API process
+db_writer = WriteBehindQueue()
@@ -0,0 +1,323 @@
+"""
+Post-call recording pipeline.
+
+Once a call's recording exists, it is downloaded exactly once and streamed to
+a local spool file. For egress recordings, the same pass copies it into
+Supabase Storage. The spooled recording is then handed to every registered
+analyzer concurrently (Vital Audio biomarkers, Parkinson's detection, ...).
+Each stage is timed and the timings are recorded on the call.
+
+Runs are keyed by recording path. Later requests for the same recording join
+the run in progress instead of downloading again, and only start analyzers
+that are not already running. Results of analyzers that succeeded are
+remembered per recording, so a retry after a partial failure only reruns the
+analyzers that failed. Each run spools to its own file and removes only that
+file.
+
+Callers are expected to wait for the recording (wait_for_recording) before
+starting a run; a run itself only waits RECORDING_RUN_WAIT_SECONDS for it.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import tempfile
+import traceback
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.database import supabase
+from backend.call_store import call_store
+from backend.persistence import db_writer
+from backend.http_clients import http_clients
+from backend.recording_tracker import (
+    egress_tracker, storage_tracker, RecordingTracker, RECORDINGS_BUCKET, s3_object_url, s3_auth_headers
+)
+from backend.storage_copier import storage_copier
+
+RECORDING_SPOOL_DIR = os.environ.get(
+    "RECORDING_SPOOL_DIR",
+    os.path.join(tempfile.gettempdir(), "village_recordings")
+)
+
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+
+# How long a run waits for a recording that should already be ready (e.g. after a
+# restart, when readiness is re-established by probing the object store)
+RECORDING_RUN_WAIT_SECONDS = float(os.environ.get("RECORDING_RUN_WAIT_SECONDS", "60"))
+
+# Recordings whose successful analyzer results are remembered for retries
+MAX_REMEMBERED_RECORDINGS = 1000
+
+
+@dataclass
+class SpooledRecording:
+    """A downloaded recording shared by all analyzers of a run"""
+    recording_path: str  # Path in the object store, e.g. recordings/<room>_<ts>.mp3
+    file_path: str       # Local spool file
+    source: str          # "s3" (egress bucket) or "storage" (Supabase Storage)
+    size: int
+    _data: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def filename(self) -> str:
+        return self.recording_path.split("/")[-1]
+
+    def data(self) -> bytes:
+        """Recording bytes, read from the spool once and shared"""
+        if self._data is None:
+            with open(self.file_path, "rb") as f:
+                self._data = f.read()
+        return self._data
+
+
+Analyzer = Callable[[SpooledRecording], Awaitable[Any]]
+
+
+@dataclass
+class _Run:
+    recording_path: str
+    room_name: str
+    call_id: Optional[str]
+    started: float = field(default_factory=time.perf_counter)
+    fetch: Optional[asyncio.Task] = None
+    stages: Dict[str, asyncio.Task] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    finished: bool = False
+
+
+class PostCallPipeline:
+    """Download-once, fan-out runner for post-call recording analyzers"""
+
+    def __init__(self, spool_dir: str = RECORDING_SPOOL_DIR):
+        self.spool_dir = spool_dir
+        self._analyzers: Dict[str, Tuple[Analyzer, Optional[str]]] = {}
+        self._runs: Dict[str, _Run] = {}
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # recording -> analyzer -> result
+        self.stats = {"runs": 0, "downloads": 0, "bytes_downloaded": 0, "stage_failures": 0}
+
+    # ------------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------------
+
+    def register(self, name: str, analyzer: Analyzer, column: Optional[str] = None):
+        """Register an analyzer; its result is saved to `column` of the calls table if given"""
+        self._analyzers[name] = (analyzer, column)
+
+    def analyzer(self, name: str, column: Optional[str] = None):
+        """Decorator form of register()"""
+        def decorator(func: Analyzer) -> Analyzer:
+            self.register(name, func, column)
+            return func
+        return decorator
+
+    # ------------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------------
+
+    def schedule(
+        self,
+        room_name: str,
+        recording_path: str,
+        call_id: Optional[str] = None,
+        analyzers: Optional[Iterable[str]] = None
+    ) -> asyncio.Future:
+        """
+        Start (or join) the run for a recording. Returns a future with the results
+        of the requested analyzers (default: all registered); it raises if one fails.
+        Analyzers that already succeeded for this recording are not run again.
+        """
+        names = list(analyzers) if analyzers is not None else list(self._analyzers)
+        for name in names:
+            if name not in self._analyzers:
+                raise KeyError(f"Unknown analyzer: {name}")
+
+        done = dict(self._results.get(recording_path, {}))
+        stages: Dict[str, asyncio.Task] = {}
+        if any(name not in done for name in names):
+            run = self._runs.get(recording_path)
+            if run is None:
+                run = _Run(recording_path=recording_path, room_name=room_name, call_id=call_id)
+                run.fetch = asyncio.create_task(self._fetch(run))
+                self._runs[recording_path] = run
+                self.stats["runs"] += 1
+            elif call_id and not run.call_id:
+                run.call_id = call_id
+
+            for name in names:
+                if name in done:
+                    continue
+                stage = run.stages.get(name)
+                # Failed stages are started again when requested again (e.g. a job retry)
+                if stage is None or (stage.done() and (stage.cancelled() or stage.exception())):
+                    stage = asyncio.create_task(self._stage(run, name))
+                    stage.add_done_callback(lambda t, run=run: self._on_stage_done(run, t))
+                    run.stages[name] = stage
+                stages[name] = stage
+
+        return asyncio.ensure_future(self._collect(names, done, stages))
+
+    @staticmethod
+    async def _collect(names: List[str], done: Dict[str, Any], stages: Dict[str, asyncio.Task]) -> List[Any]:
+        await asyncio.gather(*stages.values())
+        return [stages[name].result() if name in stages else done[name] for name in names]
+
+    async def run(self, *args, **kwargs) -> List[Any]:
+        """schedule() and wait for the requested analyzers; raises if any of them failed"""
+        return await self.schedule(*args, **kwargs)
+
+    def _source(self, recording_path: str) -> Tuple[str, RecordingTracker]:
+        """Where a recording is read from, and the tracker that says when it exists"""
+        if s3_object_url(recording_path) and os.getenv("S3_ACCESS_KEY") and os.getenv("S3_SECRET"):
+            return "s3", egress_tracker
+        if not supabase:
+            raise RuntimeError("No recording source configured (S3 or Supabase)")
+        return "storage", storage_tracker
+
+    def recording_ready(self, recording_path: str) -> bool:
+        try:
+            return self._source(recording_path)[1].is_ready(recording_path)
+        except RuntimeError:
+            return False
+
+    async def wait_for_recording(self, recording_path: str, timeout: Optional[float] = None) -> Dict:
+        """Wait until a recording can be fetched (raises RecordingUnavailableError on failure or timeout)"""
+        return await self._source(recording_path)[1].wait(recording_path, timeout)
+
+    def _spool_path(self, recording_path: str) -> str:
+        # Unique per run: an earlier run of the same recording may still be cleaning up its file.
+        # Keep the original name so the extension still identifies the format
+        return os.path.join(self.spool_dir, f"{uuid.uuid4().hex[:12]}_{recording_path.split('/')[-1]}")
+
+    async def _fetch(self, run: _Run) -> SpooledRecording:
+        """Wait (briefly) for the recording, then stream it to the spool file once"""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        file_path = self._spool_path(run.recording_path)
+
+        started = time.perf_counter()
+        source, _ = self._source(run.recording_path)
+        await self.wait_for_recording(run.recording_path, RECORDING_RUN_WAIT_SECONDS)
+        run.timings["wait_recording"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        if source == "s3":
+            size = await self._copy_and_spool(run.recording_path, s3_object_url(run.recording_path), file_path)
+        else:
+            data = await asyncio.to_thread(
+                supabase.storage.from_(RECORDINGS_BUCKET).download, run.recording_path
+            )
+            with open(file_path, "wb") as f:
+                f.write(data)
+            size = len(data)
+
+        if size == 0:
+            raise RuntimeError("Recording is empty")
+
+        run.timings["download"] = round(time.perf_counter() - started, 3)
+        self.stats["downloads"] += 1
+        self.stats["bytes_downloaded"] += size
+        print(f"✅ [Pipeline] Downloaded {size} bytes for {run.recording_path} ({source})")
+        return SpooledRecording(run.recording_path, file_path, source, size)
+
+    async def _copy_and_spool(self, recording_path: str, url: str, file_path: str) -> int:
+        """Copy an egress recording into Supabase Storage, teeing it into the spool file"""
+        if storage_copier.configured():
+            try:
+                stats = await storage_copier.copy(
+                    url, RECORDINGS_BUCKET, recording_path,
+                    source_headers=s3_auth_headers(), tee_path=file_path
+                )
+                print(f"✅ [Copy] Uploaded to Supabase Storage: {RECORDINGS_BUCKET}/{recording_path}")
+                storage_tracker.mark_ready(recording_path, stats)
+                return stats["bytes"]
+            except Exception as e:
+                print(f"❌ [Copy] Failed, downloading for analysis only: {e}")
+                storage_tracker.mark_failed(recording_path, str(e))
+
+        size = 0
+        async with http_clients.get("storage").stream("GET", url, headers=s3_auth_headers()) as response:
+            response.raise_for_status()
+            with open(file_path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+                    size += len(chunk)
+        return size
+
+    async def _stage(self, run: _Run, name: str):
+        analyzer, column = self._analyzers[name]
+        try:
+            recording = await asyncio.shield(run.fetch)
+        except Exception as e:
+            print(f"❌ [Pipeline] {name} skipped, recording unavailable: {e}")
+            raise
+
+        started = time.perf_counter()
+        try:
+            result = await analyzer(recording)
+        except Exception as e:
+            self.stats["stage_failures"] += 1
+            print(f"❌ [Pipeline] {name} failed for {run.recording_path}: {e}")
+            traceback.print_exc()
+            raise
+        finally:
+            run.timings[name] = round(time.perf_counter() - started, 3)
+
+        print(f"✅ [Pipeline] {name} complete for {run.recording_path} ({run.timings[name]}s)")
+        self._remember(run.recording_path, name, result)
+        if column and result is not None:
+            await db_writer.update("calls", "room_name", run.room_name, {column: result})
+        return result
+
+    def _remember(self, recording_path: str, name: str, result: Any):
+        self._results.setdefault(recording_path, {})[name] = result
+        self._results.move_to_end(recording_path)
+        while len(self._results) > MAX_REMEMBERED_RECORDINGS:
+            self._results.popitem(last=False)
+
+    def _on_stage_done(self, run: _Run, task: asyncio.Task):
+        # Failures are re-raised to whoever awaits the run; don't warn when nobody does
+        task.cancelled() or task.exception()
+        self._maybe_finish(run)
+
+    def _maybe_finish(self, run: _Run):
+        # Stages settling together each get here; only the first finishes the run
+        if run.finished or not all(task.done() for task in run.stages.values()):
+            return
+        run.finished = True
+        if self._runs.get(run.recording_path) is run:
+            del self._runs[run.recording_path]
+        asyncio.create_task(self._finish(run))
+
+    async def _finish(self, run: _Run):
+        """Record the stage timings on the call and remove the spool file"""
+        run.timings["total"] = round(time.perf_counter() - run.started, 3)
+        timings = dict(run.timings)
+
+        if run.call_id:
+            call = call_store.active.get(run.call_id) or call_store.get_call(run.call_id)
+            if call:
+                call.pipeline_timings = timings
+                await call_store.save_call_async(call)
+        # Own update group: on a database without the column (migrations/002) only the timings are lost
+        await db_writer.update("calls", "room_name", run.room_name, {"pipeline_timings": timings},
+                               group="pipeline_timings")
+
+        if run.fetch.done() and not run.fetch.cancelled() and not run.fetch.exception():
+            try:
+                os.remove(run.fetch.result().file_path)
+            except OSError:
+                pass
+        print(f"⏱️  [Pipeline] {run.recording_path}: {timings}")
+
+    def metrics(self) -> Dict:
+        return {
+            "active_runs": len(self._runs),
+            "analyzers": list(self._analyzers),
+            **self.stats
+        }
+
+
+# Global pipeline; analyzers are registered by the API module
+post_call_pipeline = PostCallPipeline()
@@ -0,0 +1,171 @@
+"""
+Incremental prompt building for real-time transcript analysis.
+
+The elder preamble (name, age, baseline) is rendered once per elder and cached.
+Each call keeps a RollingTranscript: a fixed-size window of recent lines plus a
+compact summary of the turns that have scrolled out of the window. Building a
+prompt therefore costs the same on the 500th line of a call as on the 5th.
+"""
+
+import os
+from collections import OrderedDict, deque
+
+from backend.models import Elder
+
+# Number of recent transcript lines sent verbatim in each prompt
+PROMPT_WINDOW_LINES = int(os.environ.get("PROMPT_WINDOW_LINES", "10"))
+
+# How many earlier elder remarks are kept (truncated) in the running summary
+SUMMARY_MAX_SNIPPETS = 6
+SUMMARY_SNIPPET_CHARS = 120
+
+# Cached elder preambles
+PREAMBLE_CACHE_SIZE = 256
+
+
+ANALYSIS_INSTRUCTIONS = """**Your Task:**
+Analyze this conversation and provide a JSON response with the following structure:
+
+{
+  "wellbeing": {
+    "mood_score": <1-10, where 1=very poor, 10=excellent>,
+    "mood_indicators": ["specific phrases or observations"],
+    "energy_level": <1-10>,
+    "energy_indicators": ["observations"],
+    "cognitive_clarity": <1-10>,
+    "cognitive_indicators": ["observations"],
+    "social_engagement": <1-10>,
+    "social_indicators": ["observations"],
+    "overall_assessment": "brief summary"
+  },
+  "concerns": [
+    {
+      "type": "physical|emotional|cognitive|social|safety",
+      "severity": "low|medium|high|critical",
+      "description": "what was said or observed",
+      "action_required": true|false,
+      "reasoning": "why this is a concern"
+    }
+  ],
+  "profile_updates": [
+    {
+      "category": "health|family|interests|routine|preferences",
+      "fact": "new information learned"
+    }
+  ],
+  "suggested_actions": [
+    {
+      "action_type": "call_family|call_neighbor|call_medical|call_volunteer",
+      "urgency": "immediate|soon|routine",
+      "reason": "why this action is needed",
+      "suggested_contact": "which village member role"
+    }
+  ]
+}
+
+**Guidelines:**
+- Be objective and evidence-based
+- Flag concerns early but don't over-dramatize
+- Consider the elder's baseline when assessing changes
+- Only suggest actions when truly warranted
+- Empty arrays are acceptable if nothing detected
+
+Respond with ONLY valid JSON, no additional text."""
+
+
+class RollingTranscript:
+    """Fixed-size window of recent lines plus a bounded summary of older turns"""
+
+    def __init__(self, window: int = PROMPT_WINDOW_LINES):
+        self.recent = deque(maxlen=window)
+        self.earlier_snippets = deque(maxlen=SUMMARY_MAX_SNIPPETS)
+        self.earlier_turns = {"elder": 0, "agent": 0, "other": 0}
+        self.total_lines = 0
+
+    def append(self, speaker: str, text: str):
+        """Add a line, folding the oldest windowed line into the summary if full"""
+        if len(self.recent) == self.recent.maxlen:
+            self._summarize(*self.recent[0])
+        self.recent.append((speaker, f"{speaker.upper()}: {text}"))
+        self.total_lines += 1
+
+    def _summarize(self, speaker: str, formatted: str):
+        """Record an evicted line in the running summary"""
+        key = speaker if speaker in ("elder", "agent") else "other"
+        self.earlier_turns[key] += 1
+
+        # Keep what the elder said; agent prompts add little to the assessment
+        if speaker == "elder":
+            text = formatted.split(": ", 1)[-1]
+            if len(text) > SUMMARY_SNIPPET_CHARS:
+                text = text[:SUMMARY_SNIPPET_CHARS - 3] + "..."
+            self.earlier_snippets.append(text)
+
+    def summary_text(self) -> str:
+        """Compact description of the turns no longer in the window"""
+        earlier = sum(self.earlier_turns.values())
+        if not earlier:
+            return ""
+
+        lines = [
+            f"{earlier} earlier lines ({self.earlier_turns['elder']} from the elder, "
+            f"{self.earlier_turns['agent']} from the agent)."
+        ]
+        if self.earlier_snippets:
+            lines.append("Most recent earlier remarks from the elder:")
+            lines.extend(f"- {snippet}" for snippet in self.earlier_snippets)
+        return "\n".join(lines)
+
+    def window_text(self) -> str:
+        """The recent lines, formatted for the prompt"""
+        return "\n".join(formatted for _, formatted in self.recent)
+
+    def approx_bytes(self) -> int:
+        """Approximate memory held by this transcript's text"""
+        return (
+            sum(len(formatted) for _, formatted in self.recent)
+            + sum(len(snippet) for snippet in self.earlier_snippets)
+        )
+
+
+class PromptBuilder:
+    """Builds analysis prompts from a cached elder preamble and a RollingTranscript"""
+
+    def __init__(self, cache_size: int = PREAMBLE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._preambles: "OrderedDict[tuple, str]" = OrderedDict()
+
+    def preamble(self, elder: Elder) -> str:
+        """Static elder block, rendered once per elder (and again if the baseline changes)"""
+        baseline = elder.wellbeing_baseline.typical_mood if elder.wellbeing_baseline else 'Unknown'
+        key = (elder.id, elder.name, elder.age, baseline)
+
+        cached = self._preambles.get(key)
+        if cached is not None:
+            self._preambles.move_to_end(key)
+            return cached
+
+        rendered = f"""You are an AI assistant analyzing a wellness check-in call with an elderly person.
+
+**Elder Information:**
+- Name: {elder.name}
+- Age: {elder.age}
+- Baseline: {baseline}
+
+"""
+        self._preambles[key] = rendered
+        if len(self._preambles) > self.cache_size:
+            self._preambles.popitem(last=False)
+        return rendered
+
+    def build(self, elder: Elder, transcript: RollingTranscript) -> str:
+        """Assemble the full prompt for the current window"""
+        parts = [self.preamble(elder)]
+
+        summary = transcript.summary_text()
+        if summary:
+            parts.append(f"**Earlier in the Call:**\n{summary}\n\n")
+
+        parts.append(f"**Recent Conversation:**\n{transcript.window_text()}\n\n")
+        parts.append(ANALYSIS_INSTRUCTIONS)
+        return "".join(parts)
@@ -0,0 +1,194 @@
+"""
+Readiness tracking for call recordings.
+
+A recording becomes usable in two steps: LiveKit egress finishes writing the
+file to the S3-compatible bucket, then it is copied into the Supabase Storage
+`audio_files` bucket that the health analyses read from. Each step has a
+tracker. Consumers `await tracker.wait(path)` and all of them share one
+readiness future per recording. The future is resolved by an event (the egress
+webhook, or the copy task finishing). If no event arrives, the object store is
+polled with exponential backoff. Analyses start as soon as the file exists
+instead of after a fixed sleep.
+"""
+
+import os
+import random
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.database import supabase
+from backend.http_clients import http_clients
+
+RECORDING_POLL_INITIAL_SECONDS = float(os.environ.get("RECORDING_POLL_INITIAL_SECONDS", "1.0"))
+RECORDING_POLL_MAX_SECONDS = float(os.environ.get("RECORDING_POLL_MAX_SECONDS", "30.0"))
+# Egress runs for the whole call, so its wait has to cover the call duration
+RECORDING_EGRESS_TIMEOUT_SECONDS = float(os.environ.get("RECORDING_EGRESS_TIMEOUT_SECONDS", "7200"))
+RECORDING_READY_TIMEOUT_SECONDS = float(os.environ.get("RECORDING_READY_TIMEOUT_SECONDS", "600"))
+
+RECORDINGS_BUCKET = "audio_files"
+
+# Recordings remembered as ready, so late consumers return immediately
+MAX_READY_RECORDINGS = 1000
+
+Probe = Callable[[str], Awaitable[bool]]
+
+
+class RecordingUnavailableError(Exception):
+    """Raised when a recording failed or did not become ready in time"""
+
+
+class RecordingTracker:
+    """One shared readiness future per recording, resolved by events or polling"""
+
+    def __init__(self, name: str, probe: Probe, timeout_seconds: float):
+        self.name = name
+        self.probe = probe
+        self.timeout_seconds = timeout_seconds
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._ready: "OrderedDict[str, Dict]" = OrderedDict()
+        self._egress_paths: Dict[str, str] = {}  # egress_id -> recording path
+        self.stats = {"ready_by_event": 0, "ready_by_poll": 0, "failed": 0, "timeouts": 0, "probes": 0}
+
+    def expect(self, path: str, egress_id: Optional[str] = None):
+        """Register a recording that is being produced (maps the egress id to its path)"""
+        if egress_id:
+            self._egress_paths[egress_id] = path
+
+    def path_for_egress(self, egress_id: str) -> Optional[str]:
+        return self._egress_paths.get(egress_id)
+
+    def _future(self, path: str) -> asyncio.Future:
+        future = self._futures.get(path)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            # Failures may have no waiter left to retrieve them
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._futures[path] = future
+        return future
+
+    def _finish(self, path: str):
+        self._futures.pop(path, None)
+        poller = self._pollers.pop(path, None)
+        if poller and poller is not asyncio.current_task():
+            poller.cancel()
+        for egress_id in [e for e, p in self._egress_paths.items() if p == path]:
+            del self._egress_paths[egress_id]
+
+    def mark_ready(self, path: str, info: Optional[Dict] = None, source: str = "event"):
+        """The recording exists; wake every consumer waiting for it"""
+        info = {"path": path, "source": source, **(info or {})}
+        self._ready[path] = info
+        self._ready.move_to_end(path)
+        while len(self._ready) > MAX_READY_RECORDINGS:
+            self._ready.popitem(last=False)
+
+        future = self._futures.get(path)
+        self._finish(path)
+        if future and not future.done():
+            future.set_result(info)
+        self.stats["ready_by_poll" if source == "poll" else "ready_by_event"] += 1
+
+    def mark_failed(self, path: str, error: str):
+        """The recording will not become available; fail current waiters (later ones re-check)"""
+        future = self._futures.get(path)
+        self._finish(path)
+        if future and not future.done():
+            future.set_exception(RecordingUnavailableError(f"{path}: {error}"))
+        self.stats["failed"] += 1
+
+    def is_ready(self, path: str) -> bool:
+        return path in self._ready
+
+    async def _poll(self, path: str):
+        """Probe the object store with exponential backoff (plus jitter) until the file exists"""
+        delay = RECORDING_POLL_INITIAL_SECONDS
+        while True:
+            self.stats["probes"] += 1
+            try:
+                exists = await self.probe(path)
+            except Exception as e:
+                print(f"⚠️  [{self.name}] Probe failed for {path}: {e}")
+                exists = False
+
+            if exists:
+                self.mark_ready(path, source="poll")
+                return
+
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, RECORDING_POLL_MAX_SECONDS)
+
+    async def wait(self, path: str, timeout: Optional[float] = None) -> Dict:
+        """Wait until the recording is ready; raises RecordingUnavailableError on failure or timeout"""
+        if path in self._ready:
+            return self._ready[path]
+
+        future = self._future(path)
+        if path not in self._pollers:
+            self._pollers[path] = asyncio.create_task(self._poll(path))
+
+        self._waiters[path] = self._waiters.get(path, 0) + 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise RecordingUnavailableError(f"{path}: not ready after {timeout or self.timeout_seconds}s")
+        finally:
+            self._waiters[path] -= 1
+            if not self._waiters[path]:
+                del self._waiters[path]
+                # Nobody is waiting any more; stop polling for it
+                if not future.done():
+                    self._futures.pop(path, None)
+                    poller = self._pollers.pop(path, None)
+                    if poller:
+                        poller.cancel()
+
+    def metrics(self) -> Dict:
+        return {"waiting": len(self._futures), "ready": len(self._ready), **self.stats}
+
+
+# ============================================================================
+# Object store probes
+# ============================================================================
+
+def s3_object_url(path: str) -> Optional[str]:
+    """URL of a recording in the egress bucket (S3-compatible Supabase storage)"""
+    s3_endpoint = os.getenv("S3_ENDPOINT")
+    s3_bucket = os.getenv("S3_BUCKET")
+    if not (s3_endpoint and s3_bucket):
+        return None
+    s3_base_url = s3_endpoint.replace('/storage/v1/s3', '').rstrip('/')
+    return f"{s3_base_url}/{s3_bucket}/{path}"
+
+
+def s3_auth_headers() -> Dict[str, str]:
+    service_key = os.getenv("SUPABASE_SERVICE_KEY")
+    return {'Authorization': f'Bearer {service_key}', 'apikey': service_key} if service_key else {}
+
+
+async def _egress_object_exists(path: str) -> bool:
+    url = s3_object_url(path)
+    if not url:
+        return False
+    response = await http_clients.get("storage").head(url, headers=s3_auth_headers(), timeout=10.0)
+    return response.status_code == 200
+
+
+async def _storage_object_exists(path: str) -> bool:
+    if not supabase:
+        return False
+    folder, _, name = path.rpartition("/")
+    files = await asyncio.to_thread(
+        supabase.storage.from_(RECORDINGS_BUCKET).list, folder, {"search": name}
+    )
+    return any(f.get("name") == name for f in files or [])
+
+
+# Egress output written to the S3 bucket (resolved by the LiveKit egress webhook)
+egress_tracker = RecordingTracker("egress", _egress_object_exists, RECORDING_EGRESS_TIMEOUT_SECONDS)
+
+# Recording copied into Supabase Storage (resolved by the copy task)
+storage_tracker = RecordingTracker("storage", _storage_object_exists, RECORDING_READY_TIMEOUT_SECONDS)
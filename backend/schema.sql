@@ -12,6 +12,7 @@ CREATE TABLE elders (
     phone TEXT NOT NULL,
     photo_url TEXT,
     address TEXT NOT NULL,
+    organization_id UUID,  -- Care organization (org-wide dashboard subscriptions)
 
     -- Medical info (stored as JSONB)
     medical_info JSONB NOT NULL DEFAULT '{
@@ -50,6 +50,9 @@ CREATE TABLE calls (
     -- Parkinson's detection (stored as JSONB)
     parkinson_detection JSONB,  -- {"disease": "Parkinson", "confidence": 0.85, "message": "...", ...}
 
+    -- Post-call pipeline stage durations in seconds (stored as JSONB)
+    pipeline_timings JSONB,  -- {"wait_recording": 4.2, "download": 0.8, "parkinson": 6.1, ...}
+
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
@@ -62,6 +65,26 @@ CREATE INDEX idx_calls_started ON calls(started_at DESC);
 DROP INDEX IF EXISTS idx_calls_room_name;
 CREATE INDEX idx_calls_room_name ON calls(room_name);
 
+-- ============================================================================
+-- CALL TRANSCRIPT LINES TABLE
+-- ============================================================================
+-- Lines streamed through /api/transcript/stream, written in batches during the call.
+-- Existing databases: run migrations/001_call_transcript_lines.sql instead.
+
+DROP TABLE IF EXISTS call_transcript_lines CASCADE;
+CREATE TABLE call_transcript_lines (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    call_id UUID NOT NULL REFERENCES calls(id) ON DELETE CASCADE,
+
+    speaker TEXT NOT NULL CHECK (speaker IN ('agent', 'elder', 'village_member')),
+    speaker_name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp TIMESTAMPTZ DEFAULT NOW()
+);
+
+DROP INDEX IF EXISTS idx_call_transcript_lines_call;
+CREATE INDEX idx_call_transcript_lines_call ON call_transcript_lines(call_id, timestamp);
+
 -- ============================================================================
 -- AUTO-UPDATE TIMESTAMP
 -- ============================================================================
@@ -84,10 +107,12 @@ CREATE TRIGGER update_elderly_updated_at BEFORE UPDATE ON elderly
 
 ALTER TABLE elderly ENABLE ROW LEVEL SECURITY;
 ALTER TABLE calls ENABLE ROW LEVEL SECURITY;
+ALTER TABLE call_transcript_lines ENABLE ROW LEVEL SECURITY;
 
 -- Allow all for service role (for hackathon)
 CREATE POLICY "Allow all for service role" ON elderly FOR ALL USING (true);
 CREATE POLICY "Allow all for service role" ON calls FOR ALL USING (true);
+CREATE POLICY "Allow all for service role" ON call_transcript_lines FOR ALL USING (true);
 
 -- ============================================================================
 -- SAMPLE DATA (Optional)
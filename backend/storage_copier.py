@@ -0,0 +1,235 @@
+"""
+Streaming recording copy from the egress bucket to Supabase Storage.
+
+The source object is streamed chunk by chunk into a TUS resumable upload
+(Supabase Storage's `/storage/v1/upload/resumable` endpoint). Memory use is
+bounded by one upload chunk, whatever the recording length. Chunks can
+optionally be teed into a local file, so the same pass also fills the
+post-call spool.
+
+Failures resume instead of restarting. A failed source read is re-requested
+with a Range header from the last byte received. A failed chunk upload asks
+the server for its acknowledged offset (HEAD) and resends from there. Each
+chunk carries a TUS `Upload-Checksum`. The whole object is verified by its
+byte count and, when the source ETag is a plain MD5, by its digest.
+"""
+
+import os
+import base64
+import asyncio
+import hashlib
+from typing import Dict, Optional
+
+import httpx
+
+from backend.http_clients import http_clients
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
+
+# Supabase requires 6 MB chunks for resumable uploads (except the last one)
+STORAGE_UPLOAD_CHUNK_BYTES = int(os.environ.get("STORAGE_UPLOAD_CHUNK_BYTES", str(6 * 1024 * 1024)))
+STORAGE_COPY_MAX_RETRIES = int(os.environ.get("STORAGE_COPY_MAX_RETRIES", "5"))
+
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+TUS_VERSION = "1.0.0"
+
+
+class CopyError(Exception):
+    """Raised when a copy cannot be completed or verified"""
+
+
+def _backoff(attempt: int) -> float:
+    return min(0.5 * (2 ** attempt), 10.0)
+
+
+class TusUpload:
+    """One resumable upload; tracks the offset the server has acknowledged"""
+
+    def __init__(self, client: httpx.AsyncClient, bucket: str, path: str, length: int, content_type: str):
+        self.client = client
+        self.bucket = bucket
+        self.path = path
+        self.length = length
+        self.content_type = content_type
+        self.location: Optional[str] = None
+        self.offset = 0
+        self.retries = 0
+
+    @staticmethod
+    def _auth_headers() -> Dict[str, str]:
+        return {"Authorization": f"Bearer {SUPABASE_KEY}", "apikey": SUPABASE_KEY, "Tus-Resumable": TUS_VERSION}
+
+    async def create(self):
+        def b64(value: str) -> str:
+            return base64.b64encode(value.encode()).decode()
+
+        metadata = ",".join([
+            f"bucketName {b64(self.bucket)}",
+            f"objectName {b64(self.path)}",
+            f"contentType {b64(self.content_type)}",
+        ])
+        response = await self.client.post(
+            f"{SUPABASE_URL.rstrip('/')}/storage/v1/upload/resumable",
+            headers={
+                **self._auth_headers(),
+                "Upload-Length": str(self.length),
+                "Upload-Metadata": metadata,
+                "x-upsert": "true",
+            }
+        )
+        if response.status_code != 201 or "location" not in response.headers:
+            raise CopyError(f"Could not create upload: HTTP {response.status_code} {response.text[:200]}")
+        self.location = response.headers["location"]
+
+    async def server_offset(self) -> int:
+        response = await self.client.head(self.location, headers=self._auth_headers())
+        response.raise_for_status()
+        return int(response.headers["upload-offset"])
+
+    async def send(self, chunk: bytes):
+        """Upload one chunk, resuming from the server's offset after a failure"""
+        chunk_start = self.offset
+        for attempt in range(STORAGE_COPY_MAX_RETRIES + 1):
+            body = chunk[self.offset - chunk_start:]
+            if not body:
+                return
+
+            try:
+                response = await self.client.patch(
+                    self.location,
+                    content=body,
+                    headers={
+                        **self._auth_headers(),
+                        "Content-Type": "application/offset+octet-stream",
+                        "Upload-Offset": str(self.offset),
+                        "Upload-Checksum": "sha1 " + base64.b64encode(hashlib.sha1(body).digest()).decode(),
+                    }
+                )
+                if response.status_code == 204:
+                    self.offset = int(response.headers.get("upload-offset", self.offset + len(body)))
+                    if self.offset - chunk_start >= len(chunk):
+                        return
+                    continue  # Partially accepted; send the rest
+                # 409 offset conflict, 460 checksum mismatch, 5xx: resync and retry; other 4xx are fatal
+                if response.status_code < 500 and response.status_code not in (409, 460):
+                    raise CopyError(f"Chunk upload rejected: HTTP {response.status_code} {response.text[:200]}")
+            except httpx.TransportError:
+                pass
+
+            self.retries += 1
+            await asyncio.sleep(_backoff(attempt))
+            try:
+                self.offset = await self.server_offset()
+            except httpx.HTTPError:
+                pass
+
+        raise CopyError(f"Chunk at offset {chunk_start} failed after {STORAGE_COPY_MAX_RETRIES} retries")
+
+
+class StreamingCopier:
+    """Copies an HTTP(S) object into Supabase Storage without buffering it whole"""
+
+    def __init__(self, chunk_bytes: int = STORAGE_UPLOAD_CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self.stats = {"copies": 0, "bytes": 0, "source_resumes": 0, "chunk_retries": 0, "failures": 0}
+
+    @staticmethod
+    def configured() -> bool:
+        return bool(SUPABASE_URL and SUPABASE_KEY)
+
+    async def copy(
+        self,
+        source_url: str,
+        bucket: str,
+        path: str,
+        source_headers: Optional[Dict[str, str]] = None,
+        tee_path: Optional[str] = None,
+        content_type: str = "audio/mpeg"
+    ) -> Dict:
+        """Stream `source_url` to `bucket/path` (and to `tee_path` if given); returns copy stats"""
+        try:
+            return await self._copy(source_url, bucket, path, source_headers or {}, tee_path, content_type)
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+
+    async def _copy(self, source_url, bucket, path, source_headers, tee_path, content_type) -> Dict:
+        received = 0
+        md5 = hashlib.md5()
+        sha256 = hashlib.sha256()
+        pending = bytearray()
+        upload: Optional[TusUpload] = None
+        etag = None
+        source_attempts = 0
+
+        client = http_clients.get("storage")
+        with open(tee_path, "wb") if tee_path else _NullWriter() as tee:
+            while True:
+                headers = dict(source_headers)
+                if received:
+                    headers["Range"] = f"bytes={received}-"
+                try:
+                    async with client.stream("GET", source_url, headers=headers) as response:
+                        response.raise_for_status()
+                        if received and response.status_code != 206:
+                            raise CopyError("Source does not support ranged reads; cannot resume")
+
+                        if upload is None:
+                            if "content-length" not in response.headers:
+                                raise CopyError("Source did not report a Content-Length")
+                            etag = response.headers.get("etag", "").strip('"')
+                            upload = TusUpload(
+                                client, bucket, path, int(response.headers["content-length"]), content_type
+                            )
+                            await upload.create()
+
+                        async for data in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                            received += len(data)
+                            md5.update(data)
+                            sha256.update(data)
+                            tee.write(data)
+                            pending += data
+                            while len(pending) >= self.chunk_bytes:
+                                await upload.send(bytes(pending[:self.chunk_bytes]))
+                                del pending[:self.chunk_bytes]
+                    break
+                except httpx.TransportError as e:
+                    # Source stream broke; re-request from the last byte received
+                    source_attempts += 1
+                    self.stats["source_resumes"] += 1
+                    if source_attempts > STORAGE_COPY_MAX_RETRIES:
+                        raise CopyError(f"Source read failed after {received} bytes: {e}")
+                    await asyncio.sleep(_backoff(source_attempts))
+
+            if pending:
+                await upload.send(bytes(pending))
+
+        self.stats["chunk_retries"] += upload.retries
+
+        # Verify the copy end to end
+        if received != upload.length:
+            raise CopyError(f"Read {received} bytes, source reported {upload.length}")
+        if upload.offset != upload.length:
+            raise CopyError(f"Server acknowledged {upload.offset} of {upload.length} bytes")
+        if etag and len(etag) == 32 and "-" not in etag and etag.lower() != md5.hexdigest():
+            raise CopyError(f"Checksum mismatch: source ETag {etag}, received md5 {md5.hexdigest()}")
+
+        self.stats["copies"] += 1
+        self.stats["bytes"] += received
+        return {"bytes": received, "sha256": sha256.hexdigest(), "chunk_retries": upload.retries}
+
+
+class _NullWriter:
+    def write(self, data):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# Global copier
+storage_copier = StreamingCopier()
@@ -0,0 +1,84 @@
+"""
+Bidirectional WebSocket subscription index.
+
+Topics are strings: `call:<call_id>` for one call, plus the wildcard topics
+`elder:<elder_id>` (every call with that elder) and `org:<org_id>` (every call
+for an organization's elders). The index keeps both directions in two plain
+dicts (the event loop is single-threaded, so there's nothing to shard for):
+
+- topic -> subscribers
+- subscriber -> topics
+
+Removing a subscriber therefore touches only its own topics. A topic whose
+last subscriber leaves is deleted, so the index holds live topics only, not
+every call that was ever viewed.
+"""
+
+from typing import Dict, Hashable, Iterable, Optional, Set
+
+
+def call_topic(call_id: str) -> str:
+    return f"call:{call_id}"
+
+
+def elder_topic(elder_id: str) -> str:
+    return f"elder:{elder_id}"
+
+
+def org_topic(org_id: str) -> str:
+    return f"org:{org_id}"
+
+
+class SubscriptionIndex:
+    """Topic <-> subscriber index with O(subscriptions-of-subscriber) removal"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Hashable]] = {}
+        self._topics_of: Dict[Hashable, Set[str]] = {}
+
+    def subscribe(self, subscriber: Hashable, topic: str):
+        self._subscribers.setdefault(topic, set()).add(subscriber)
+        self._topics_of.setdefault(subscriber, set()).add(topic)
+
+    def unsubscribe(self, subscriber: Hashable, topic: str):
+        topics = self._topics_of.get(subscriber)
+        if topics is not None:
+            topics.discard(topic)
+            if not topics:
+                del self._topics_of[subscriber]
+        self._discard(topic, subscriber)
+
+    def remove(self, subscriber: Hashable):
+        """Drop a subscriber from every topic it is subscribed to"""
+        for topic in self._topics_of.pop(subscriber, ()):
+            self._discard(topic, subscriber)
+
+    def _discard(self, topic: str, subscriber: Hashable):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[topic]
+
+    def subscribers(self, topic: str) -> Set[Hashable]:
+        """Live set of a topic's subscribers (do not mutate; copy before awaiting)"""
+        return self._subscribers.get(topic) or set()
+
+    def subscribers_of(self, topics: Iterable[Optional[str]]) -> Set[Hashable]:
+        """Union of subscribers over several topics (e.g. a call plus its elder and org wildcards)"""
+        result: Set[Hashable] = set()
+        for topic in topics:
+            if topic:
+                result |= self._subscribers.get(topic, set())
+        return result
+
+    def topics_of(self, subscriber: Hashable) -> Set[str]:
+        return self._topics_of.get(subscriber, set())
+
+    def metrics(self) -> Dict:
+        return {
+            "topics": len(self._subscribers),
+            "subscribers": len(self._topics_of),
+            "subscriptions": sum(len(topics) for topics in self._topics_of.values()),
+        }
@@ -0,0 +1,291 @@
+"""CampaignDialer and LiveKitSipClient against fake SIP: retries, outcome mapping, unknown-outcome reconciliation"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("livekit")
+
+from backend.campaign_dialer import (
+    CampaignDialer, LiveKitSipClient, DialRequest, DialResult, ANSWERED, NO_ANSWER, BUSY, UNKNOWN
+)
+from backend.margaret import margaret_elder
+
+
+class FakeSip:
+    """Scripted SipClient: each dial() returns the next outcome; reconcile() returns `reconciled`"""
+
+    def __init__(self, outcomes, reconciled=None):
+        self.outcomes = list(outcomes)
+        self.reconciled = reconciled
+        self.dials = []
+        self.reconciles = []
+
+    async def dial(self, request: DialRequest) -> DialResult:
+        self.dials.append(request)
+        return DialResult(self.outcomes.pop(0), call_seconds=0)
+
+    async def reconcile(self, request: DialRequest) -> DialResult:
+        self.reconciles.append(request)
+        return DialResult(self.reconciled, call_seconds=0)
+
+
+async def run_campaign(sip: FakeSip, max_attempts: int = 3):
+    async def lookup(elder_id):
+        return margaret_elder
+
+    dialer = CampaignDialer(sip, lookup, retry_base_seconds=0.01)
+    campaign = dialer.create([margaret_elder.id], end_at=datetime.utcnow() + timedelta(minutes=5),
+                             max_attempts=max_attempts)
+    await asyncio.wait_for(asyncio.shield(dialer._runners[campaign.id]), 5)
+    return dialer, campaign.targets[margaret_elder.id]
+
+
+def test_no_answer_is_retried_until_answered():
+    sip = FakeSip([NO_ANSWER, BUSY, ANSWERED])
+    dialer, target = asyncio.run(run_campaign(sip))
+    assert target["status"] == "answered"
+    assert target["attempts"] == 3
+    assert len(sip.dials) == 3 and dialer.stats["retries"] == 2
+
+
+def test_retries_stop_at_max_attempts():
+    sip = FakeSip([NO_ANSWER, NO_ANSWER])
+    _, target = asyncio.run(run_campaign(sip, max_attempts=2))
+    assert target["status"] == "unreachable"
+    assert len(sip.dials) == 2
+
+
+def test_unknown_outcome_that_connected_is_not_dialed_again():
+    sip = FakeSip([UNKNOWN], reconciled=ANSWERED)
+    dialer, target = asyncio.run(run_campaign(sip))
+    assert target["status"] == "answered"
+    assert len(sip.dials) == 1
+    assert sip.reconciles == sip.dials
+    assert dialer.stats["answered"] == 1
+    assert dialer._unsettled == {}
+
+
+def test_unsettled_request_is_not_on_the_broadcast_target():
+    async def scenario():
+        async def lookup(elder_id):
+            return margaret_elder
+
+        sip = FakeSip([UNKNOWN, ANSWERED], reconciled=NO_ANSWER)
+        dialer = CampaignDialer(sip, lookup, retry_base_seconds=60)
+        campaign = dialer.create([margaret_elder.id], end_at=datetime.utcnow() + timedelta(minutes=30))
+        while not dialer._unsettled:
+            await asyncio.sleep(0.01)
+        target = campaign.targets[margaret_elder.id]
+        assert target["status"] == "retry_scheduled"
+        assert all(not isinstance(value, DialRequest) for value in target.values())
+        assert margaret_elder.phone.lstrip("+") not in str(target)
+        await dialer.cancel(campaign.id)
+        assert dialer._unsettled == {}
+
+    asyncio.run(scenario())
+
+
+def test_unknown_outcome_without_call_leg_is_dialed_again():
+    sip = FakeSip([UNKNOWN, ANSWERED], reconciled=NO_ANSWER)
+    _, target = asyncio.run(run_campaign(sip))
+    assert target["status"] == "answered"
+    assert len(sip.dials) == 2 and len(sip.reconciles) == 1
+    assert sip.dials[0].room_name != sip.dials[1].room_name
+
+
+def test_unknown_outcome_that_stays_unknown_is_not_dialed_again():
+    sip = FakeSip([UNKNOWN], reconciled=UNKNOWN)
+    _, target = asyncio.run(run_campaign(sip))
+    assert target["status"] == "unknown"
+    assert len(sip.dials) == 1
+
+
+def webhook_event(kind, room_name, identity=None):
+    """Shaped like livekit.api.WebhookEvent"""
+    return SimpleNamespace(event=kind, room=SimpleNamespace(name=room_name),
+                           participant=SimpleNamespace(identity=identity))
+
+
+async def answered_call(dialer_kwargs=None):
+    """A campaign with one answered call that lasts until it is hung up"""
+    answered = asyncio.Event()
+
+    class LiveCall(FakeSip):
+        async def dial(self, request):
+            self.dials.append(request)
+            return DialResult(ANSWERED)
+
+    async def lookup(elder_id):
+        return margaret_elder
+
+    async def on_answered(elder, request):
+        answered.set()
+
+    sip = LiveCall([])
+    dialer = CampaignDialer(sip, lookup, on_answered=on_answered, **(dialer_kwargs or {}))
+    campaign = dialer.create([margaret_elder.id], end_at=datetime.utcnow() + timedelta(minutes=5))
+    await asyncio.wait_for(answered.wait(), 5)
+    return dialer, campaign, sip.dials[0]
+
+
+def test_elder_hangup_webhook_frees_the_slot():
+    async def scenario():
+        dialer, campaign, request = await answered_call()
+        assert dialer.metrics()["active_calls"] == 1
+
+        # The agent leaving is not the elder hanging up
+        assert not dialer.handle_livekit_event(webhook_event("participant_left", request.room_name, "agent"))
+        assert dialer.metrics()["active_calls"] == 1
+
+        assert dialer.handle_livekit_event(
+            webhook_event("participant_left", request.room_name, request.participant_identity)
+        )
+        await asyncio.wait_for(asyncio.shield(dialer._runners[campaign.id]), 1)
+        assert dialer.metrics()["active_calls"] == 0
+        assert campaign.status == "completed"
+
+    asyncio.run(scenario())
+
+
+def test_room_finished_webhook_frees_the_slot():
+    async def scenario():
+        dialer, campaign, request = await answered_call()
+        assert dialer.handle_livekit_event(webhook_event("room_finished", request.room_name))
+        await asyncio.wait_for(asyncio.shield(dialer._runners[campaign.id]), 1)
+        assert dialer.metrics()["active_calls"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_hangup_through_webhook_route(monkeypatch):
+    main = pytest.importorskip("backend.main")
+    import httpx
+
+    events = []
+
+    class Receiver:
+        def __init__(self, verifier):
+            pass
+
+        def receive(self, body, auth):
+            return events[-1]
+
+    monkeypatch.setattr(main, "LIVEKIT_API_KEY", "key")
+    monkeypatch.setattr(main, "LIVEKIT_API_SECRET", "secret")
+    monkeypatch.setattr(main.api, "WebhookReceiver", Receiver)
+    monkeypatch.setattr(main.api, "TokenVerifier", lambda key, secret: None)
+
+    async def scenario():
+        dialer, campaign, request = await answered_call()
+        monkeypatch.setattr(main, "campaign_dialer", dialer)
+        events.append(webhook_event("participant_left", request.room_name, request.participant_identity))
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/livekit/webhook", content="{}", headers={"Authorization": "signed"})
+        assert response.status_code == 200
+        await asyncio.wait_for(asyncio.shield(dialer._runners[campaign.id]), 1)
+        assert dialer.metrics()["active_calls"] == 0
+
+    asyncio.run(scenario())
+
+
+# ----------------------------------------------------------------------------
+# LiveKitSipClient against a fake LiveKit API
+# ----------------------------------------------------------------------------
+
+class NotFound(Exception):
+    code = "not_found"
+
+
+class SipError(Exception):
+    def __init__(self, sip_code):
+        super().__init__(f"SIP {sip_code}")
+        self.metadata = {"sip_status_code": str(sip_code)}
+
+
+class FakeLiveKit:
+    """Shared-client stand-in: a one-slot limiter and a SIP participant whose call status follows a script"""
+
+    def __init__(self, statuses, create_error=None):
+        self.statuses = list(statuses)  # sip.callStatus per poll; None = participant gone
+        self.create_error = create_error
+        self.limiter = asyncio.Semaphore(1)
+        self.removed = []
+        self.sip = SimpleNamespace(create_sip_participant=self.create_sip_participant)
+        self.room = SimpleNamespace(get_participant=self.get_participant, remove_participant=self.remove_participant)
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self.limiter:
+            yield self
+
+    async def create_sip_participant(self, request):
+        assert not request.wait_until_answered
+        if self.create_error:
+            raise self.create_error
+
+    async def get_participant(self, identity):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if status is None:
+            raise NotFound("participant not found")
+        return SimpleNamespace(attributes={"sip.callStatus": status})
+
+    async def remove_participant(self, identity):
+        self.removed.append(identity.identity)
+
+
+REQUEST = DialRequest("call_test", "+15550100", "ST_test", "elder_test", "Test Elder")
+
+
+def dial(fake: FakeLiveKit, ring_seconds: float = 1.0) -> DialResult:
+    client = LiveKitSipClient(clients=fake, ring_seconds=ring_seconds, poll_seconds=0.01)
+    return asyncio.run(client.dial(REQUEST))
+
+
+def test_answered_after_ringing():
+    assert dial(FakeLiveKit(["dialing", "ringing", "ringing", "active"])).outcome == ANSWERED
+
+
+def test_leg_gone_before_answer_is_no_answer():
+    assert dial(FakeLiveKit(["ringing", None])).outcome == NO_ANSWER
+
+
+def test_ringing_too_long_hangs_up():
+    fake = FakeLiveKit(["ringing"])
+    result = dial(fake, ring_seconds=0.05)
+    assert result.outcome == NO_ANSWER
+    assert fake.removed == ["elder_test"]
+
+
+def test_busy_sip_code():
+    assert dial(FakeLiveKit(["ringing"], create_error=SipError(486))).outcome == BUSY
+
+
+def test_client_timeout_follows_a_leg_that_connected():
+    fake = FakeLiveKit(["ringing", "active"], create_error=asyncio.TimeoutError())
+    assert dial(fake).outcome == ANSWERED
+
+
+def test_client_timeout_without_leg_is_unknown():
+    fake = FakeLiveKit([None], create_error=asyncio.TimeoutError())
+    assert dial(fake).outcome == UNKNOWN
+
+
+def test_shared_client_is_free_while_ringing():
+    async def scenario():
+        fake = FakeLiveKit(["ringing"] * 20 + ["active"])
+        client = LiveKitSipClient(clients=fake, ring_seconds=5, poll_seconds=0.01)
+        call = asyncio.create_task(client.dial(REQUEST))
+        await asyncio.sleep(0.05)
+        # Another LiveKit request (e.g. an egress start) gets the one slot mid-ring
+        async with asyncio.timeout(0.05):
+            async with fake.acquire():
+                pass
+        return await call
+
+    assert asyncio.run(scenario()).outcome == ANSWERED
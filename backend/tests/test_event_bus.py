@@ -0,0 +1,169 @@
+"""Cross-worker WebSocket fan-out: two ConnectionManagers on one (in-memory) Redis channel, and the local fallback"""
+
+import json
+import asyncio
+
+from backend import event_bus
+from backend.event_bus import InProcessEventBus, RedisEventBus, create_event_bus
+from backend.event_encoding import event
+from backend.websocket_manager import ConnectionManager
+
+
+class FakeRedisServer:
+    """The pub/sub part of a Redis server; `down` makes every command fail"""
+
+    def __init__(self):
+        self.subscribers = {}  # channel -> [asyncio.Queue]
+        self.down = False
+
+    def check(self):
+        if self.down:
+            raise ConnectionError("redis unreachable")
+
+
+class FakePipeline:
+    def __init__(self, server: FakeRedisServer):
+        self.server = server
+        self.commands = []
+
+    def publish(self, channel, data):
+        self.commands.append((channel, data))
+
+    async def execute(self):
+        self.server.check()
+        for channel, data in self.commands:
+            for queue in self.server.subscribers.get(channel, ()):
+                queue.put_nowait({"type": "message", "channel": channel, "data": data.encode()})
+
+
+class FakePubSub:
+    def __init__(self, server: FakeRedisServer):
+        self.server = server
+        self.queue = asyncio.Queue()
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.server.check()
+        self.server.subscribers.setdefault(channel, []).append(self.queue)
+        self.channels.append(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        self.server.check()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        for channel in self.channels:
+            self.server.subscribers[channel].remove(self.queue)
+        self.channels = []
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis that RedisEventBus uses"""
+
+    def __init__(self, server: FakeRedisServer):
+        self.server = server
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.server)
+
+    def pubsub(self):
+        return FakePubSub(self.server)
+
+    async def aclose(self):
+        pass
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.received.append(json.loads(frame))
+
+    async def send_bytes(self, frame):
+        raise AssertionError("json clients only")
+
+    async def close(self, code=1000):
+        pass
+
+    def events(self, event_type):
+        return [message for message in self.received if message["type"] == event_type]
+
+
+async def settle(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)  # Give duplicates a chance to show up
+
+
+async def two_workers(server: FakeRedisServer):
+    managers, sockets = [], []
+    for _ in range(2):
+        manager = ConnectionManager(bus=RedisEventBus(client=FakeRedis(server)))
+        await manager.start()
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+        manager.subscribe_to_call(websocket, "call-1")
+        managers.append(manager)
+        sockets.append(websocket)
+    return managers, sockets
+
+
+def test_two_workers_each_deliver_every_event_once():
+    async def scenario():
+        server = FakeRedisServer()
+        managers, sockets = await two_workers(server)
+        await settle(lambda: all(m.bus.metrics()["subscribed"] for m in managers))
+
+        await managers[0].broadcast_to_call("call-1", event("transcript_update", {"n": 1}))
+        await managers[1].broadcast_to_call("call-1", event("transcript_update", {"n": 2}))
+        await managers[1].broadcast(event("system_notice", {}))
+        await settle(lambda: all(len(ws.received) == 3 for ws in sockets))
+
+        for websocket in sockets:
+            assert [m["data"]["n"] for m in websocket.events("transcript_update")] == [1, 2]
+            assert len(websocket.events("system_notice")) == 1
+        assert all(m.bus.metrics()["delivered_locally"] == 0 for m in managers)
+        for manager in managers:
+            await manager.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_local_fallback_while_redis_is_down():
+    async def scenario():
+        server = FakeRedisServer()
+        server.down = True
+        managers, sockets = await two_workers(server)
+        await asyncio.sleep(0.05)
+
+        await managers[0].broadcast_to_call("call-1", event("transcript_update", {"n": 1}))
+        await settle(lambda: len(sockets[0].received) == 1)
+        assert sockets[0].events("transcript_update")[0]["data"] == {"n": 1}
+        assert sockets[1].received == []  # Other workers miss events during an outage
+        assert managers[0].bus.metrics()["delivered_locally"] == 1
+
+        # Redis is back: the subscriber reconnects and fan-out resumes, still once per worker
+        server.down = False
+        await settle(lambda: all(m.bus.metrics()["subscribed"] for m in managers))
+        await managers[0].broadcast_to_call("call-1", event("transcript_update", {"n": 2}))
+        await settle(lambda: len(sockets[0].received) == 2 and len(sockets[1].received) == 1)
+        assert [m["data"]["n"] for m in sockets[0].events("transcript_update")] == [1, 2]
+        assert [m["data"]["n"] for m in sockets[1].events("transcript_update")] == [2]
+        for manager in managers:
+            await manager.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_without_package_falls_back_to_in_process(monkeypatch):
+    monkeypatch.setattr(event_bus, "aioredis", None)
+    assert isinstance(create_event_bus("redis"), InProcessEventBus)
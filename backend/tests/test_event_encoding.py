@@ -0,0 +1,53 @@
+"""Event encoding: models, datetimes and enums are converted; unknown types are an error, not their str()"""
+
+from datetime import datetime
+from enum import Enum
+
+import pytest
+from pydantic import BaseModel
+
+from backend import event_encoding
+from backend.event_encoding import MSGPACK_AVAILABLE, decode_json, encode_json, event
+
+
+class Mood(str, Enum):
+    GOOD = "good"
+
+
+class Reading(BaseModel):
+    mood: Mood
+    taken_at: datetime
+
+
+READING = Reading(mood=Mood.GOOD, taken_at=datetime(2024, 5, 1, 9, 30))
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(event_encoding, "orjson", None)
+    elif event_encoding.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_known_types_are_converted(json_backend):
+    frame = event("wellbeing_update", {"reading": READING, "tags": {"garden"}}).frame("json")
+    assert decode_json(frame)["data"] == {
+        "reading": {"mood": "good", "taken_at": "2024-05-01T09:30:00"},
+        "tags": ["garden"],
+    }
+
+
+def test_unknown_type_raises(json_backend):
+    with pytest.raises(TypeError, match="not JSON serializable"):
+        encode_json({"data": object()})
+
+
+@pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed")
+def test_unknown_type_raises_for_msgpack():
+    import msgpack
+
+    assert msgpack.unpackb(event("concern_detected", READING).frame("msgpack"))["data"]["mood"] == "good"
+    with pytest.raises(TypeError, match="not JSON serializable"):
+        event("concern_detected", {"value": object()}).frame("msgpack")
@@ -0,0 +1,34 @@
+"""FeatureEngine must return the same features as the extractor it replaced"""
+
+import numpy as np
+import librosa
+import pytest
+
+from backend.parkinson.bench_features import reference_features, synthetic_voice
+from backend.parkinson.feature_engine import EDGE_FRAMES, HOP_LENGTH, FeatureEngine, extract_features
+
+
+def assert_same_features(actual, expected):
+    assert list(actual) == list(expected)
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-4, atol=1e-9, err_msg=name)
+
+
+@pytest.mark.parametrize("seconds", [0.5, 4.3])
+def test_features_match_reference(seconds):
+    y = synthetic_voice(seconds, seed=int(seconds * 10))
+    assert_same_features(extract_features(y, 22050), reference_features(y, 22050))
+
+
+def test_short_clip_where_edge_frames_overlap():
+    # Fewer frames than the two edge blocks: the whole matrix is filtered
+    y = synthetic_voice(HOP_LENGTH * EDGE_FRAMES / 22050, seed=3)
+    assert_same_features(extract_features(y, 22050), reference_features(y, 22050))
+
+
+def test_hpss_means_match_full_decomposition_exactly():
+    rng = np.random.default_rng(7)
+    y = rng.standard_normal(66_483) * 0.1 + 0.01  # float64: no float32 rounding to hide behind
+
+    expected = (np.mean(librosa.effects.harmonic(y)), np.mean(librosa.effects.percussive(y)))
+    np.testing.assert_allclose(FeatureEngine(y, 22050)._hpss_means(), expected, rtol=1e-12)
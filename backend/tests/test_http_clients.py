@@ -0,0 +1,46 @@
+"""HttpClients metrics: in-flight requests are counted down on success, transport errors and cancellation"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.http_clients import HttpClients
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Stands in for the pooled transport: answers, fails or hangs depending on the path"""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/fail":
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path == "/hang":
+            await asyncio.sleep(60)
+        return httpx.Response(200, request=request)
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    monkeypatch.setattr(httpx, "AsyncHTTPTransport", lambda **kwargs: ScriptedTransport())
+    return HttpClients()
+
+
+def test_in_flight_returns_to_zero(clients):
+    async def scenario():
+        client = clients.get()
+        await client.get("http://upstream/ok")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://upstream/fail")
+
+        hanging = asyncio.create_task(client.get("http://upstream/hang"))
+        await asyncio.sleep(0.05)
+        assert clients.metrics()["upstreams"]["default"]["in_flight"] == 1
+        hanging.cancel()
+        await asyncio.gather(hanging, return_exceptions=True)
+        await clients.aclose()
+
+    asyncio.run(scenario())
+    metrics = clients.metrics()["upstreams"]["default"]
+    assert metrics["requests"] == 3
+    assert metrics["in_flight"] == 0
+    assert metrics["errors"] == 1
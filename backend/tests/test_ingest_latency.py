@@ -0,0 +1,23 @@
+"""/api/transcript/stream stays fast while analyses run (backend.bench_analysis_load at a test-sized load)"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("backend.main")
+
+from backend.ai_analyzer import GEMINI_MAX_CONCURRENCY
+from backend.bench_analysis_load import run
+
+# Ingest does a few in-memory appends and queue puts; anything near the stub's
+# model latency means a line waited on an analysis
+MAX_P99_MS = 100
+
+
+def test_ingest_p99_under_analysis_load():
+    stats = asyncio.run(run(calls=50, lines=4, model_latency=0.2, dashboards=10, debounce=0.2))
+    assert stats["rejected"] == 0
+    assert stats["lines"] == 200
+    assert stats["model_requests"] > 0
+    assert stats["peak_in_flight"] <= GEMINI_MAX_CONCURRENCY
+    assert stats["p99_ms"] < MAX_P99_MS, stats
@@ -0,0 +1,57 @@
+"""LLMResponseCache.get_or_generate: one generation per key, cancelled with its last waiter"""
+
+import asyncio
+
+from backend.llm_cache import LLMResponseCache
+
+
+class SlowModel:
+    """generate() that waits for `answer` and records whether it was cancelled"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = False
+        self.answer = None
+
+    async def generate(self):
+        self.calls += 1
+        self.answer = asyncio.get_running_loop().create_future()
+        try:
+            return await self.answer
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def test_cancelling_the_sole_waiter_cancels_the_generation():
+    async def scenario():
+        cache, model = LLMResponseCache(disk_dir=None), SlowModel()
+        waiter = asyncio.create_task(cache.get_or_generate("key", model.generate))
+        await asyncio.sleep(0.01)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert model.cancelled
+        assert cache._in_flight == {} and cache._waiters == {}
+        assert cache.stats["abandoned"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_generation_continues_while_another_caller_waits():
+    async def scenario():
+        cache, model = LLMResponseCache(disk_dir=None), SlowModel()
+        first = asyncio.create_task(cache.get_or_generate("key", model.generate))
+        second = asyncio.create_task(cache.get_or_generate("key", model.generate))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        assert not model.cancelled
+        model.answer.set_result("response")
+        assert await second == "response"
+        assert model.calls == 1
+        assert cache.get("key") == "response"
+
+    asyncio.run(scenario())
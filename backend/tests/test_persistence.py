@@ -0,0 +1,259 @@
+"""WriteBehindQueue against a fake Supabase client: outage -> spool -> replay, dead letters, shutdown"""
+
+import json
+import asyncio
+import threading
+
+from backend.persistence import WriteBehindQueue, is_transient
+
+
+class ConstraintError(Exception):
+    """Looks like postgrest's APIError for a foreign-key violation"""
+
+    code = "23503"
+
+
+class MissingColumnError(Exception):
+    """Looks like postgrest's APIError for a column the schema cache doesn't have"""
+
+    code = "PGRST204"
+
+
+class FakeTable:
+    def __init__(self, db: "FakeSupabase", name: str):
+        self.db = db
+        self.name = name
+        self.action = None
+
+    def insert(self, rows):
+        self.action = ("insert", rows)
+        return self
+
+    def update(self, fields):
+        self.action = ("update", fields)
+        return self
+
+    def eq(self, column, value):
+        self.action = self.action + (column, value)
+        return self
+
+    def execute(self):
+        self.db.calls += 1
+        if self.db.gate is not None:
+            self.db.gate.wait()
+        if self.db.down:
+            raise ConnectionError("database unreachable")
+        kind, payload = self.action[:2]
+        if kind == "insert":
+            rows = payload if isinstance(payload, list) else [payload]
+            if any(row.get("poison") for row in rows):
+                raise ConstraintError("insert violates foreign key constraint")
+            if self.name == "call_transcript_lines":
+                call_ids = {call["id"] for call in self.db.rows.get("calls", [])}
+                if any(row["call_id"] not in call_ids for row in rows):
+                    raise ConstraintError("call_transcript_lines.call_id references a missing call")
+            self.db.rows.setdefault(self.name, []).extend(rows)
+        else:
+            column, value = self.action[2:]
+            if self.db.missing_columns & set(payload):
+                raise MissingColumnError(f"Could not find columns {sorted(self.db.missing_columns & set(payload))}")
+            for row in self.db.rows.get(self.name, []):
+                if row.get(column) == value:
+                    row.update(payload)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.rows = {}
+        self.down = False
+        self.calls = 0
+        self.gate = None  # threading.Event: hold writes until set
+        self.missing_columns = set()  # columns this database doesn't have (migration not run)
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+def make_queue(tmp_path, db, **kwargs):
+    return WriteBehindQueue(
+        client_getter=lambda: db,
+        flush_seconds=0.01,
+        spool_path=str(tmp_path / "spool.jsonl"),
+        dead_letter_path=str(tmp_path / "dead.jsonl"),
+        replay_seconds=0,
+        **kwargs
+    )
+
+
+def read_jsonl(path):
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_outage_is_spooled_and_replayed_after_recovery(tmp_path):
+    db = FakeSupabase()
+
+    async def scenario():
+        queue = make_queue(tmp_path, db)
+        db.down = True
+        await queue.insert("calls", {"id": "c1", "status": "in_progress"})
+        await queue.update("calls", "id", "c1", {"status": "completed"})
+        await queue.flush()
+        assert db.rows == {}
+        assert len(read_jsonl(tmp_path / "spool.jsonl")) == 1  # update folded into the insert
+
+        db.down = False
+        await queue.insert("calls", {"id": "c2", "status": "in_progress"})
+        await queue.flush()  # succeeds, then replays the spool
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert sorted(row["id"] for row in db.rows["calls"]) == ["c1", "c2"]
+    assert next(r for r in db.rows["calls"] if r["id"] == "c1")["status"] == "completed"
+    assert not (tmp_path / "spool.jsonl").exists()
+    assert queue.stats["replayed"] == 1
+    assert queue.stats["dead_lettered"] == 0
+
+
+def test_permanent_error_dead_letters_only_the_bad_row(tmp_path):
+    db = FakeSupabase()
+
+    async def scenario():
+        queue = make_queue(tmp_path, db)
+        await queue.insert("transcript_lines", {"id": "l1"})
+        await queue.insert("transcript_lines", {"id": "l2", "poison": True})
+        await queue.insert("transcript_lines", {"id": "l3"})
+        await queue.flush()
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert sorted(row["id"] for row in db.rows["transcript_lines"]) == ["l1", "l3"]
+    dead = read_jsonl(tmp_path / "dead.jsonl")
+    assert [op["rows"] for op in dead] == [[{"id": "l2", "poison": True}]]
+    assert "ConstraintError" in dead[0]["error"]
+    assert read_jsonl(tmp_path / "spool.jsonl") == []
+    assert queue.stats["dead_lettered"] == 1
+
+
+def test_update_groups_fail_separately(tmp_path):
+    db = FakeSupabase()
+    db.rows["calls"] = [{"id": "c1", "room_name": "room-1"}]
+    db.missing_columns = {"pipeline_timings"}
+
+    async def scenario():
+        queue = make_queue(tmp_path, db)
+        await queue.update("calls", "room_name", "room-1", {"biomarkers": {"hnr": 20.1}})
+        await queue.update("calls", "room_name", "room-1", {"pipeline_timings": {"total": 9.5}},
+                           group="pipeline_timings")
+        await queue.update("calls", "room_name", "room-1", {"parkinson_detection": {"disease": "healthy"}})
+        await queue.flush()
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    row = db.rows["calls"][0]
+    assert row["biomarkers"] == {"hnr": 20.1}
+    assert row["parkinson_detection"] == {"disease": "healthy"}
+    assert "pipeline_timings" not in row
+    dead = read_jsonl(tmp_path / "dead.jsonl")
+    assert [op["fields"] for op in dead] == [{"pipeline_timings": {"total": 9.5}}]
+    assert queue.stats["coalesced"] == 1
+
+
+def test_child_rows_are_written_after_their_parent(tmp_path):
+    db = FakeSupabase()
+
+    async def scenario():
+        queue = make_queue(tmp_path, db)
+        await queue.insert("calls", {"id": "c1"})
+        await queue.insert("call_transcript_lines", {"id": "l1", "call_id": "c1"})
+        await queue.insert("calls", {"id": "c2"})
+        await queue.insert("call_transcript_lines", {"id": "l2", "call_id": "c2"})
+        await queue.flush()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert [row["id"] for row in db.rows["call_transcript_lines"]] == ["l1", "l2"]
+    assert read_jsonl(tmp_path / "dead.jsonl") == []
+
+
+def test_transient_failures_stop_after_max_attempts(tmp_path):
+    db = FakeSupabase()
+    db.down = True
+
+    async def scenario():
+        queue = make_queue(tmp_path, db, max_attempts=3)
+        await queue.insert("calls", {"id": "c1"})
+        await queue.flush()
+        for _ in range(5):
+            await queue._replay_spool()
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert read_jsonl(tmp_path / "spool.jsonl") == []
+    dead = read_jsonl(tmp_path / "dead.jsonl")
+    assert len(dead) == 1 and dead[0]["attempts"] == 3
+    assert db.calls == 3
+
+
+def test_stop_waits_for_the_flush_in_progress(tmp_path):
+    db = FakeSupabase()
+    db.gate = threading.Event()
+
+    async def scenario():
+        queue = make_queue(tmp_path, db)
+        await queue.start()
+        await queue.insert("calls", {"id": "c1"})
+        while db.calls == 0:  # the flusher has dequeued the row and is writing it
+            await asyncio.sleep(0.01)
+        await queue.insert("calls", {"id": "c2"})  # still queued when stop() is called
+
+        asyncio.get_running_loop().call_later(0.1, db.gate.set)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert sorted(row["id"] for row in db.rows["calls"]) == ["c1", "c2"]
+    assert read_jsonl(tmp_path / "spool.jsonl") == []
+
+
+def test_stop_spools_writes_the_database_never_took(tmp_path):
+    db = FakeSupabase()
+    db.gate = threading.Event()
+
+    async def scenario():
+        queue = make_queue(tmp_path, db)
+        await queue.start()
+        await queue.insert("calls", {"id": "c1"})
+        while db.calls == 0:
+            await asyncio.sleep(0.01)
+        await queue.insert("calls", {"id": "c2"})
+        await queue.stop(timeout=0.1)
+
+    asyncio.run(scenario())
+    db.gate.set()
+    spooled = read_jsonl(tmp_path / "spool.jsonl")
+    assert sorted(op["rows"][0]["id"] for op in spooled) == ["c1", "c2"]
+
+
+def test_error_classification():
+    class HttpError(Exception):
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    class ApiError(Exception):
+        def __init__(self, code):
+            self.code = code
+
+    assert is_transient(ConnectionError())
+    assert is_transient(TimeoutError())
+    assert is_transient(HttpError(503))
+    assert is_transient(HttpError(429))
+    assert not is_transient(HttpError(400))
+    assert not is_transient(HttpError(409))
+    assert is_transient(ApiError("40001"))  # serialization failure
+    assert not is_transient(ApiError("23505"))  # unique violation
+    assert not is_transient(ApiError("PGRST204"))  # unknown column
@@ -0,0 +1,76 @@
+"""ParkinsonWorkerPool with a thread pool standing in for the worker processes: dedup, cancellation and timeouts"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.parkinson import worker_pool as worker_pool_module
+from backend.parkinson.worker_pool import ParkinsonWorkerPool, JobTimeoutError
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    predictions = []
+    release = threading.Event()
+
+    def predict(audio, filename, cache_key=None):
+        predictions.append(cache_key)
+        release.wait(5)
+        return {"disease": "healthy", "cache_key": cache_key}
+
+    monkeypatch.setattr(worker_pool_module, "_predict_in_worker", predict)
+    monkeypatch.setattr(worker_pool_module, "_cached_result", lambda cache_key: None)
+
+    pool = ParkinsonWorkerPool(workers=2, enabled=True)
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(pool, "_get_executor", lambda: executor)
+    pool.predictions = predictions
+    pool.release = release
+    yield pool
+    release.set()
+    executor.shutdown(wait=True)
+
+
+def test_cancelled_first_caller_does_not_cancel_deduplicated_waiters(pool):
+    async def scenario():
+        first = asyncio.create_task(pool.run(b"audio", "a.wav", cache_key="rec-1"))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(pool.run(b"audio", "a.wav", cache_key="rec-1"))
+        await asyncio.sleep(0.05)
+
+        first.cancel()  # e.g. the first client disconnected
+        await asyncio.gather(first, return_exceptions=True)
+        pool.release.set()
+
+        result = await asyncio.wait_for(second, 5)
+        assert first.cancelled()
+        assert result["cache_key"] == "rec-1"
+        assert pool.predictions == ["rec-1"]  # One job for both callers
+        assert pool._inflight == {}
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_job_keeps_its_slot_until_the_worker_finishes(pool):
+    pool.timeout_seconds = 0.05
+
+    async def scenario():
+        for key in ("slow-1", "slow-2"):
+            with pytest.raises(JobTimeoutError):
+                await pool.run(b"audio", "a.wav", cache_key=key)
+        assert pool.metrics()["overrunning"] == 2
+
+        # Both workers are still busy with the timed-out jobs: the next job waits for one
+        job_id = pool.submit(b"audio", "b.wav", cache_key="next")
+        await asyncio.sleep(0.1)
+        assert pool.status(job_id)["status"] == "queued"
+        assert pool.predictions == ["slow-1", "slow-2"]
+
+        pool.release.set()
+        result = await asyncio.wait_for(pool.wait(job_id), 5)
+        assert result["cache_key"] == "next"
+        assert pool.metrics()["overrunning"] == 0
+
+    asyncio.run(scenario())
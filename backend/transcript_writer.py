@@ -0,0 +1,75 @@
+"""
+Incremental transcript persistence.
+
+Lines streamed through /api/transcript/stream are buffered per call and written
+as a batch every TRANSCRIPT_BATCH_LINES lines or TRANSCRIPT_BATCH_MS
+milliseconds, whichever comes first. Each batch is committed to the local call
+store and queued for the Supabase `call_transcript_lines` table (see
+schema_simple.sql), so a crash mid-call loses at most one batch and the end of a call never writes the whole
+transcript as one JSON document.
+"""
+
+import os
+import json
+import asyncio
+from typing import Dict, List
+
+from backend.models import TranscriptLine
+from backend.call_store import call_store
+from backend.persistence import db_writer
+
+TRANSCRIPT_BATCH_LINES = int(os.environ.get("TRANSCRIPT_BATCH_LINES", "20"))
+TRANSCRIPT_BATCH_MS = int(os.environ.get("TRANSCRIPT_BATCH_MS", "1000"))
+
+
+class TranscriptLineWriter:
+    """Buffers transcript lines per call and flushes them in batches"""
+
+    def __init__(self, batch_lines: int = TRANSCRIPT_BATCH_LINES, batch_ms: int = TRANSCRIPT_BATCH_MS):
+        self.batch_lines = batch_lines
+        self.batch_ms = batch_ms
+        self._buffers: Dict[str, List[TranscriptLine]] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+
+    async def append(self, call_id: str, line: TranscriptLine):
+        """Buffer a line; flushes immediately once the batch is full"""
+        buffer = self._buffers.setdefault(call_id, [])
+        buffer.append(line)
+
+        if len(buffer) >= self.batch_lines:
+            await self.flush(call_id)
+        elif call_id not in self._timers:
+            self._timers[call_id] = asyncio.create_task(self._flush_later(call_id))
+
+    async def _flush_later(self, call_id: str):
+        await asyncio.sleep(self.batch_ms / 1000)
+        self._timers.pop(call_id, None)
+        await self.flush(call_id)
+
+    async def flush(self, call_id: str):
+        """Write any buffered lines for a call"""
+        timer = self._timers.pop(call_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+
+        lines = self._buffers.pop(call_id, None)
+        if not lines:
+            return
+
+        try:
+            await call_store.append_transcript_lines_async(call_id, lines)
+        except Exception as e:
+            print(f"⚠️  Failed to store transcript batch for {call_id}: {e}")
+
+        for line in lines:
+            row = json.loads(line.json())
+            row["call_id"] = call_id
+            await db_writer.insert("call_transcript_lines", row)
+
+    async def close(self, call_id: str):
+        """Flush the remaining lines of a call that has ended"""
+        await self.flush(call_id)
+
+
+# Global transcript writer
+transcript_writer = TranscriptLineWriter()
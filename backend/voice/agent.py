@@ -9,7 +9,6 @@ import json
 import asyncio
 import aiohttp
 from datetime import datetime
-import httpx
 import requests
 
 # Import Supabase for direct database access
@@ -25,6 +24,21 @@ PROJECT_ROOT = "/Users/amnesiac/Fall/The-Village"
 
 # Backend API configuration (for optional HTTP streaming)
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "10"))
+
+# One keep-alive HTTP session to the backend per worker process, shared by all calls
+_backend_session: aiohttp.ClientSession = None
+
+
+def backend_session() -> aiohttp.ClientSession:
+    """Shared backend session, created on first use in the running event loop"""
+    global _backend_session
+    loop = asyncio.get_running_loop()
+    if _backend_session is None or _backend_session.closed or _backend_session.loop is not loop:
+        _backend_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=BACKEND_MAX_CONNECTIONS, keepalive_timeout=60)
+        )
+    return _backend_session
 
 # Initialize Supabase client for direct database access
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -171,8 +185,8 @@ async def my_agent(ctx: agents.JobContext):
         # turn_detection=MultilingualModel(),  # Temporarily disabled to test quickly
     )
 
-    # Create HTTP session for optional streaming to backend
-    http_session = aiohttp.ClientSession()
+    # Shared (pooled) HTTP session for optional streaming to backend
+    http_session = backend_session()
 
     # Use the correct event from LiveKit docs: conversation_item_added
     @session.on("conversation_item_added")
@@ -283,13 +297,18 @@ async def my_agent(ctx: agents.JobContext):
                 try:
                     summary = f"Call lasted {duration:.1f} seconds with {len(transcript)} messages exchanged."
 
-                    supabase.table("calls").update({
-                        "transcript": transcript,
-                        "summary": summary,
-                        "ended_at": call_end_time.isoformat(),
-                        "duration_seconds": int(duration),
-                        "status": "completed"
-                    }).eq("room_name", room_name).execute()
+                    # Always keep the full transcript on the call row: lines streamed to the
+                    # backend only reach call_transcript_lines for calls the backend tracks
+                    # Run the blocking client on a worker thread so the agent loop keeps serving audio
+                    await asyncio.to_thread(
+                        supabase.table("calls").update({
+                            "transcript": transcript,
+                            "summary": summary,
+                            "ended_at": call_end_time.isoformat(),
+                            "duration_seconds": int(duration),
+                            "status": "completed"
+                        }).eq("room_name", room_name).execute
+                    )
 
                     print(f"✅ Transcript saved to database")
                 except Exception as e:
@@ -308,7 +327,9 @@ async def my_agent(ctx: agents.JobContext):
             recording_path = None
             if supabase:
                 try:
-                    call_record = supabase.table("calls").select("recording_path").eq("room_name", room_name).single().execute()
+                    call_record = await asyncio.to_thread(
+                        supabase.table("calls").select("recording_path").eq("room_name", room_name).single().execute
+                    )
                     if call_record.data and call_record.data.get("recording_path"):
                         recording_path = call_record.data["recording_path"]
                         print(f"✅ Retrieved recording path from database: {recording_path}")
@@ -327,45 +348,38 @@ async def my_agent(ctx: agents.JobContext):
             print(f"🎯 Triggering biomarker analysis via FastAPI...")
             print(f"📁 Recording: {recording_path}")
 
-            async with httpx.AsyncClient() as client:
-                # Trigger biomarker analysis
-                biomarker_response = await client.post(
-                    f"{BACKEND_URL}/trigger_biomarker_analysis",
-                    params={
-                        "room_name": room_name,
-                        "recording_path": recording_path
-                    },
-                    timeout=5.0
-                )
-
-                if biomarker_response.status_code == 200:
+            # Trigger biomarker analysis
+            async with http_session.post(
+                f"{BACKEND_URL}/trigger_biomarker_analysis",
+                params={
+                    "room_name": room_name,
+                    "recording_path": recording_path
+                },
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as biomarker_response:
+                if biomarker_response.status == 200:
                     print(f"✅ Biomarker analysis queued successfully")
                 else:
-                    print(f"⚠️  Failed to queue biomarker analysis: HTTP {biomarker_response.status_code}")
-
-                # Trigger Parkinson's analysis
-                parkinson_response = await client.post(
-                    f"{BACKEND_URL}/trigger_parkinson_analysis",
-                    params={
-                        "room_name": room_name,
-                        "recording_path": recording_path
-                    },
-                    timeout=5.0
-                )
-
-                if parkinson_response.status_code == 200:
+                    print(f"⚠️  Failed to queue biomarker analysis: HTTP {biomarker_response.status}")
+
+            # Trigger Parkinson's analysis
+            async with http_session.post(
+                f"{BACKEND_URL}/trigger_parkinson_analysis",
+                params={
+                    "room_name": room_name,
+                    "recording_path": recording_path
+                },
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as parkinson_response:
+                if parkinson_response.status == 200:
                     print(f"✅ Parkinson's analysis queued successfully")
                 else:
-                    print(f"⚠️  Failed to queue Parkinson's analysis: HTTP {parkinson_response.status_code}")
+                    print(f"⚠️  Failed to queue Parkinson's analysis: HTTP {parkinson_response.status}")
 
         except Exception as e:
             print(f"⚠️  Could not trigger health analyses: {e}")
             print(f"   (FastAPI server may not be running)")
 
-        # Close HTTP session
-        await http_session.close()
-        print(f"🔌 HTTP session closed")
-
     # Register event handler
     session.on("conversation_item_added")(on_conversation_item_added)
 
@@ -1,151 +1,338 @@
-"""WebSocket connection manager for real-time updates."""
+"""WebSocket connection manager for real-time updates.
+
+Every connection has a bounded outbound queue, drained by its own writer task.
+Broadcasts serialize a message once and put the same frame on each
+subscriber's queue. They never wait on network I/O, so one slow dashboard
+cannot delay events for everyone else, or the analysis that emits them. When a
+client's queue is full, WS_SLOW_CONSUMER_POLICY decides what happens:
+"drop_oldest" (default) discards the client's oldest queued event,
+"drop_newest" discards the new one, and "disconnect" closes the connection.
+
+Messages are wrapped in an EncodedEvent (see event_encoding), so every wire
+format is encoded once per event. Clients pick a format when they connect.
+
+Broadcasts go through an event bus (see event_bus) instead of straight to local
+sockets. With WS_EVENT_BUS=redis, every API worker delivers every event to its
+own connections, and per-call order is the same everywhere. Personal messages
+(welcome, errors, subscription acks) stay local.
+"""
 from fastapi import WebSocket
-from typing import Dict, Set, Any
-import json
+from pydantic import BaseModel
+from typing import Dict, Set, Any, Optional, Tuple, Union
+import os
+import time
+import asyncio
 import logging
 
+from backend.event_bus import FORGET_CALL, TO_ALL, TO_CALL, BusMessage, create_event_bus
+from backend.event_encoding import EncodedEvent, Frame, event, negotiate_encoding
+from backend.subscription_index import SubscriptionIndex, call_topic, elder_topic, org_topic
+
 logger = logging.getLogger(__name__)
 
+WS_SEND_QUEUE_SIZE = int(os.environ.get("WS_SEND_QUEUE_SIZE", "256"))
+WS_SLOW_CONSUMER_POLICY = os.environ.get("WS_SLOW_CONSUMER_POLICY", "drop_oldest")
+# A writer blocked longer than this on one drained batch means the client is gone or stalled
+# (checked by one watchdog task rather than a timer per send)
+WS_SEND_TIMEOUT_SECONDS = float(os.environ.get("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+
+
+class ClientConnection:
+    """One WebSocket with a bounded send queue and the writer task that drains it."""
+
+    def __init__(self, websocket: WebSocket, queue_size: int, encoding: str):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.queue: "asyncio.Queue[Frame]" = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.busy_since: Optional[float] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, frame: Frame, policy: str) -> bool:
+        """Queue a frame without waiting; False if the client must be disconnected."""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        self.dropped += 1
+        if policy == "disconnect":
+            return False
+        if policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(frame)
+        return True
+
+    async def _send(self, frames):
+        for frame in frames:
+            if isinstance(frame, bytes):
+                await self.websocket.send_bytes(frame)
+            else:
+                await self.websocket.send_text(frame)
+            self.sent += 1
+
+    async def run_writer(self, on_failure):
+        try:
+            while True:
+                # Send everything queued so far in one go
+                frames = [await self.queue.get()]
+                while not self.queue.empty():
+                    frames.append(self.queue.get_nowait())
+                self.busy_since = time.monotonic()
+                await self._send(frames)
+                self.busy_since = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket: {e!r}")
+            on_failure(self.websocket)
+
+
+def _encoded(message: Union[dict, EncodedEvent]) -> EncodedEvent:
+    return message if isinstance(message, EncodedEvent) else EncodedEvent(message)
+
 
 class ConnectionManager:
     """Manages WebSocket connections and broadcasts events to connected clients."""
 
-    def __init__(self):
-        # Store active connections
+    def __init__(self, queue_size: int = WS_SEND_QUEUE_SIZE, slow_consumer_policy: str = WS_SLOW_CONSUMER_POLICY,
+                 bus=None):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"WS_SLOW_CONSUMER_POLICY must be one of {SLOW_CONSUMER_POLICIES}")
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        # Store active connections and their send queues
         self.active_connections: Set[WebSocket] = set()
-        # Map call_id to connections interested in that call
-        self.call_subscriptions: Dict[str, Set[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket):
-        """Accept a new WebSocket connection."""
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.stats = {"frames_queued": 0, "frames_dropped": 0, "slow_disconnects": 0, "send_failures": 0,
+                      "stalled_disconnects": 0}
+        self._watchdog: Optional[asyncio.Task] = None
+        # Pub/sub backbone shared by all workers (in-process unless WS_EVENT_BUS=redis)
+        self.bus = bus if bus is not None else create_event_bus()
+        self._bus_started = False
+        # Connections subscribed to calls, or to all calls of an elder / organization
+        self.subscriptions = SubscriptionIndex()
+        # call_id -> (elder_id, org_id), so call events also reach the wildcard topics
+        self.call_scopes: Dict[str, Tuple[str, Optional[str]]] = {}
+
+    async def connect(self, websocket: WebSocket, encoding: Optional[str] = None) -> str:
+        """Accept a new WebSocket connection; returns the negotiated encoding."""
         await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size, negotiate_encoding(encoding))
+        client.writer = asyncio.create_task(client.run_writer(self._on_send_failure))
+        self.clients[websocket] = client
         self.active_connections.add(websocket)
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = asyncio.create_task(self._watch_stalled_writers())
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        return client.encoding
 
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
+        if websocket not in self.active_connections:
+            return
         self.active_connections.discard(websocket)
 
-        # Remove from all call subscriptions
-        for call_id, subscribers in self.call_subscriptions.items():
-            subscribers.discard(websocket)
+        client = self.clients.pop(websocket, None)
+        if client and client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+        # Remove from this connection's subscriptions only
+        self.subscriptions.remove(websocket)
 
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
+    async def start(self):
+        """Subscribe to the event bus (startup; also done lazily on first publish)."""
+        if not self._bus_started:
+            self._bus_started = True
+            await self.bus.start(self._deliver)
+
+    async def aclose(self):
+        """Drop every connection and wait for the writer tasks to stop (shutdown)."""
+        if self._bus_started:
+            self._bus_started = False
+            await self.bus.aclose()
+        writers = [client.writer for client in self.clients.values() if client.writer]
+        if self._watchdog:
+            writers.append(self._watchdog)
+            self._watchdog.cancel()
+        for websocket in list(self.active_connections):
+            self.disconnect(websocket)
+        await asyncio.gather(*writers, return_exceptions=True)
+
+    async def _watch_stalled_writers(self):
+        """Close connections whose writer has been stuck on a send for WS_SEND_TIMEOUT_SECONDS."""
+        while self.clients:
+            await asyncio.sleep(WS_SEND_TIMEOUT_SECONDS / 2)
+            deadline = time.monotonic() - WS_SEND_TIMEOUT_SECONDS
+            stalled = [ws for ws, client in self.clients.items()
+                       if client.busy_since is not None and client.busy_since < deadline]
+            for websocket in stalled:
+                logger.warning("Disconnecting stalled WebSocket consumer (send timed out)")
+                self.stats["stalled_disconnects"] += 1
+                self._close(websocket, code=1013)
+
     def subscribe_to_call(self, websocket: WebSocket, call_id: str):
         """Subscribe a connection to updates for a specific call."""
-        if call_id not in self.call_subscriptions:
-            self.call_subscriptions[call_id] = set()
-        self.call_subscriptions[call_id].add(websocket)
+        self.subscriptions.subscribe(websocket, call_topic(call_id))
         logger.info(f"WebSocket subscribed to call {call_id}")
 
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send a message to a specific WebSocket connection."""
-        try:
-            await websocket.send_json(message)
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
-
-    async def broadcast(self, message: dict):
-        """Broadcast a message to all connected clients."""
-        disconnected = set()
+    def subscribe_to_elder(self, websocket: WebSocket, elder_id: str):
+        """Subscribe a connection to updates for every call with an elder."""
+        self.subscriptions.subscribe(websocket, elder_topic(elder_id))
+        logger.info(f"WebSocket subscribed to elder {elder_id}")
+
+    def subscribe_to_org(self, websocket: WebSocket, org_id: str):
+        """Subscribe a connection to updates for every call of an organization's elders."""
+        self.subscriptions.subscribe(websocket, org_topic(org_id))
+        logger.info(f"WebSocket subscribed to organization {org_id}")
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        """Remove one subscription (topic from subscription_index, e.g. call:<id>)."""
+        self.subscriptions.unsubscribe(websocket, topic)
+
+    def register_call(self, call_id: str, elder_id: str, org_id: Optional[str] = None):
+        """Route a call's events to its elder and organization wildcard subscribers."""
+        self.call_scopes[call_id] = (elder_id, org_id)
+
+    async def forget_call(self, call_id: str):
+        """Stop routing a finished call's events to wildcard subscribers (on every worker)."""
+        await self._publish(BusMessage(FORGET_CALL, call_id=call_id))
+
+    def call_subscribers(self, call_id: str) -> Set[WebSocket]:
+        """Connections subscribed to a call directly or through its elder/organization."""
+        elder_id, org_id = self.call_scopes.get(call_id, (None, None))
+        return self.subscriptions.subscribers_of([
+            call_topic(call_id),
+            elder_topic(elder_id) if elder_id else None,
+            org_topic(org_id) if org_id else None,
+        ])
 
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.add(connection)
+    # ========================================================================
+    # Sending: enqueue only; each connection's writer task does the network I/O
+    # ========================================================================
 
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+    def _enqueue(self, connections, encoded: EncodedEvent):
+        slow = []
+        for connection in connections:
+            client = self.clients.get(connection)
+            if client is None:
+                continue
+            dropped = client.dropped
+            if not client.offer(encoded.frame(client.encoding), self.slow_consumer_policy):
+                slow.append(connection)
+            self.stats["frames_dropped"] += client.dropped - dropped
+            self.stats["frames_queued"] += 1
+
+        for connection in slow:
+            logger.warning("Disconnecting slow WebSocket consumer (send queue full)")
+            self.stats["slow_disconnects"] += 1
+            self._close(connection, code=1013)
+
+    def _close(self, websocket: WebSocket, code: int = 1011):
+        self.disconnect(websocket)
+        task = asyncio.create_task(websocket.close(code=code))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def _on_send_failure(self, websocket: WebSocket):
+        self.stats["send_failures"] += 1
+        self._close(websocket)
+
+    async def send_personal_message(self, message: Union[dict, EncodedEvent], websocket: WebSocket):
+        """Send a message to a specific WebSocket connection (queued behind earlier events)."""
+        self._enqueue((websocket,), _encoded(message))
+
+    async def broadcast(self, message: Union[dict, EncodedEvent]):
+        """Broadcast a message to all connected clients."""
+        await self._publish(BusMessage(TO_ALL, _encoded(message)))
 
-    async def broadcast_to_call(self, call_id: str, message: dict):
+    async def broadcast_to_call(self, call_id: str, message: Union[dict, EncodedEvent]):
         """Broadcast a message to all clients subscribed to a specific call."""
-        if call_id not in self.call_subscriptions:
-            return
-
-        disconnected = set()
-        subscribers = self.call_subscriptions[call_id].copy()
-
-        for connection in subscribers:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to call subscriber: {e}")
-                disconnected.add(connection)
-
-        # Clean up disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+        await self._publish(BusMessage(TO_CALL, _encoded(message), call_id=call_id))
+
+    async def _publish(self, message: BusMessage):
+        if not self._bus_started:
+            await self.start()
+        await self.bus.publish(message)
+
+    def _deliver(self, message: BusMessage):
+        """Bus handler: route a published event to this worker's connections."""
+        if message.elder_id and message.call_id:
+            self.register_call(message.call_id, message.elder_id, message.org_id)
+
+        if message.kind == TO_ALL:
+            if self.active_connections:
+                self._enqueue(list(self.active_connections), message.event)
+        elif message.kind == TO_CALL:
+            subscribers = self.call_subscribers(message.call_id)
+            if subscribers:
+                self._enqueue(subscribers, message.event)
+        elif message.kind == FORGET_CALL:
+            self.call_scopes.pop(message.call_id, None)
+
+    def metrics(self) -> Dict:
+        depths = [client.queue.qsize() for client in self.clients.values()]
+        encodings: Dict[str, int] = {}
+        for client in self.clients.values():
+            encodings[client.encoding] = encodings.get(client.encoding, 0) + 1
+        return {
+            "connections": len(self.clients),
+            "encodings": encodings,
+            "policy": self.slow_consumer_policy,
+            "queue_size": self.queue_size,
+            "max_queue_depth": max(depths, default=0),
+            "subscriptions": self.subscriptions.metrics(),
+            "bus": self.bus.metrics(),
+            **self.stats
+        }
 
     # ========================================================================
     # Event Helper Methods (matching frontend WSEvent types)
     # ========================================================================
 
-    async def emit_call_started(self, call_id: str, elder_id: str):
-        """Emit call_started event."""
-        await self.broadcast({
-            "type": "call_started",
-            "data": {
-                "call_id": call_id,
-                "elder_id": elder_id
-            }
-        })
+    async def emit_call_started(self, call_id: str, elder_id: str, org_id: Optional[str] = None):
+        """Emit call_started event (and route the call's events to its elder/org subscribers)."""
+        await self._publish(BusMessage(TO_ALL, event("call_started", {
+            "call_id": call_id,
+            "elder_id": elder_id
+        }), call_id=call_id, elder_id=elder_id, org_id=org_id))
 
     async def emit_call_status(self, call_id: str, status: str):
         """Emit call_status event."""
-        await self.broadcast({
-            "type": "call_status",
-            "data": {
-                "call_id": call_id,
-                "status": status
-            }
-        })
-
-    async def emit_transcript_update(self, call_id: str, transcript_line: dict):
+        await self.broadcast(event("call_status", {
+            "call_id": call_id,
+            "status": status
+        }))
+
+    async def emit_transcript_update(self, call_id: str, transcript_line: Union[dict, BaseModel]):
         """Emit transcript_update event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "transcript_update",
-            "data": transcript_line
-        })
+        await self.broadcast_to_call(call_id, event("transcript_update", transcript_line))
 
     async def emit_biometric_update(self, call_id: str, biometric_data: dict):
         """Emit biometric_update event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "biometric_update",
-            "data": biometric_data
-        })
+        await self.broadcast_to_call(call_id, event("biometric_update", biometric_data))
 
-    async def emit_wellbeing_update(self, call_id: str, wellbeing_data: dict):
+    async def emit_wellbeing_update(self, call_id: str, wellbeing_data: Union[dict, BaseModel]):
         """Emit wellbeing_update event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "wellbeing_update",
-            "data": wellbeing_data
-        })
+        await self.broadcast_to_call(call_id, event("wellbeing_update", wellbeing_data))
 
-    async def emit_profile_update(self, call_id: str, profile_fact: dict):
+    async def emit_profile_update(self, call_id: str, profile_fact: Union[dict, BaseModel]):
         """Emit profile_update event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "profile_update",
-            "data": profile_fact
-        })
+        await self.broadcast_to_call(call_id, event("profile_update", profile_fact))
 
-    async def emit_concern_detected(self, call_id: str, concern: dict):
+    async def emit_concern_detected(self, call_id: str, concern: Union[dict, BaseModel]):
         """Emit concern_detected event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "concern_detected",
-            "data": concern
-        })
+        await self.broadcast_to_call(call_id, event("concern_detected", concern))
 
-    async def emit_village_action_started(self, call_id: str, action: dict):
+    async def emit_village_action_started(self, call_id: str, action: Union[dict, BaseModel]):
         """Emit village_action_started event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "village_action_started",
-            "data": action
-        })
+        await self.broadcast_to_call(call_id, event("village_action_started", action))
 
     async def emit_village_action_update(self, call_id: str, action_id: str,
                                          status: str, response: str = None):
@@ -157,29 +344,27 @@ class ConnectionManager:
         if response:
             data["response"] = response
 
-        await self.broadcast_to_call(call_id, {
-            "type": "village_action_update",
-            "data": data
-        })
+        await self.broadcast_to_call(call_id, event("village_action_update", data))
 
-    async def emit_call_ended(self, call_id: str, summary: dict):
+    async def emit_call_ended(self, call_id: str, summary: Union[dict, BaseModel]):
         """Emit call_ended event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "call_ended",
-            "data": {
-                "call_id": call_id,
-                "summary": summary
-            }
-        })
+        await self.broadcast_to_call(call_id, event("call_ended", {
+            "call_id": call_id,
+            "summary": summary
+        }))
 
     async def emit_timer_update(self, call_id: str, elapsed_seconds: int):
         """Emit timer_update event."""
-        await self.broadcast_to_call(call_id, {
-            "type": "timer_update",
-            "data": {
-                "elapsed_seconds": elapsed_seconds
-            }
-        })
+        await self.broadcast_to_call(call_id, event("timer_update", {
+            "elapsed_seconds": elapsed_seconds
+        }))
+
+    async def emit_campaign_progress(self, campaign_id: str, progress: dict):
+        """Emit campaign_progress event."""
+        await self.broadcast(event("campaign_progress", {
+            "campaign_id": campaign_id,
+            **progress
+        }))
 
 
 # Global connection manager instance